@@ -0,0 +1,278 @@
+#!/usr/bin/env python3
+# -*- coding: utf-8 -*-
+#
+# Copyright © 2016 Mathieu Duponchelle <mathieu.duponchelle@opencreed.com>
+# Copyright © 2016 Collabora Ltd
+#
+# This library is free software; you can redistribute it and/or modify it under
+# the terms of the GNU Lesser General Public License as published by the Free
+# Software Foundation; either version 2.1 of the License, or (at your option)
+# any later version.
+#
+# This library is distributed in the hope that it will be useful, but WITHOUT
+# ANY WARRANTY; without even the implied warranty of MERCHANTABILITY or FITNESS
+# FOR A PARTICULAR PURPOSE.  See the GNU Lesser General Public License for more
+# details.
+#
+# You should have received a copy of the GNU Lesser General Public License
+# along with this library.  If not, see <http://www.gnu.org/licenses/>.
+
+"""
+Generate a synthetic hotdoc project of configurable size.
+
+The project is made of markdown pages listed in a sitemap, of C headers
+documented with gtk-doc comments and of a GIR file describing the same
+API, along with one configuration file per benchmarked scenario:
+
+* hotdoc-core.json: markdown pages only
+* hotdoc-c.json: markdown pages and the C extension
+* hotdoc-gi.json: markdown pages and the GObject-introspection extension
+"""
+
+import argparse
+import json
+import os
+import sys
+
+from xml.sax.saxutils import escape
+
+NAMESPACE = 'Bench'
+PREFIX = 'bench'
+
+SCENARIOS = ('core', 'c', 'gi')
+
+LOREM = ('Lorem ipsum dolor sit amet, consectetur adipiscing elit, sed do '
+         'eiusmod tempor incididunt ut labore et dolore magna aliqua.')
+
+GIR_HEADER = '''<?xml version="1.0"?>
+<repository version="1.2"
+            xmlns="http://www.gtk.org/introspection/core/1.0"
+            xmlns:c="http://www.gtk.org/introspection/c/1.0"
+            xmlns:glib="http://www.gtk.org/introspection/glib/1.0">
+  <namespace name="%s"
+             version="1.0"
+             shared-library="lib%s.so"
+             c:identifier-prefixes="%s"
+             c:symbol-prefixes="%s">
+''' % (NAMESPACE, PREFIX, NAMESPACE, PREFIX)
+
+GIR_FOOTER = '''  </namespace>
+</repository>
+'''
+
+
+def _struct_name(header):
+    return '%sThing%d' % (NAMESPACE, header)
+
+
+def _function_name(header, function):
+    return '%s_thing%d_do%d' % (PREFIX, header, function)
+
+
+def _enum_name(header):
+    return '%sThing%dFlags' % (NAMESPACE, header)
+
+
+class ProjectGenerator:
+    """
+    Writes the synthetic project to a folder.
+    """
+
+    def __init__(self, n_pages, n_headers, n_functions):
+        self.n_pages = n_pages
+        self.n_headers = n_headers
+        self.n_functions = n_functions
+
+    @property
+    def n_symbols(self):
+        """
+        The number of symbols documented in the headers, the struct, the
+        enum with its two members and the functions of each header.
+        """
+        return self.n_headers * (self.n_functions + 4)
+
+    def __write(self, folder, name, contents):
+        path = os.path.join(folder, name)
+        os.makedirs(os.path.dirname(path), exist_ok=True)
+        with open(path, 'w', encoding='utf-8') as _:
+            _.write(contents)
+        return path
+
+    def __page(self, page):
+        lines = ['# Page %d' % page, '', LOREM, '']
+        if page > 0:
+            lines.append('See [the previous page](page%d.markdown).' %
+                         (page - 1))
+            lines.append('')
+        if self.n_headers:
+            header = page % self.n_headers
+            lines.append('Related to #%s and %s().' % (
+                _struct_name(header),
+                _function_name(header, page % max(self.n_functions, 1))))
+            lines.append('')
+        lines += ['## Example', '', '``` c',
+                  'int i = %d;' % page, '```', '']
+        for section in range(3):
+            lines += ['## Section %d' % section, '',
+                      '* %s' % LOREM, '* %s' % LOREM, '']
+        return '\n'.join(lines)
+
+    def __header(self, header):
+        struct = _struct_name(header)
+        enum = _enum_name(header)
+        upper = '%s_THING%d' % (PREFIX.upper(), header)
+        lines = ['#ifndef %s_H' % upper, '#define %s_H' % upper, '',
+                 '/**', ' * %s:' % struct, ' * @value: the value',
+                 ' *', ' * A thing, %s' % LOREM, ' */',
+                 'typedef struct {', '  int value;', '} %s;' % struct, '',
+                 '/**', ' * %s:' % enum,
+                 ' * @%s_FIRST: the first flag' % upper,
+                 ' * @%s_SECOND: the second flag' % upper,
+                 ' *', ' * Flags for #%s.' % struct, ' */',
+                 'typedef enum {',
+                 '  %s_FIRST = 1 << 0,' % upper,
+                 '  %s_SECOND = 1 << 1,' % upper,
+                 '} %s;' % enum, '']
+
+        for function in range(self.n_functions):
+            name = _function_name(header, function)
+            lines += ['/**', ' * %s:' % name,
+                      ' * @thing: a #%s' % struct,
+                      ' * @flags: some #%s' % enum,
+                      ' *', ' * %s' % LOREM]
+            if function:
+                lines.append(' * See also %s().' %
+                             _function_name(header, function - 1))
+            lines += [' *', ' * Returns: the result', ' */',
+                      'int %s (%s *thing, %s flags);' % (name, struct, enum),
+                      '']
+
+        lines += ['#endif', '']
+        return '\n'.join(lines)
+
+    def __gir(self):
+        lines = [GIR_HEADER]
+        for header in range(self.n_headers):
+            struct = _struct_name(header)
+            enum = _enum_name(header)
+            upper = '%s_THING%d' % (PREFIX.upper(), header)
+            lines.append(
+                '    <record name="%s" c:type="%s">\n'
+                '      <field name="value" writable="1">\n'
+                '        <type name="gint" c:type="int"/>\n'
+                '      </field>\n'
+                '    </record>\n' % (struct[len(NAMESPACE):], struct))
+            lines.append(
+                '    <bitfield name="%s" c:type="%s">\n'
+                '      <member name="first" value="1" c:identifier="%s_FIRST"/>\n'
+                '      <member name="second" value="2" '
+                'c:identifier="%s_SECOND"/>\n'
+                '    </bitfield>\n' % (enum[len(NAMESPACE):], enum, upper,
+                                      upper))
+            for function in range(self.n_functions):
+                name = _function_name(header, function)
+                lines.append(
+                    '    <function name="%s" c:identifier="%s">\n'
+                    '      <doc xml:space="preserve">%s</doc>\n'
+                    '      <return-value transfer-ownership="none">\n'
+                    '        <type name="gint" c:type="int"/>\n'
+                    '      </return-value>\n'
+                    '      <parameters>\n'
+                    '        <parameter name="thing" transfer-ownership="none">\n'
+                    '          <type name="%s" c:type="%s*"/>\n'
+                    '        </parameter>\n'
+                    '        <parameter name="flags" transfer-ownership="none">\n'
+                    '          <type name="%s" c:type="%s"/>\n'
+                    '        </parameter>\n'
+                    '      </parameters>\n'
+                    '    </function>\n' % (
+                        name[len(PREFIX) + 1:], name, escape(LOREM),
+                        struct[len(NAMESPACE):], struct,
+                        enum[len(NAMESPACE):], enum))
+        lines.append(GIR_FOOTER)
+        return ''.join(lines)
+
+    def __conf(self, scenario):
+        conf = {'project_name': 'bench-%s' % scenario,
+                'project_version': '1.0',
+                'index': 'markdown/index.markdown',
+                'sitemap': 'sitemap-%s.txt' % scenario,
+                'output': 'built-%s' % scenario}
+        if scenario == 'c':
+            conf['c_sources'] = ['include/*.h']
+            conf['c_include_directories'] = ['include']
+        elif scenario == 'gi':
+            conf['gi_sources'] = ['%s-1.0.gir' % NAMESPACE]
+            conf['gi_c_sources'] = ['include/*.h']
+            conf['languages'] = ['c', 'python', 'javascript']
+        return json.dumps(conf, indent=4)
+
+    def __sitemap(self, scenario):
+        lines = ['index.markdown']
+        lines += ['\tpage%d.markdown' % page for page in range(self.n_pages)]
+        if scenario in ('c', 'gi') and self.n_headers:
+            lines.append('\t%s-index' % scenario)
+        return '\n'.join(lines) + '\n'
+
+    def generate(self, folder):
+        """
+        Generate the project in @folder.
+
+        Returns:
+            list: The paths of the configuration files of each scenario.
+        """
+        index = ['# Benchmark', '', LOREM, '']
+        index += ['* [](page%d.markdown)' % page
+                  for page in range(self.n_pages)]
+        self.__write(folder, os.path.join('markdown', 'index.markdown'),
+                     '\n'.join(index) + '\n')
+        for page in range(self.n_pages):
+            self.__write(folder,
+                         os.path.join('markdown', 'page%d.markdown' % page),
+                         self.__page(page))
+
+        for header in range(self.n_headers):
+            self.__write(folder,
+                         os.path.join('include', 'thing%d.h' % header),
+                         self.__header(header))
+        if self.n_headers:
+            self.__write(folder, '%s-1.0.gir' % NAMESPACE, self.__gir())
+
+        confs = []
+        for scenario in SCENARIOS:
+            self.__write(folder, 'sitemap-%s.txt' % scenario,
+                         self.__sitemap(scenario))
+            confs.append(self.__write(folder, 'hotdoc-%s.json' % scenario,
+                                      self.__conf(scenario)))
+        return confs
+
+
+def add_size_arguments(parser):
+    """Add the arguments controlling the size of the project"""
+    parser.add_argument('--pages', type=int, default=100,
+                        help='Number of markdown pages')
+    parser.add_argument('--headers', type=int, default=20,
+                        help='Number of C headers')
+    parser.add_argument('--functions', type=int, default=20,
+                        help='Number of documented functions per header')
+
+
+def main():
+    """
+    Banana banana
+    """
+    parser = argparse.ArgumentParser(description=__doc__,
+                                     formatter_class=argparse.RawDescriptionHelpFormatter)
+    parser.add_argument('folder', help='Where to generate the project')
+    add_size_arguments(parser)
+    args = parser.parse_args()
+
+    generator = ProjectGenerator(args.pages, args.headers, args.functions)
+    generator.generate(args.folder)
+    print('Generated %d pages and %d symbols in %s' % (
+        args.pages, generator.n_symbols, args.folder))
+    return 0
+
+
+if __name__ == '__main__':
+    sys.exit(main())
@@ -0,0 +1,234 @@
+#!/usr/bin/env python3
+# -*- coding: utf-8 -*-
+#
+# Copyright © 2016 Mathieu Duponchelle <mathieu.duponchelle@opencreed.com>
+# Copyright © 2016 Collabora Ltd
+#
+# This library is free software; you can redistribute it and/or modify it under
+# the terms of the GNU Lesser General Public License as published by the Free
+# Software Foundation; either version 2.1 of the License, or (at your option)
+# any later version.
+#
+# This library is distributed in the hope that it will be useful, but WITHOUT
+# ANY WARRANTY; without even the implied warranty of MERCHANTABILITY or FITNESS
+# FOR A PARTICULAR PURPOSE.  See the GNU Lesser General Public License for more
+# details.
+#
+# You should have received a copy of the GNU Lesser General Public License
+# along with this library.  If not, see <http://www.gnu.org/licenses/>.
+
+"""
+Measure how long the GObject-introspection extension takes to ingest
+GIR files, and to build and query class hierarchies.
+
+The GIR files (Gio-2.0.gir by default, looked up like the extension
+looks up included GIR files) are parsed with lxml, then handed to
+cache_nodes along with all the output languages, which also ingests the
+GIR files they include. The source cache is not used.
+
+The hierarchy of the classes and interfaces the GIR files define is
+then built again on its own and the ancestors and children of each of
+them are looked up, with networkx as well when it is installed, for
+comparison. The time it takes to import the module ingesting GIR files
+in a new interpreter is reported too.
+
+Run it against two versions of hotdoc to compare them.
+"""
+
+import argparse
+import importlib
+import json
+import os
+import subprocess
+import sys
+import time
+
+from lxml import etree
+
+from hotdoc.utils.loggable import Logger
+from hotdoc.utils.utils import DATADIR
+from hotdoc.extensions.gi.utils import get_language_classes, core_ns, NS_MAP
+from hotdoc.extensions.gi import node_cache
+
+IMPORT_SCRIPT = """
+import time
+start = time.perf_counter()
+import %s
+print(time.perf_counter() - start)
+"""
+
+
+def _find_gir_file(gir_name):
+    if os.path.exists(gir_name):
+        return gir_name
+
+    xdg_dirs = os.getenv('XDG_DATA_DIRS') or ''
+    xdg_dirs = [p for p in xdg_dirs.split(os.pathsep) if p]
+    xdg_dirs += ['/usr/share', DATADIR]
+    for dir_ in xdg_dirs:
+        gir_file = os.path.join(dir_, 'gir-1.0', gir_name)
+        if os.path.exists(gir_file):
+            return gir_file
+
+    return None
+
+
+def _time_import(module):
+    try:
+        output = subprocess.check_output(
+            [sys.executable, '-c', IMPORT_SCRIPT % module],
+            stderr=subprocess.DEVNULL, universal_newlines=True)
+    except subprocess.CalledProcessError:
+        return None
+    return float(output)
+
+
+def _get_hierarchy_edges(gir_roots):
+    edges = []
+    for gir_root in gir_roots:
+        for ns_node in gir_root.findall(core_ns('namespace')):
+            ns_name = ns_node.attrib['name']
+            for node in ns_node.xpath('./core:class|./core:interface',
+                                      namespaces=NS_MAP):
+                parent_name = node.attrib.get('parent')
+                if parent_name and '.' not in parent_name:
+                    parent_name = '%s.%s' % (ns_name, parent_name)
+                edges.append((parent_name,
+                              '%s.%s' % (ns_name, node.attrib['name'])))
+    return edges
+
+
+def _build_hierarchy(edges):
+    index = node_cache.HierarchyIndex()
+    for parent_name, gi_name in edges:
+        if parent_name is None:
+            index.add_node(gi_name)
+        else:
+            index.add_edge(parent_name, gi_name)
+
+    for _, gi_name in edges:
+        index.get_ancestors(gi_name)
+        index.get_children(gi_name)
+
+
+def _build_networkx_hierarchy(edges):
+    # pylint: disable=import-error
+    import networkx as nx
+
+    graph = nx.DiGraph()
+    for parent_name, gi_name in edges:
+        if parent_name is None:
+            graph.add_node(gi_name)
+        else:
+            graph.add_edge(parent_name, gi_name)
+
+    # Like get_klass_parents and get_klass_children used to
+    for _, gi_name in edges:
+        parents = list(graph.predecessors(gi_name))
+        while parents:
+            parents = list(graph.predecessors(parents[0]))
+        list(graph.successors(gi_name))
+
+
+def _best_time(func, repeat, *args):
+    best = None
+    for _ in range(repeat):
+        start = time.perf_counter()
+        func(*args)
+        duration = time.perf_counter() - start
+        if best is None or duration < best:
+            best = duration
+    return best
+
+
+def measure(gir_files, repeat):
+    """
+    Parse and ingest @gir_files, then build their hierarchy, @repeat
+    times.
+
+    Returns:
+        dict: The measurements, the best of each.
+    """
+    parse = []
+    ingest = []
+    for _ in range(repeat):
+        # Start from scratch, included GIR files are only ingested once
+        importlib.reload(node_cache)
+        languages = [lang_type() for lang_type in get_language_classes()]
+
+        start = time.perf_counter()
+        gir_roots = [etree.parse(gir_file).getroot()
+                     for gir_file in gir_files]
+        parse.append(time.perf_counter() - start)
+
+        start = time.perf_counter()
+        for gir_root in gir_roots:
+            node_cache.cache_nodes(gir_root, {}, languages)
+        ingest.append(time.perf_counter() - start)
+
+    edges = _get_hierarchy_edges(gir_roots)
+    results = {'girs': gir_files,
+               'parse': min(parse),
+               'cache_nodes': min(ingest),
+               'types': len(node_cache.ALL_GI_TYPES),
+               'classes': len(edges),
+               'hierarchy': _best_time(_build_hierarchy, repeat, edges),
+               'import': _time_import('hotdoc.extensions.gi.node_cache'),
+               'networkx_hierarchy': None,
+               'networkx_import': None}
+
+    try:
+        # pylint: disable=unused-import
+        import networkx
+    except ImportError:
+        return results
+
+    results['networkx_hierarchy'] = _best_time(_build_networkx_hierarchy,
+                                               repeat, edges)
+    results['networkx_import'] = _time_import('networkx')
+    return results
+
+
+def main():
+    """
+    Banana banana
+    """
+    parser = argparse.ArgumentParser(description=__doc__,
+                                     formatter_class=argparse.RawDescriptionHelpFormatter)
+    parser.add_argument('girs', nargs='*', default=['Gio-2.0.gir'],
+                        help='Paths or names of the GIR files')
+    parser.add_argument('--repeat', type=int, default=5,
+                        help='Number of runs, the best one is reported')
+    parser.add_argument('--output', help='Where to write the results as JSON')
+    args = parser.parse_args()
+
+    gir_files = []
+    for gir in args.girs:
+        gir_file = _find_gir_file(gir)
+        if gir_file is None:
+            print('Could not find %s' % gir)
+            return 1
+        gir_files.append(gir_file)
+
+    Logger.silent = True
+    results = measure(gir_files, args.repeat)
+    print('%d GIR files parsed in %.3f seconds, %d types ingested in %.3f '
+          'seconds' % (len(gir_files), results['parse'], results['types'],
+                       results['cache_nodes']))
+    print('Hierarchy of %(classes)d classes and interfaces built and '
+          'queried in %(hierarchy).4f seconds' % results)
+    if results['import'] is not None:
+        print('node_cache imported in %(import).3f seconds' % results)
+    if results['networkx_hierarchy'] is not None:
+        print('With networkx: %(networkx_hierarchy).4f seconds, networkx '
+              'imported in %(networkx_import).3f seconds' % results)
+
+    if args.output:
+        with open(args.output, 'w', encoding='utf-8') as _:
+            _.write(json.dumps(results, indent=2))
+
+    return 0
+
+
+if __name__ == '__main__':
+    sys.exit(main())
@@ -0,0 +1,176 @@
+#!/usr/bin/env python3
+# -*- coding: utf-8 -*-
+#
+# Copyright © 2016 Mathieu Duponchelle <mathieu.duponchelle@opencreed.com>
+# Copyright © 2016 Collabora Ltd
+#
+# This library is free software; you can redistribute it and/or modify it under
+# the terms of the GNU Lesser General Public License as published by the Free
+# Software Foundation; either version 2.1 of the License, or (at your option)
+# any later version.
+#
+# This library is distributed in the hope that it will be useful, but WITHOUT
+# ANY WARRANTY; without even the implied warranty of MERCHANTABILITY or FITNESS
+# FOR A PARTICULAR PURPOSE.  See the GNU Lesser General Public License for more
+# details.
+#
+# You should have received a copy of the GNU Lesser General Public License
+# along with this library.  If not, see <http://www.gnu.org/licenses/>.
+
+"""
+Measure the memory used by the symbols, comments and links of a large
+API.
+
+Functions with parameters and a return value, structures with fields
+and enumerations with members are created through the database the same
+way code-parsing extensions do, documented and resolved, then the peak
+of allocated memory and the peak RSS of the process are reported. Run it
+against two versions of hotdoc to compare them.
+"""
+
+import argparse
+import json
+import resource
+import sys
+import time
+import tracemalloc
+
+from hotdoc.core.comment import Comment
+from hotdoc.core.database import Database
+from hotdoc.core.links import Link, LinkResolver
+from hotdoc.core.symbols import (
+    FunctionSymbol, ParameterSymbol, ReturnItemSymbol, StructSymbol,
+    FieldSymbol, EnumSymbol, EnumMemberSymbol, QualifiedSymbol)
+
+
+def _create_function(database, name, n_params):
+    parameters = []
+    params_comments = {}
+    for i in range(n_params):
+        argname = 'arg%d' % i
+        parameters.append(ParameterSymbol(
+            argname=argname,
+            type_tokens=[Link(None, 'BenchType', 'BenchType'), '*']))
+        params_comments[argname] = Comment(name=argname,
+                                           description='Parameter %d' % i)
+    database.add_comment(Comment(
+        name=name, params=params_comments, filename='bench.h',
+        description='Does something with %d arguments' % n_params,
+        raw_comment='/**\n * %s:\n */' % name))
+    database.create_symbol(
+        FunctionSymbol, parameters=parameters,
+        return_value=[ReturnItemSymbol(type_tokens=['int'])],
+        display_name=name, filename='bench.h', lineno=1)
+
+
+def _create_struct(database, name, n_fields):
+    members = []
+    for i in range(n_fields):
+        member_name = 'field%d' % i
+        members.append(database.create_symbol(
+            FieldSymbol, member_name=member_name,
+            qtype=QualifiedSymbol(type_tokens=['int']),
+            display_name='%s.%s' % (name, member_name),
+            unique_name='%s.%s' % (name, member_name),
+            filename='bench.h', parent_name=name))
+    database.add_comment(Comment(name=name, filename='bench.h',
+                                 description='A structure'))
+    database.create_symbol(StructSymbol, members=members, anonymous=False,
+                           raw_text='struct %s;' % name, display_name=name,
+                           filename='bench.h')
+
+
+def _create_enum(database, name, n_members):
+    members = []
+    for i in range(n_members):
+        member = database.create_symbol(
+            EnumMemberSymbol, display_name='%s_MEMBER%d' % (name, i),
+            filename='bench.h', parent_name=name)
+        member.enum_value = i
+        members.append(member)
+    database.add_comment(Comment(name=name, filename='bench.h',
+                                 description='An enumeration'))
+    database.create_symbol(EnumSymbol, members=members, anonymous=False,
+                           raw_text='enum %s;' % name, display_name=name,
+                           filename='bench.h')
+
+
+def measure(n_symbols, trace=False):
+    """
+    Create @n_symbols top-level symbols along with their children and
+    comments, then resolve their links.
+
+    Args:
+        n_symbols: int, the number of top-level symbols.
+        trace: bool, whether to measure the peak of allocated memory
+            with tracemalloc, which makes the run slower and the RSS
+            larger.
+
+    Returns:
+        dict: The measurements.
+    """
+    if trace:
+        tracemalloc.start()
+    start = time.perf_counter()
+
+    database = Database(None)
+    link_resolver = LinkResolver(database)
+    for i in range(n_symbols):
+        kind = i % 4
+        if kind < 2:
+            _create_function(database, 'bench_function%d' % i, 4)
+        elif kind == 2:
+            _create_struct(database, 'BenchStruct%d' % i, 4)
+        else:
+            _create_enum(database, 'BenchEnum%d' % i, 4)
+
+    for sym in database.get_all_symbols().values():
+        sym.comment = database.get_comment(sym.unique_name)
+        sym.update_children_comments()
+        sym.resolve_links(link_resolver)
+
+    duration = time.perf_counter() - start
+    peak = None
+    if trace:
+        _, peak = tracemalloc.get_traced_memory()
+        peak /= 1024 * 1024
+        tracemalloc.stop()
+
+    maxrss = resource.getrusage(resource.RUSAGE_SELF).ru_maxrss
+    if sys.platform == 'darwin':
+        maxrss //= 1024
+
+    return {'symbols': len(database.get_all_symbols()),
+            'peak_allocated_mb': peak,
+            'peak_rss_mb': maxrss / 1024,
+            'duration': duration}
+
+
+def main():
+    """
+    Banana banana
+    """
+    parser = argparse.ArgumentParser(description=__doc__,
+                                     formatter_class=argparse.RawDescriptionHelpFormatter)
+    parser.add_argument('--symbols', type=int, default=100000,
+                        help='Number of top-level symbols to create')
+    parser.add_argument('--tracemalloc', action='store_true',
+                        help='Also measure the peak of allocated memory')
+    parser.add_argument('--output', help='Where to write the results as JSON')
+    args = parser.parse_args()
+
+    results = measure(args.symbols, args.tracemalloc)
+    print('%(symbols)d symbols: %(peak_rss_mb).1f MB peak RSS, '
+          '%(duration).2f seconds' % results)
+    if results['peak_allocated_mb'] is not None:
+        print('%.1f MB allocated at peak' % results['peak_allocated_mb'])
+
+    if args.output:
+        with open(args.output, 'w', encoding='utf-8') as _:
+            _.write(json.dumps(results, indent=2))
+
+    return 0
+
+
+if __name__ == '__main__':
+    sys.exit(main())
@@ -0,0 +1,215 @@
+#!/usr/bin/env python3
+# -*- coding: utf-8 -*-
+#
+# Copyright © 2016 Mathieu Duponchelle <mathieu.duponchelle@opencreed.com>
+# Copyright © 2016 Collabora Ltd
+#
+# This library is free software; you can redistribute it and/or modify it under
+# the terms of the GNU Lesser General Public License as published by the Free
+# Software Foundation; either version 2.1 of the License, or (at your option)
+# any later version.
+#
+# This library is distributed in the hope that it will be useful, but WITHOUT
+# ANY WARRANTY; without even the implied warranty of MERCHANTABILITY or FITNESS
+# FOR A PARTICULAR PURPOSE.  See the GNU Lesser General Public License for more
+# details.
+#
+# You should have received a copy of the GNU Lesser General Public License
+# along with this library.  If not, see <http://www.gnu.org/licenses/>.
+
+"""
+Time complete hotdoc runs over a synthetic project.
+
+A project is generated with generate_project.py, then built once per
+scenario and per repetition with `hotdoc run --profile-phases`. The
+phases reports are collected in a single JSON file, which can be passed
+to --compare when benchmarking another version of hotdoc.
+"""
+
+import argparse
+import json
+import os
+import platform
+import shutil
+import subprocess
+import sys
+import tempfile
+import time
+
+from generate_project import ProjectGenerator, SCENARIOS, add_size_arguments
+
+EXTENSIONS = {'c': 'c-extension', 'gi': 'gi-extension'}
+
+# Phases summarized on the command line, the JSON results contain all
+# of them
+SUMMARY_PHASES = ('tree-build', 'symbol-resolution', 'formatting',
+                  'write-out', 'search-indexing')
+
+
+def _has_extension(hotdoc, scenario):
+    extension = EXTENSIONS.get(scenario)
+    if extension is None:
+        return True
+    return subprocess.call(hotdoc + ['--has-extension', extension],
+                           stdout=subprocess.DEVNULL) == 0
+
+
+def _toplevel_phases(report):
+    res = {}
+    for phase in report['phases']:
+        # Extension setup phases are nested, sum them up
+        if phase['name'] in res:
+            res[phase['name']] += phase['wall']
+        else:
+            res[phase['name']] = phase['wall']
+    return res
+
+
+def _run_scenario(hotdoc, folder, scenario, extra_args):
+    report_path = os.path.join(folder, 'report-%s.json' % scenario)
+    shutil.rmtree(os.path.join(folder, 'built-%s' % scenario),
+                  ignore_errors=True)
+
+    start = time.perf_counter()
+    res = subprocess.call(
+        hotdoc + ['run', '--conf-file', 'hotdoc-%s.json' % scenario,
+                  '--profile-phases', report_path] + extra_args,
+        cwd=folder)
+    wall = time.perf_counter() - start
+
+    if res != 0:
+        print('hotdoc failed on the %s scenario' % scenario)
+        return None
+
+    with open(report_path, 'r', encoding='utf-8') as _:
+        report = json.load(_)
+
+    return {'wall': wall,
+            'phases': _toplevel_phases(report),
+            'counts': report['counts'],
+            'report': report}
+
+
+def _median(values):
+    values = sorted(values)
+    middle = len(values) // 2
+    if len(values) % 2:
+        return values[middle]
+    return (values[middle - 1] + values[middle]) / 2
+
+
+def _summarize(runs):
+    phases = {}
+    for name in runs[0]['phases']:
+        phases[name] = _median([run['phases'].get(name, 0) for run in runs])
+    return {'wall': _median([run['wall'] for run in runs]),
+            'phases': phases,
+            'counts': runs[0]['counts']}
+
+
+def _print_summary(results, previous):
+    for scenario, result in results['scenarios'].items():
+        summary = result['summary']
+        names = ['total'] + [name for name in SUMMARY_PHASES
+                             if name in summary['phases']]
+        values = [summary['wall']] + [summary['phases'][name]
+                                      for name in names[1:]]
+
+        print('\n%s scenario, median of %d runs:' % (scenario,
+                                                     len(result['runs'])))
+        for name, value in zip(names, values):
+            line = '  %-20s %8.3fs' % (name, value)
+            if previous and scenario in previous['scenarios']:
+                prev = previous['scenarios'][scenario]['summary']
+                if name == 'total':
+                    prev_value = prev['wall']
+                else:
+                    prev_value = prev['phases'].get(name)
+                if prev_value:
+                    line += '  (%+.1f%%)' % (
+                        (value - prev_value) * 100 / prev_value)
+            print(line)
+
+
+def main():
+    """
+    Banana banana
+    """
+    parser = argparse.ArgumentParser(description=__doc__,
+                                     formatter_class=argparse.RawDescriptionHelpFormatter)
+    add_size_arguments(parser)
+    parser.add_argument('--scenarios', nargs='+', choices=SCENARIOS,
+                        default=list(SCENARIOS),
+                        help='Scenarios to benchmark')
+    parser.add_argument('--repeat', type=int, default=3,
+                        help='Number of runs of each scenario')
+    parser.add_argument('--hotdoc', default='hotdoc',
+                        help='hotdoc command to benchmark')
+    parser.add_argument('--project-dir',
+                        help='Where to generate the project, defaults to a '
+                        'temporary folder')
+    parser.add_argument('--output', default='benchmark-results.json',
+                        help='Where to write the results')
+    parser.add_argument('--compare',
+                        help='Results of a previous benchmark to compare '
+                        'with')
+    parser.add_argument('hotdoc_args', nargs=argparse.REMAINDER,
+                        help='Extra arguments passed to hotdoc, after --')
+    args = parser.parse_args()
+
+    hotdoc = args.hotdoc.split()
+    extra_args = [arg for arg in args.hotdoc_args if arg != '--']
+
+    previous = None
+    if args.compare:
+        with open(args.compare, 'r', encoding='utf-8') as _:
+            previous = json.load(_)
+
+    folder = args.project_dir or tempfile.mkdtemp(prefix='hotdoc-bench-')
+    generator = ProjectGenerator(args.pages, args.headers, args.functions)
+    generator.generate(folder)
+
+    version = subprocess.check_output(hotdoc + ['--version'],
+                                      universal_newlines=True).strip()
+    results = {'hotdoc_version': version,
+               'python': platform.python_version(),
+               'platform': platform.platform(),
+               'date': time.strftime('%Y-%m-%dT%H:%M:%S'),
+               'size': {'pages': args.pages,
+                        'headers': args.headers,
+                        'functions': args.functions,
+                        'symbols': generator.n_symbols},
+               'hotdoc_args': extra_args,
+               'scenarios': {}}
+
+    for scenario in args.scenarios:
+        if not _has_extension(hotdoc, scenario):
+            print('Skipping the %s scenario, %s is not available' % (
+                scenario, EXTENSIONS[scenario]))
+            continue
+
+        runs = []
+        for _ in range(args.repeat):
+            run = _run_scenario(hotdoc, folder, scenario, extra_args)
+            if run is None:
+                break
+            runs.append(run)
+
+        if runs:
+            results['scenarios'][scenario] = {'summary': _summarize(runs),
+                                              'runs': runs}
+
+    with open(args.output, 'w', encoding='utf-8') as _:
+        _.write(json.dumps(results, indent=2))
+
+    _print_summary(results, previous)
+    print('\nWrote results to %s' % args.output)
+
+    if not args.project_dir:
+        shutil.rmtree(folder, ignore_errors=True)
+
+    return 0
+
+
+if __name__ == '__main__':
+    sys.exit(main())
@@ -0,0 +1,251 @@
+# -*- coding: utf-8 -*-
+#
+# Copyright © 2016 Mathieu Duponchelle <mathieu.duponchelle@opencreed.com>
+# Copyright © 2016 Collabora Ltd
+#
+# This library is free software; you can redistribute it and/or modify it under
+# the terms of the GNU Lesser General Public License as published by the Free
+# Software Foundation; either version 2.1 of the License, or (at your option)
+# any later version.
+#
+# This library is distributed in the hope that it will be useful, but WITHOUT
+# ANY WARRANTY; without even the implied warranty of MERCHANTABILITY or FITNESS
+# FOR A PARTICULAR PURPOSE.  See the GNU Lesser General Public License for more
+# details.
+#
+# You should have received a copy of the GNU Lesser General Public License
+# along with this library.  If not, see <http://www.gnu.org/licenses/>.
+
+"""
+Persistent state used to only re-render what changed between two runs.
+"""
+
+import os
+import json
+import hashlib
+
+from collections import OrderedDict
+
+from hotdoc.core.formatter import Formatter
+from hotdoc.core.symbols import QualifiedSymbol
+from hotdoc.utils.loggable import debug, info, Logger, WARNING
+from hotdoc.utils.utils import digest_file
+
+
+def _page_key(page):
+    return '%s::%s' % (page.project_name, page.name)
+
+
+def _get_children_names(symbol):
+    # The symbols listed along with @symbol, such as the subclasses of a
+    # class, may be defined in other files than @symbol
+    for child in symbol.get_children_symbols():
+        if child is None:
+            continue
+        if isinstance(child, QualifiedSymbol):
+            for token in child.input_tokens:
+                yield getattr(token, 'id_', token)
+        else:
+            yield child.unique_name
+        yield from _get_children_names(child)
+
+
+class BuildCache:
+    """
+    Remembers, for each page rendered in a previous run, a digest of the
+    inputs it was rendered from (its source, the files its symbols and
+    comments were extracted from, the names of the symbols listed with
+    them, its inclusions and the links it referenced) along with what
+    rendering it produced.
+
+    Pages whose digest did not change are not formatted again, their
+    cached rendering is reused instead.
+    """
+
+    def __init__(self, private_folder, fingerprint):
+        self.__path = os.path.join(private_folder, 'build_cache.json')
+        self.__fingerprint = fingerprint
+        self.__file_digests = {}
+        self.__previous_pages = {}
+        self.__pages = OrderedDict()
+        self.__static_digests = {}
+        self.n_reused = 0
+        self.n_rendered = 0
+
+    def load(self):
+        """
+        Load the state persisted by the previous run, if it was produced
+        with the same fingerprint.
+        """
+        try:
+            with open(self.__path, 'r', encoding='utf-8') as _:
+                previous = json.load(_)
+        except (OSError, ValueError):
+            return
+
+        if previous.get('fingerprint') != self.__fingerprint:
+            info('Configuration changed, rendering all pages', 'build-cache')
+            return
+
+        self.__previous_pages = previous.get('pages', {})
+        Formatter.all_scripts.update(previous.get('scripts', []))
+        Formatter.all_stylesheets.update(previous.get('stylesheets', []))
+
+    def persist(self):
+        """
+        Persist the state of the current run.
+        """
+        info('Reused %d pages, rendered %d pages' %
+             (self.n_reused, self.n_rendered), 'build-cache')
+
+        with open(self.__path, 'w', encoding='utf-8') as _:
+            _.write(json.dumps({
+                'fingerprint': self.__fingerprint,
+                'scripts': sorted(Formatter.all_scripts),
+                'stylesheets': sorted(Formatter.all_stylesheets),
+                'pages': self.__pages}))
+
+    def restart(self):
+        """
+        Start a new run with the same cache, the current run becoming the
+        previous one, see `hotdoc.run_hotdoc.Application.update`.
+        """
+        self.__previous_pages = self.__pages
+        self.__pages = OrderedDict()
+        self.__static_digests = {}
+        self.__file_digests = {}
+        self.n_reused = 0
+        self.n_rendered = 0
+
+    def __digest_source(self, path):
+        if path not in self.__file_digests:
+            self.__file_digests[path] = digest_file(path)
+        return self.__file_digests[path]
+
+    def __static_digest(self, tree, page):
+        hasher = hashlib.sha1()
+
+        def feed(value):
+            hasher.update(str(value).encode('utf-8'))
+            hasher.update(b'\0')
+
+        feed(page.name)
+        feed(page.extension_name)
+        feed(page.raw_contents or '')
+        feed(page.title)
+        feed(page.short_description)
+        feed(json.dumps(page.meta, sort_keys=True, default=str))
+        feed(list(page.subpages))
+
+        for inclusion in tree.get_inclusions(page):
+            feed(inclusion)
+
+        if page.comment:
+            feed(page.comment.raw_comment)
+            feed(self.__digest_source(page.comment.filename))
+
+        extension = tree.project.extensions.get(page.extension_name)
+        sources = set()
+        for sym in page.symbols:
+            feed(type(sym).__name__)
+            feed(sym.unique_name)
+            if extension is not None:
+                sources.update(extension.get_symbol_sources(sym))
+            else:
+                sources.add(sym.filename)
+            if sym.comment:
+                feed(sym.comment.raw_comment)
+                feed(self.__digest_source(sym.comment.filename))
+            for name in _get_children_names(sym):
+                feed(name)
+
+        for source in sorted(source for source in sources if source):
+            feed(source)
+            feed(self.__digest_source(source))
+
+        return hasher.hexdigest()
+
+    # pylint: disable=no-self-use
+    def __digest(self, static_digest, references, link_resolver):
+        hasher = hashlib.sha1(static_digest.encode('utf-8'))
+        for name in references:
+            link = link_resolver.get_named_link(name)
+            if link is None:
+                hasher.update(('%s\0\0' % name).encode('utf-8'))
+                continue
+            hasher.update(('%s\0%s\0%s\0' % (
+                name, link.ref, link.title)).encode('utf-8'))
+        return hasher.hexdigest()
+
+    def restore_page(self, tree, page, formatter, link_resolver):
+        """
+        Try to reuse the rendering of @page from the previous run.
+
+        Returns:
+            bool: True if the page was restored and doesn't need to be
+                formatted again.
+        """
+        key = _page_key(page)
+        static_digest = self.__static_digest(tree, page)
+        self.__static_digests[key] = static_digest
+
+        entry = self.__previous_pages.get(key)
+        if entry is None:
+            return False
+
+        if not os.path.exists(formatter.get_cached_page_path(page)):
+            return False
+
+        digest = self.__digest(static_digest, entry['references'],
+                               link_resolver)
+        if digest != entry['digest']:
+            return False
+
+        page.title = entry['title']
+        page.short_description = entry['short_description']
+        page.formatted_contents = entry['formatted_contents']
+        if entry['redirect'] is not None:
+            page.meta['redirect'] = entry['redirect']
+        page.build_path = os.path.join(formatter.get_output_folder(page),
+                                       page.link.ref)
+        page.cached_paths.add(formatter.get_cached_page_path(page))
+
+        self.__pages[key] = entry
+        self.n_reused += 1
+        debug('Reusing rendering of %s' % page.name, 'build-cache')
+        return True
+
+    def store_page(self, page, references, link_resolver, n_journal):
+        """
+        Remember the rendering of @page.
+
+        Args:
+            page: hotdoc.core.tree.Page, the freshly formatted page.
+            references: list, the names of the links referenced while
+                formatting it.
+            link_resolver: hotdoc.core.links.LinkResolver, the link
+                resolver.
+            n_journal: int, the length of the logger journal before
+                formatting. Pages that issued warnings are not stored,
+                so that these warnings are issued again next time.
+        """
+        self.n_rendered += 1
+
+        for entry in Logger.journal[n_journal:]:
+            if entry.level >= WARNING:
+                return
+
+        key = _page_key(page)
+        static_digest = self.__static_digests.get(key)
+        if static_digest is None:
+            return
+
+        references = sorted(set(references))
+        self.__pages[key] = {
+            'digest': self.__digest(static_digest, references, link_resolver),
+            'references': references,
+            'title': page.title,
+            'short_description': page.short_description,
+            'formatted_contents': page.formatted_contents,
+            'redirect': page.meta.get('redirect'),
+        }
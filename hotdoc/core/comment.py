@@ -68,6 +68,12 @@ class Comment:
     # pylint: disable=too-many-arguments
     # pylint: disable=too-many-locals
 
+    __slots__ = ('name', 'params', 'topics', 'filename', 'lineno',
+                 'endlineno', 'line_offset', 'col_offset',
+                 'initial_col_offset', 'annotations', 'description', 'title',
+                 'short_description', '_extension_attrs', 'tags', 'meta',
+                 'raw_comment', 'toplevel')
+
     def __init__(self, name=u'', title=None, params=None, filename=u'',
                  lineno=-1, endlineno=-1, annotations=None,
                  tags=None, raw_comment=u'', topics=None, meta=None,
@@ -104,7 +110,7 @@ class Comment:
         else:
             self.short_description = ''
 
-        self.extension_attrs = defaultdict(lambda: defaultdict(dict))
+        self._extension_attrs = None
         self.tags = tags or {}
         self.meta = meta or {}
         self.raw_comment = raw_comment
@@ -117,16 +123,27 @@ class Comment:
             cleaned_meta[key.replace('_', '-').lower()] = value
         return cleaned_meta
 
+    @property
+    def extension_attrs(self):
+        """
+        Attributes set by the extensions, allocated on first use.
+        """
+        if self._extension_attrs is None:
+            self._extension_attrs = defaultdict(lambda: defaultdict(dict))
+        return self._extension_attrs
+
     def __getstate__(self):
         # Return a copy
-        res = dict(self.__dict__)
+        res = {key: getattr(self, key) for key in Comment.__slots__
+               if key != '_extension_attrs'}
         res['extension_attrs'] = None
         return res
 
-    # pylint: disable=attribute-defined-outside-init
     def __setstate__(self, state):
-        self.__dict__ = state
-        self.extension_attrs = defaultdict(lambda: defaultdict(dict))
+        for key, value in state.items():
+            if key != 'extension_attrs':
+                setattr(self, key, value)
+        self._extension_attrs = None
 
 
 class Annotation:
@@ -22,6 +22,7 @@ Implement a high-level config parser for hotdoc.
 import os
 import json
 import glob
+import hashlib
 
 from hotdoc.utils.utils import OrderedSet
 from hotdoc.utils.utils import flatten_list
@@ -117,6 +118,22 @@ class Config:
         self.__cli = command_line_args or {}
         self.__defaults = defaults or {}
 
+    def reload(self):
+        """
+        Load the configuration file again, to take into account changes
+        made to it since this object was created.
+        """
+        if self.conf_file:
+            self.__config = load_config_json(self.conf_file)
+
+    @staticmethod
+    def clear_pattern_cache():
+        """
+        Forget the files matched by the source patterns, for them to be
+        matched again against the files that currently exist.
+        """
+        Config.__pattern_cache.clear()
+
     def __abspath(self, path, from_conf):
         if path is None:
             return None
@@ -331,6 +348,33 @@ class Config:
 
         return sources
 
+    def get_source_folders(self):
+        """
+        Retrieve the folders the source patterns are matched in, where
+        new sources may appear.
+
+        Returns:
+            utils.utils.OrderedSet: The absolute paths of the folders.
+        """
+        folders = OrderedSet()
+        for key in sorted(set(self.__config) | set(self.__cli)):
+            if not key.endswith('sources'):
+                continue
+
+            if key in self.__cli:
+                patterns, from_conf = self.__cli[key], False
+            else:
+                patterns, from_conf = self.__config[key], True
+
+            for pattern in patterns or []:
+                folder = self.__abspath(pattern, from_conf)
+                while folder != os.path.dirname(folder) and (
+                        glob.has_magic(folder) or not os.path.isdir(folder)):
+                    folder = os.path.dirname(folder)
+                folders.add(folder)
+
+        return folders
+
     def get_dependencies(self):
         """
         Retrieve the set of all dependencies for a given configuration.
@@ -359,6 +403,18 @@ class Config:
         cwd = os.getcwd()
         return [os.path.relpath(fname, cwd) for fname in all_deps if fname]
 
+    def get_digest(self):
+        """
+        Compute a digest of the configuration, command-line arguments
+        included.
+
+        Returns:
+            str: The sha1 hex digest of the configuration.
+        """
+        contents = json.dumps({'config': self.__config, 'cli': self.__cli},
+                              sort_keys=True, default=str)
+        return hashlib.sha1(contents.encode('utf-8')).hexdigest()
+
     # pylint: disable=too-many-branches
     def dump(self, conf_file=None):
         """
@@ -20,8 +20,12 @@
 """
 import os
 import json
+import pickle
+import pathlib
+import sqlite3
+import tempfile
 
-from collections import defaultdict, OrderedDict
+from collections import OrderedDict
 
 # pylint: disable=import-error
 # pylint: disable=import-error
@@ -41,6 +45,24 @@ class RedefinedSymbolException(HotdocException):
 Logger.register_warning_code(
     'symbol-redefined', RedefinedSymbolException, 'extension')
 
+# How `Database.persist` can store the database in the private folder
+DATABASE_FORMATS = ('json', 'ndjson', 'sqlite')
+
+# The file the database is stored in with the sqlite format
+SQLITE_DATABASE = 'hotdoc.db'
+
+SQLITE_SCHEMA = """
+CREATE TABLE symbols (unique_name TEXT PRIMARY KEY, type TEXT,
+                      filename TEXT, page TEXT, project_name TEXT,
+                      state BLOB);
+CREATE INDEX symbols_type ON symbols (type);
+CREATE INDEX symbols_filename ON symbols (filename);
+CREATE INDEX symbols_page ON symbols (page);
+CREATE TABLE aliases (alias TEXT PRIMARY KEY, unique_name TEXT);
+CREATE TABLE comments (name TEXT PRIMARY KEY, filename TEXT, state BLOB);
+CREATE INDEX comments_filename ON comments (filename);
+"""
+
 # pylint: disable=too-few-public-methods
 
 
@@ -51,6 +73,189 @@ def serialize(obj):
         return obj.__dict__
 
 
+def _write_json_object(path, items):
+    # Entries are serialized one at a time
+    with open(path, 'w', encoding='utf8') as f:
+        f.write('{')
+        separator = '\n'
+        for key, value in items:
+            f.write('%s%s: %s' % (separator, json.dumps(key),
+                                  json.dumps(value, default=serialize)))
+            separator = ',\n'
+        f.write('\n}\n')
+
+
+def _write_json_list(path, values):
+    with open(path, 'w', encoding='utf8') as f:
+        f.write('[')
+        separator = '\n'
+        for value in values:
+            f.write('%s%s' % (separator, json.dumps(value)))
+            separator = ',\n'
+        f.write('\n]\n')
+
+
+def _get_offsets_path(path):
+    return '%s.offsets.json' % os.path.splitext(path)[0]
+
+
+def _write_ndjson(path, items):
+    offsets = OrderedDict()
+    with open(path, 'wb') as f:
+        for key, value in items:
+            offsets[key] = f.tell()
+            f.write(json.dumps([key, value], default=serialize).encode(
+                'utf-8'))
+            f.write(b'\n')
+
+    with open(_get_offsets_path(path), 'w', encoding='utf8') as f:
+        f.write(json.dumps(offsets))
+
+
+class NDJSONIndex:
+    """
+    Read access to a file written out with the ndjson format, such as
+    `all_comments.ndjson`.
+
+    Each line holds the name and the serialized value of one entry, and
+    the offset of each line is stored in an index next to the file, so
+    an entry can be read back without parsing the others.
+    """
+
+    def __init__(self, path):
+        """
+        Args:
+            path: str, the ndjson file.
+        """
+        self.__file = open(path, 'rb')
+        with open(_get_offsets_path(path), 'r', encoding='utf8') as f:
+            self.__offsets = json.load(f)
+
+    def close(self):
+        """
+        Banana banana
+        """
+        self.__file.close()
+
+    def __enter__(self):
+        return self
+
+    def __exit__(self, *args):
+        self.close()
+
+    def __contains__(self, name):
+        return name in self.__offsets
+
+    def __iter__(self):
+        return iter(self.__offsets)
+
+    def get(self, name):
+        """
+        Returns:
+            object: the deserialized value of the entry @name, or None.
+        """
+        offset = self.__offsets.get(name)
+        if offset is None:
+            return None
+
+        self.__file.seek(offset)
+        return json.loads(self.__file.readline().decode('utf-8'))[1]
+
+
+def _pickle_or_none(obj):
+    try:
+        return pickle.dumps(obj, protocol=pickle.HIGHEST_PROTOCOL)
+    # pylint: disable=broad-except
+    except Exception as exc:
+        debug('Could not store %s: %s' % (obj, exc), 'database')
+        return None
+
+
+def _unpickle_or_none(state):
+    if state is None:
+        return None
+    return pickle.loads(state)
+
+
+class SQLiteIndex:
+    """
+    Read access to a database persisted with the sqlite format.
+
+    Only what is asked for is loaded, symbols and comments are unpickled
+    when looked up by name, so tools such as the since markers check can
+    query the names of the symbols of a previous run without loading all
+    of them.
+    """
+
+    def __init__(self, path):
+        """
+        Args:
+            path: str, the database, opened read-only.
+        """
+        uri = pathlib.Path(path).absolute().as_uri() + '?mode=ro'
+        self.__conn = sqlite3.connect(uri, uri=True)
+
+    def close(self):
+        """
+        Banana banana
+        """
+        self.__conn.close()
+
+    def __enter__(self):
+        return self
+
+    def __exit__(self, *args):
+        self.close()
+
+    def __contains__(self, unique_name):
+        row = self.__conn.execute(
+            'SELECT 1 FROM symbols WHERE unique_name = ?',
+            (unique_name,)).fetchone()
+        return row is not None
+
+    def get_symbol_names(self, page=None, filename=None, type_name=None):
+        """
+        Returns:
+            list: the unique names of the symbols, in creation order,
+                only the ones in @page, defined in @filename or of the
+                @type_name class when these are set.
+        """
+        query = 'SELECT unique_name FROM symbols'
+        conditions = []
+        args = []
+        for column, value in (('page', page), ('filename', filename),
+                              ('type', type_name)):
+            if value is not None:
+                conditions.append('%s = ?' % column)
+                args.append(value)
+        if conditions:
+            query += ' WHERE ' + ' AND '.join(conditions)
+        query += ' ORDER BY rowid'
+        return [row[0] for row in self.__conn.execute(query, args)]
+
+    def get_symbol(self, name):
+        """
+        Returns:
+            symbols.Symbol: the symbol @name, or the one it is an alias
+                of, or None.
+        """
+        row = self.__conn.execute(
+            'SELECT state FROM symbols WHERE unique_name = ? UNION ALL '
+            'SELECT symbols.state FROM aliases JOIN symbols '
+            'ON aliases.unique_name = symbols.unique_name '
+            'WHERE alias = ?', (name, name)).fetchone()
+        return _unpickle_or_none(row[0]) if row else None
+
+    def get_comment(self, name):
+        """
+        Returns:
+            comment.Comment: the comment of the symbol @name, or None.
+        """
+        row = self.__conn.execute(
+            'SELECT state FROM comments WHERE name = ?', (name,)).fetchone()
+        return _unpickle_or_none(row[0]) if row else None
+
+
 # pylint: disable=too-many-instance-attributes
 class Database:
     """
@@ -66,9 +271,12 @@ class Database:
 
         self.__comments = OrderedDict()
         self.__symbols = OrderedDict()
-        self.__aliased = defaultdict(list)
+        self.__aliased = {}
         self.__aliases = OrderedDict()
         self.__private_folder = private_folder or '/tmp'
+        # Bumped whenever symbols are added or renamed, so that what was
+        # not found in the database can be looked up again
+        self.symbols_generation = 0
 
     def add_comment(self, comment):
         """
@@ -139,23 +347,72 @@ class Database:
 
         if not isinstance(symbol, ProxySymbol):
             self.__symbols[unique_name] = symbol
-        self.__aliased[unique_name].extend(aliases)
+        self.__add_aliases(unique_name, symbol, aliases)
 
-        for alias in self.__aliased[unique_name]:
+        return symbol
+
+    def __add_aliases(self, unique_name, symbol, aliases):
+        if aliases:
+            self.__aliased.setdefault(unique_name, []).extend(aliases)
+
+        for alias in self.__get_aliases(unique_name):
             self.__aliases[alias] = symbol
 
-        return symbol
+        self.symbols_generation += 1
+
+    def merge(self, other):
+        """
+        Add the comments and symbols of another database, usually filled
+        in a worker process, as if they had been added to this one.
+
+        Args:
+            other (Database): the database to merge.
+
+        Returns:
+            set: The unique names of the symbols that were added, symbols
+                that were already defined are left out, as when creating
+                them.
+        """
+        merged = set()
+        for comment in other.__comments.values():
+            self.add_comment(comment)
+
+        for unique_name, symbol in other.__symbols.items():
+            if unique_name in self.__symbols:
+                warn('symbol-redefined', "%s(unique_name=%s, filename=%s, project=%s)"
+                     " has already been defined: %s" % (type(symbol).__name__, unique_name,
+                                                        symbol.filename, symbol.project_name,
+                                                        self.get_symbol(unique_name)))
+                continue
+
+            self.__symbols[unique_name] = symbol
+            self.__add_aliases(unique_name, symbol,
+                               other.__get_aliases(unique_name))
+            merged.add(unique_name)
+
+        return merged
+
+    def __getstate__(self):
+        state = dict(self.__dict__)
+        # Handlers are connected to the signal of the receiving database
+        del state['comment_added_signal']
+        return state
+
+    def __setstate__(self, state):
+        self.__dict__.update(state)
+        self.comment_added_signal = Signal()
 
     def rename_symbol(self, unique_name, target):
         sym = self.__symbols.get(target)
         if sym:
-            for alias in self.__aliased[unique_name]:
+            for alias in self.__get_aliases(unique_name):
                 alias.target = unique_name
             if sym.unique_name == sym.display_name:
                 sym.display_name = unique_name
             sym.unique_name = unique_name
             del self.__symbols[target]
             self.__symbols[unique_name] = sym
+            self.symbols_generation += 1
             debug('Renamed symbol with unique name %s to %s' %
                   (target, unique_name))
         return sym
@@ -167,9 +424,20 @@ class Database:
             os.makedirs(os.path.dirname(fname), exist_ok=True)
         return fname
 
-    def persist(self):
+    def persist(self, database_format='json', get_page=None):
         """
-        Banana banana
+        Store the database in the private folder.
+
+        Args:
+            database_format: str, one of `DATABASE_FORMATS`. With json,
+                the names of the symbols and the comments are written
+                out to `symbol_index.json` and `all_comments.json`. With
+                ndjson, they are written out one per line to
+                `symbol_index.ndjson` and `all_comments.ndjson`, see
+                `NDJSONIndex`. With sqlite, symbols and comments are
+                stored in `SQLITE_DATABASE`, see `SQLiteIndex`.
+            get_page: callable, returns the page a symbol, by unique
+                name, ended up in, for the sqlite format.
         """
         # Let's try and use the name of the symbols comments ended up
         # associated with as the keys
@@ -183,15 +451,70 @@ class Database:
                 else:
                     resolved_comments[name] = comment
 
-        with open(os.path.join(self.__private_folder, 'all_comments.json'), 'w', encoding='utf8') as f:
-            f.write(json.dumps(resolved_comments, default=serialize, indent=2))
+        if database_format == 'sqlite':
+            self.__persist_sqlite(resolved_comments, get_page)
+            return
+
+        if database_format == 'ndjson':
+            _write_ndjson(os.path.join(self.__private_folder,
+                                       'all_comments.ndjson'),
+                          resolved_comments.items())
+            _write_ndjson(os.path.join(self.__private_folder,
+                                       'symbol_index.ndjson'),
+                          ((unique_name, type(sym).__name__)
+                           for unique_name, sym in self.__symbols.items()))
+            return
 
-        with open(os.path.join(self.__private_folder, 'symbol_index.json'), 'w', encoding='utf8') as f:
-            f.write(json.dumps(list(self.get_all_symbols().keys()),
-                    default=serialize, indent=2))
+        _write_json_object(os.path.join(self.__private_folder,
+                                        'all_comments.json'),
+                           resolved_comments.items())
+        _write_json_list(os.path.join(self.__private_folder,
+                                      'symbol_index.json'),
+                         self.get_all_symbols().keys())
+
+    def __persist_sqlite(self, resolved_comments, get_page):
+        def get_page_name(unique_name):
+            page = get_page(unique_name) if get_page else None
+            return page.name if page else None
+
+        symbols = ((unique_name, type(sym).__name__, sym.filename,
+                    get_page_name(unique_name), sym.project_name,
+                    _pickle_or_none(sym))
+                   for unique_name, sym in self.__symbols.items())
+        aliases = ((alias, sym.unique_name)
+                   for alias, sym in self.__aliases.items())
+        comments = ((name, comment.filename, _pickle_or_none(comment))
+                    for name, comment in resolved_comments.items())
+
+        # Readers of the previous database see it until the new one is
+        # complete
+        path = os.path.join(self.__private_folder, SQLITE_DATABASE)
+        fd, tmp_path = tempfile.mkstemp(dir=self.__private_folder)
+        os.close(fd)
+        try:
+            conn = sqlite3.connect(tmp_path)
+            try:
+                with conn:
+                    conn.executescript(SQLITE_SCHEMA)
+                    conn.executemany(
+                        'INSERT INTO symbols VALUES (?, ?, ?, ?, ?, ?)',
+                        symbols)
+                    conn.executemany(
+                        'INSERT OR REPLACE INTO aliases VALUES (?, ?)',
+                        aliases)
+                    conn.executemany(
+                        'INSERT OR REPLACE INTO comments VALUES (?, ?, ?)',
+                        comments)
+            finally:
+                conn.close()
+            os.replace(tmp_path, path)
+        finally:
+            if os.path.exists(tmp_path):
+                os.unlink(tmp_path)
 
     def __get_aliases(self, name):
-        return self.__aliased[name]
+        # Not a defaultdict, looking up names must not add entries
+        return self.__aliased.get(name, ())
 
     # pylint: disable=unused-argument
     def get_symbol(self, name, prefer_class=False):
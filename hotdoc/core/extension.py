@@ -392,6 +392,43 @@ class Extension(Configurable):
         """
         pass
 
+    def scan(self):
+        """
+        Extension subclasses may implement this instead of scanning their
+        source files in `Extension.setup`, if all they do while scanning
+        is creating symbols and comments with `Extension.create_symbol`
+        and `Extension.add_comment`.
+
+        This is called right after `Extension.setup`, except for
+        subprojects scanned in worker processes, see
+        `project.Project.setup`, in which case this is called in the
+        worker, and `Extension.restore_scan` in the main process.
+        """
+        pass
+
+    def take_scan(self):
+        """
+        Returns:
+            tuple: the symbols and comments created by `Extension.scan`,
+                in a form that can be sent to another process and passed
+                to `Extension.restore_scan` there.
+        """
+        return (self.app.database, self._created_symbols,
+                self.__toplevel_comments)
+
+    def restore_scan(self, database, created_symbols, toplevel_comments):
+        """
+        Restore what was scanned in another process, see
+        `Extension.take_scan`.
+        """
+        merged = self.app.database.merge(database)
+        for filename, symbol_names in created_symbols.items():
+            # Symbols already defined by another project are not ours
+            symbol_names = [name for name in symbol_names if name in merged]
+            if symbol_names:
+                self._created_symbols[filename] |= symbol_names
+        self.__toplevel_comments |= toplevel_comments
+
     @staticmethod
     def get_dependencies():
         """
@@ -629,6 +666,22 @@ class Extension(Configurable):
     def _make_formatter(self):
         return Formatter(self)
 
+    # pylint: disable=no-self-use
+    def get_symbol_sources(self, symbol):
+        """
+        Banana banana
+
+        Args:
+            symbol: hotdoc.core.symbols.Symbol, a symbol created by this
+                extension.
+
+        Returns:
+            list: The paths of the files @symbol was generated from, the
+                pages listing it are rendered again when one of them
+                changes.
+        """
+        return [symbol.filename]
+
     def get_possible_path(self, name):
         self.__find_package_root()
 
@@ -150,6 +150,13 @@ class Formatter(Configurable):
     all_stylesheets = set()
     get_extra_files_signal = Signal()
     initialized = False
+    # Rendered pages are kept in memory until they are written out, up to
+    # that many bytes, pages beyond that are cached on disk.
+    pages_memory_budget = 512 * 1024 * 1024
+    pages_memory_size = 0
+    # Set in write out workers, the main process emits writing_page_signal
+    # for them once the page is written, with no lxml tree.
+    defer_writing_page_signal = False
 
     def __init__(self, extension):
         """
@@ -197,6 +204,8 @@ class Formatter(Configurable):
         self.extra_assets = None
         self.add_anchors = False
         self.number_headings = False
+        # Emitted with (formatter, page, path, lxml_tree), lxml_tree
+        # is None when pages are written out by worker processes.
         self.writing_page_signal = Signal()
         self.formatting_page_signal = Signal()
         self.formatting_symbol_signal = Signal()
@@ -462,36 +471,69 @@ class Formatter(Configurable):
 
         namespace = etree.FunctionNamespace('uri:hotdoc')
         namespace['subpages'] = subpages
-        html_output = os.path.join(output, 'html')
 
-        rel_path = os.path.join(self.get_output_folder(page), page.link.ref)
-        cached_path = os.path.join(self.__cache_dir, rel_path)
-        full_path = os.path.join(html_output, rel_path)
+        cached_path = self.get_cached_page_path(page)
+        full_path = self.get_page_output_path(page, output)
 
         if not os.path.exists(os.path.dirname(full_path)):
             os.makedirs(os.path.dirname(full_path))
-        with open(cached_path, 'r', encoding='utf-8') as _:
-            doc_root = etree.HTML(_.read())
+
+        if page.detailed_description is not None:
+            doc_root = etree.HTML(page.detailed_description)
+        else:
+            with open(cached_path, 'r', encoding='utf-8') as _:
+                doc_root = etree.HTML(_.read())
 
         self.__validate_html(self.extension.project, page, doc_root)
 
-        self.writing_page_signal(self, page, full_path, doc_root)
+        if not Formatter.defer_writing_page_signal:
+            self.writing_page_signal(self, page, full_path, doc_root)
         with open(full_path, 'w', encoding='utf-8') as _:
             transformed = str(self.__page_transform(doc_root))
             _.write('<!DOCTYPE html>\n%s' % transformed)
 
+    def get_page_output_path(self, page, output):
+        """
+        Returns:
+            str: The path @page is written out to in @output.
+        """
+        return os.path.join(output, 'html', self.get_output_folder(page),
+                            page.link.ref)
+
+    def get_cached_page_path(self, page):
+        """
+        Returns:
+            str: The path @page is cached at between formatting and
+                writing out.
+        """
+        return os.path.join(self.__cache_dir,
+                            self.get_output_folder(page),
+                            page.link.ref)
+
     def cache_page(self, page):
         """
-        Banana banana
+        Keep the rendering of @page until it is written out.
+
+        It stays in memory as long as `Formatter.pages_memory_budget`
+        allows it, and is otherwise cached on disk. It is also cached on
+        disk for incremental builds to reuse it.
         """
-        full_path = os.path.join(self.__cache_dir,
-                                 self.get_output_folder(page),
-                                 page.link.ref)
+        size = len(page.detailed_description)
+        in_memory = Formatter.pages_memory_size + size <= \
+            Formatter.pages_memory_budget
+        if in_memory:
+            Formatter.pages_memory_size += size
+            if self.extension.app.build_cache is None:
+                return
+
+        full_path = self.get_cached_page_path(page)
         os.makedirs(os.path.dirname(full_path), exist_ok=True)
         with open(full_path, 'w', encoding='utf-8') as _:
             _.write(page.detailed_description)
 
         page.cached_paths.add(full_path)
+        if not in_memory:
+            page.detailed_description = None
 
     # pylint: disable=no-self-use
     def _get_extension(self):
@@ -1036,6 +1078,12 @@ class Formatter(Configurable):
         group.add_argument("--html-number-headings", action="store_true",
                            dest="html_number_headings",
                            help="Enable html headings numbering")
+        group.add_argument("--html-pages-memory", action="store", type=int,
+                           dest="html_pages_memory",
+                           help="Maximum size, in MB, of the rendered pages "
+                           "kept in memory until they are written out, "
+                           "pages beyond that are cached on disk",
+                           default=512)
 
     def __download_theme(self, uri):
         sha = urllib.parse.parse_qs(uri.query).get('sha256')
@@ -1100,6 +1148,13 @@ class Formatter(Configurable):
 
     def parse_toplevel_config(self, config):
         """Parse @config to setup @self state."""
+        if config.get('low_memory'):
+            Formatter.pages_memory_budget = 0
+        else:
+            Formatter.pages_memory_budget = int(
+                config.get('html_pages_memory', 512)) * 1024 * 1024
+        Formatter.pages_memory_size = 0
+
         if not Formatter.initialized:
             html_theme = config.get('html_theme', 'default')
 
@@ -19,13 +19,22 @@
 """
 Banana banana
 """
-from hotdoc.utils.signals import Signal
+import contextvars
 import urllib.parse
+from hotdoc.utils.signals import Signal
 from hotdoc.utils.loggable import Logger, warn
+from hotdoc.utils.profiling import Profiler
 from hotdoc.core.exceptions import MissingLinkException
 Logger.register_warning_code('mandatory-link-not-found', MissingLinkException,
                              domain='links')
 
+_PLAIN_NAME = urllib.parse.urlparse('')
+
+# Set by extensions whose handlers of the resolving signals resolve links
+# differently depending on what is being rendered, for example in which
+# language. Its value must be hashable, links are resolved once per value.
+LINK_CONTEXT = contextvars.ContextVar('link_context', default=None)
+
 
 def dict_to_html_attrs(dict_):
     """
@@ -41,8 +50,19 @@ class Link:
     """
     resolving_title_signal = Signal()
 
+    # (id_, ref, title, context) -> resolved title, for as long as the
+    # same handlers are connected to resolving_title_signal
+    __titles = {}
+    __titles_slots = None
+
+    # How many times the ref or title of a link changed, see
+    # `LinkResolver.get_link_table`
+    n_changes = 0
+
+    __slots__ = ('_ref', '_title', '__mandatory', '__warned', 'id_')
+
     def __init__(self, ref, title, id_, mandatory=False):
-        self.ref = None
+        self._ref = None
         self._title = None
         # Whether the link should be always resolved when true and a warning
         # otherwise
@@ -53,25 +73,57 @@ class Link:
         if title:
             self._title = str(title)
         if ref:
-            self.ref = str(ref)
+            self._ref = str(ref)
 
         self.id_ = id_
 
+    @property
+    def ref(self):
+        """
+        Banana banana
+        """
+        return self._ref
+
+    @ref.setter
+    def ref(self, value):
+        if value != self._ref:
+            Link.n_changes += 1
+        self._ref = value
+
     @property
     def title(self):
         """
         Banana banana
         """
+        slots = Link.resolving_title_signal.slots
+        if slots is not Link.__titles_slots:
+            Link.__titles = {}
+            Link.__titles_slots = slots
+
+        key = (self.id_, self.ref, self._title, LINK_CONTEXT.get())
+        try:
+            title = Link.__titles[key]
+            Profiler.count('link-titles-cached')
+            return title
+        except KeyError:
+            Profiler.count('link-titles-resolved')
+
         resolved_title = Link.resolving_title_signal(self)
         resolved_title = [elem for elem in resolved_title if elem is not
                           None]
         if resolved_title:
-            return str(resolved_title[0])
-        return self._title
+            title = str(resolved_title[0])
+        else:
+            title = self._title
+        Link.__titles[key] = title
+        return title
 
     @title.setter
     def title(self, value):
-        self._title = str(value)
+        value = str(value)
+        if value != self._title:
+            Link.n_changes += 1
+        self._title = value
 
     def get_title(self):
         """
@@ -85,7 +137,8 @@ class Link:
         """
         Banana banana
         """
-        res = link_resolver.resolving_link_signal(self)
+        link_resolver.record_reference(self.id_)
+        res = link_resolver.resolve(self)
 
         if not res:
             ref = self.ref
@@ -119,22 +172,164 @@ class LinkResolver:
         self.__doc_db = database
         self.get_link_signal = Signal()
         self.resolving_link_signal = Signal(optimized=True)
+        self.__references = None
+        # How many times get_named_link was called, for example to know
+        # whether rendering something involved any link
+        self.n_lookups = 0
+        # The names that could not be resolved, for each set of handlers
+        # connected to get_link_signal, until a link or a symbol is added
+        self.__unresolved_by_slots = {}
+        self.__unresolved = set()
+        self.__unresolved_slots = None
+        self.__symbols_generation = None
+        # (id_, ref, title, context) -> what resolving_link_signal
+        # returned, for as long as the same handlers are connected to it
+        self.__resolved = {}
+        self.__resolved_slots = None
+        # LINK_CONTEXT -> the names resolved in it, see get_link_table
+        self.__link_tables = {}
+        self.__link_tables_stamp = None
+
+    def start_recording(self):
+        """
+        Start recording the names of the links looked up or resolved,
+        until `stop_recording` is called.
+        """
+        self.__references = []
+
+    def stop_recording(self):
+        """
+        Stop recording link references.
+
+        Returns:
+            list: the names of the links referenced since
+                `start_recording` was called.
+        """
+        references = self.__references or []
+        self.__references = None
+        return references
+
+    def record_reference(self, name):
+        """
+        Banana banana
+        """
+        if self.__references is not None and name:
+            self.__references.append(name)
+
+    def resolve(self, link):
+        """
+        Emit `resolving_link_signal` for @link, only once for a given
+        link and `LINK_CONTEXT`, see `Link.get_link`.
+
+        Returns:
+            object: what the handlers returned.
+        """
+        slots = self.resolving_link_signal.slots
+        if slots is not self.__resolved_slots:
+            self.__resolved = {}
+            self.__resolved_slots = slots
+
+        # pylint: disable=protected-access
+        key = (link.id_, link.ref, link._title, LINK_CONTEXT.get())
+        try:
+            res = self.__resolved[key]
+            Profiler.count('link-refs-cached')
+            return res
+        except KeyError:
+            Profiler.count('link-refs-resolved')
+
+        res = self.resolving_link_signal(link)
+        self.__resolved[key] = res
+        return res
+
+    def get_link_table(self):
+        """
+        The cmark module looks up the names it resolves in the returned
+        table, and adds the ones it resolved with `get_named_link` to it.
+
+        Returns:
+            dict: names -> (ref, extra_attrs, title, id_) tuples, as
+                resolved in the current `LINK_CONTEXT`, for as long as
+                the same handlers are connected to the resolving signals
+                and no link or symbol is added or changed.
+        """
+        stamp = (self.resolving_link_signal.slots,
+                 Link.resolving_title_signal.slots,
+                 self.__doc_db.symbols_generation, Link.n_changes)
+        if stamp != self.__link_tables_stamp:
+            self.__link_tables = {}
+            self.__link_tables_stamp = stamp
+
+        context = LINK_CONTEXT.get()
+        table = self.__link_tables.get(context)
+        if table is None:
+            table = self.__link_tables[context] = {}
+        return table
+
+    def add_link_table_hits(self, hits):
+        """
+        Record the names the cmark module found in a table returned by
+        `get_link_table`, as if they had been looked up with
+        `get_named_link` and their links resolved.
+
+        Args:
+            hits: list, of (name, id_) tuples.
+        """
+        self.n_lookups += len(hits)
+        Profiler.count('link-table-hits', len(hits))
+        for name, id_ in hits:
+            self.record_reference(name)
+            self.record_reference(id_)
 
     # pylint: disable=too-many-return-statements
     def get_named_link(self, name):
         """
         Banana banana
         """
-        return self.__get_named_link(name)
+        self.record_reference(name)
+        self.n_lookups += 1
+
+        if self.__symbols_generation != self.__doc_db.symbols_generation:
+            self.__forget_unresolved()
+            self.__symbols_generation = self.__doc_db.symbols_generation
+        slots = self.get_link_signal.slots
+        if slots is not self.__unresolved_slots:
+            self.__unresolved = self.__unresolved_by_slots.setdefault(
+                slots, set())
+            self.__unresolved_slots = slots
+
+        if name in self.__unresolved:
+            Profiler.count('links-unresolved')
+            return None
+
+        link = self.__get_named_link(name)
+        if link is None:
+            self.__unresolved.add(name)
+            Profiler.count('links-unresolved')
+        else:
+            Profiler.count('links-resolved')
+        return link
+
+    def __forget_unresolved(self):
+        if self.__unresolved_by_slots:
+            self.__unresolved_by_slots.clear()
+            self.__unresolved = set()
+            self.__unresolved_slots = None
 
     def __get_named_link(self, name, recursed=False):
-        url_components = urllib.parse.urlparse(name)
+        link = self.__links.get(name)
+        if link is not None:
+            return link
+
+        # Most names are plain symbol names, only parse the others
+        if ':' in name or '/' in name or '#' in name:
+            url_components = urllib.parse.urlparse(name)
+        else:
+            url_components = _PLAIN_NAME
+
         if bool(url_components.netloc):
             return Link(name, None, name)
 
-        if name in self.__links:
-            return self.__links[name]
-
         sym = self.__doc_db.get_symbol(name)
         if sym and sym.link:
             self.__links[name] = sym.link
@@ -166,6 +361,8 @@ class LinkResolver:
         """
         if link.id_ not in self.__links:
             self.__links[link.id_] = link
+            self.__forget_unresolved()
+            self.__link_tables = {}
 
     def upsert_link(self, link, overwrite_ref=False):
         """
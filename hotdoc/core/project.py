@@ -24,9 +24,10 @@ import io
 import re
 import linecache
 import shutil
+import multiprocessing
 import urllib.parse
 
-from collections import OrderedDict
+from collections import OrderedDict, namedtuple
 
 from lxml import etree
 
@@ -34,11 +35,14 @@ from hotdoc.core import inclusions
 from hotdoc.core.extension import Extension
 from hotdoc.core.comment import Tag
 from hotdoc.core.config import Config
+from hotdoc.core.database import Database
+from hotdoc.core.exceptions import HotdocException
 from hotdoc.core.tree import Tree
-from hotdoc.utils.loggable import info, error
+from hotdoc.utils.loggable import info, error, Logger
 from hotdoc.utils.configurable import Configurable
 from hotdoc.utils.utils import OrderedSet
 from hotdoc.utils.signals import Signal
+from hotdoc.utils.profiling import Profiler
 from hotdoc.parsers.sitemap import SitemapParser
 
 
@@ -49,6 +53,23 @@ LANG_MAPPING = {
     'py': 'python'
 }
 
+# What a scanning worker sends back to the main process for each subproject
+SubprojectScan = namedtuple('SubprojectScan', [
+    'extensions', 'journal', 'n_fatal_warnings', 'error', 'profile'])
+
+# Set by Project before forking its scanning workers, which inherit it
+_SCANNING_STATE = None
+
+
+def _init_scanning_worker():
+    # The main process prints the journal of the workers as it merges it
+    Logger.silent = True
+
+
+def _scan_subproject_in_worker(index):
+    # pylint: disable=protected-access
+    return _SCANNING_STATE[index]._scan()
+
 
 class CoreExtension(Extension):
     """
@@ -172,21 +193,44 @@ class Project(Configurable):
         """
         return self.app.private_folder
 
-    def setup(self):
+    def setup(self, scan=None):
         """
         Banana banana
+
+        Args:
+            scan: SubprojectScan, what was scanned for this project in a
+                worker process, if anything.
         """
         info('Setting up %s' % self.project_name, 'project')
 
+        scans = {}
+        if scan is not None:
+            Logger.replay(scan.journal, scan.n_fatal_warnings)
+            Profiler.merge(scan.profile)
+            if scan.error is not None:
+                raise HotdocException(scan.error)
+            scans = scan.extensions
+
         for extension in list(self.extensions.values()):
             info('Setting up %s' % extension.extension_name)
-            extension.setup()
-
-        sitemap = SitemapParser().parse(self.sitemap_path)
-        self.tree.build(sitemap, self.extensions)
+            with Profiler.phase('extension-setup', project=self.project_name,
+                                extension=extension.extension_name):
+                extension.setup()
+                if extension.extension_name in scans:
+                    extension.restore_scan(
+                        *scans[extension.extension_name])
+                else:
+                    extension.scan()
+
+        with Profiler.phase('tree-build', project=self.project_name):
+            sitemap = SitemapParser().parse(self.sitemap_path)
+            self.tree.build(sitemap, self.extensions)
+            self.__setup_subprojects()
 
         info("Resolving symbols", 'resolution')
-        self.tree.resolve_symbols(self.app.database, self.app.link_resolver)
+        with Profiler.phase('symbol-resolution', project=self.project_name):
+            self.tree.resolve_symbols(self.app.database,
+                                      self.app.link_resolver)
 
     def format(self, link_resolver, output):
         """
@@ -224,15 +268,65 @@ class Project(Configurable):
             action='append', dest='extra_assets', default=[])
 
     def add_subproject(self, fname, conf_path):
-        """Creates and adds a new subproject."""
+        """
+        Creates and adds a new subproject, it is set up once the tree
+        of this project is built, see `Project.setup`.
+        """
         config = Config(conf_file=conf_path)
         proj = Project(self.app,
                        dependency_map=self.dependency_map)
         proj.parse_name_from_config(config)
         proj.parse_config(config)
-        proj.setup()
         self.subprojects[fname] = proj
 
+    def _scan(self):
+        n_journal = len(Logger.journal)
+        n_fatal_warnings = Logger.n_fatal_warnings
+        # Only send back what is recorded for that project
+        Profiler.take()
+        error_message = None
+
+        scans = OrderedDict()
+        try:
+            for extension in list(self.extensions.values()):
+                # Each extension gets its own database, merged into the
+                # main one when it is set up in the main process
+                self.app.database = Database(None)
+                extension.scan()
+                scans[extension.extension_name] = extension.take_scan()
+        except HotdocException as exc:
+            error_message = exc.message
+
+        return SubprojectScan(scans, Logger.journal[n_journal:],
+                              Logger.n_fatal_warnings - n_fatal_warnings,
+                              error_message, Profiler.take())
+
+    def __setup_subprojects(self):
+        # pylint: disable=global-statement
+        global _SCANNING_STATE
+
+        projects = list(self.subprojects.values())
+        scans = [None] * len(projects)
+        jobs = min(self.app.jobs, len(projects))
+
+        if jobs > 1 and 'fork' in multiprocessing.get_all_start_methods():
+            info('Scanning %d subprojects with %d jobs' % (len(projects),
+                                                           jobs), 'project')
+            _SCANNING_STATE = projects
+            try:
+                context = multiprocessing.get_context('fork')
+                with context.Pool(jobs,
+                                  initializer=_init_scanning_worker) as pool:
+                    scans = pool.map(_scan_subproject_in_worker,
+                                     range(len(projects)), 1)
+            finally:
+                _SCANNING_STATE = None
+
+        # Set up in the order of the sitemap, the database is then the
+        # same as with a single process
+        for proj, scan in zip(projects, scans):
+            proj.setup(scan)
+
     def get_page_for_symbol(self, unique_name):
         """
         Banana banana
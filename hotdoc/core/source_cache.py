@@ -0,0 +1,245 @@
+# -*- coding: utf-8 -*-
+#
+# Copyright © 2016 Mathieu Duponchelle <mathieu.duponchelle@opencreed.com>
+# Copyright © 2016 Collabora Ltd
+#
+# This library is free software; you can redistribute it and/or modify it under
+# the terms of the GNU Lesser General Public License as published by the Free
+# Software Foundation; either version 2.1 of the License, or (at your option)
+# any later version.
+#
+# This library is distributed in the hope that it will be useful, but WITHOUT
+# ANY WARRANTY; without even the implied warranty of MERCHANTABILITY or FITNESS
+# FOR A PARTICULAR PURPOSE.  See the GNU Lesser General Public License for more
+# details.
+#
+# You should have received a copy of the GNU Lesser General Public License
+# along with this library.  If not, see <http://www.gnu.org/licenses/>.
+
+"""
+Persistent caches of what extensions extract from source files, and of
+what they find out about the tools they use.
+"""
+
+import os
+import json
+import pickle
+import hashlib
+import tempfile
+
+from hotdoc.utils.loggable import debug, warn, WARNING
+from hotdoc.utils.utils import digest_file
+from hotdoc.utils.setup_utils import VERSION
+
+
+def get_warnings(journal):
+    """
+    Returns:
+        list: the warnings of @journal, to store along with what was
+            extracted while logging it.
+    """
+    return [entry for entry in journal
+            if entry.code and entry.level >= WARNING]
+
+
+def replay_warnings(warnings):
+    """
+    Emit again @warnings, as returned by `get_warnings`, when what was
+    extracted along with them is loaded from the cache.
+    """
+    for entry in warnings:
+        warn(entry.code, entry.message)
+
+
+class SourceCache:
+    """
+    Stores, for a source file, what was extracted from it, along with the
+    digests of the files the extraction depended on: the source file
+    itself, and for example the headers it included.
+
+    Entries are looked up by the path of the source file and a salt,
+    which should contain everything else the extraction depended on,
+    such as compiler flags. An entry is only returned if none of the
+    files it depended on changed since it was stored.
+
+    Entries are pickled, the cache can be shared by several projects and
+    several processes.
+    """
+
+    def __init__(self, folder):
+        """
+        Args:
+            folder: str, where to store the entries, created if needed.
+        """
+        self.__folder = folder
+        self.__digests = {}
+        self.n_hits = 0
+        self.n_misses = 0
+
+    def digest(self, path):
+        """
+        Returns:
+            str: the digest of the contents of @path, computed once per
+                instance.
+        """
+        if path not in self.__digests:
+            self.__digests[path] = digest_file(path)
+        return self.__digests[path]
+
+    def __get_entry_path(self, path, salt):
+        hasher = hashlib.sha1()
+        for value in [VERSION, path] + list(salt):
+            hasher.update(str(value).encode('utf-8'))
+            hasher.update(b'\0')
+        key = hasher.hexdigest()
+        return os.path.join(self.__folder, key[:2], key[2:])
+
+    def load(self, path, salt, sources=()):
+        """
+        Args:
+            path: str, the source file.
+            salt: list, see `SourceCache`.
+            sources: set, the source files of the project, whether a
+                dependency is one of them is checked as well.
+
+        Returns:
+            object: what was stored, or None.
+        """
+        try:
+            with open(self.__get_entry_path(path, salt), 'rb') as _:
+                dependencies, contents = pickle.load(_)
+        # pylint: disable=broad-except
+        except Exception:
+            self.n_misses += 1
+            return None
+
+        for dependency, (digest, is_source) in dependencies.items():
+            if self.digest(dependency) != digest or \
+                    (dependency in sources) != is_source:
+                debug('%s changed, extracting from %s again' %
+                      (dependency, path), 'source-cache')
+                self.n_misses += 1
+                return None
+
+        self.n_hits += 1
+        return contents
+
+    # pylint: disable=too-many-arguments
+    def store(self, path, salt, contents, dependencies=(), sources=()):
+        """
+        Args:
+            path: str, the source file.
+            salt: list, see `SourceCache`.
+            contents: object, what was extracted, it must be picklable.
+            dependencies: list, the files other than @path the extraction
+                depended on.
+            sources: set, see `SourceCache.load`.
+        """
+        digests = {}
+        for dependency in [path] + list(dependencies):
+            digest = self.digest(dependency)
+            if digest is None:
+                return
+            digests[dependency] = (digest, dependency in sources)
+
+        entry_path = self.__get_entry_path(path, salt)
+        tmp = None
+        try:
+            os.makedirs(os.path.dirname(entry_path), exist_ok=True)
+            # Other processes may be reading the entry, replace it at once
+            with tempfile.NamedTemporaryFile(
+                    dir=os.path.dirname(entry_path), delete=False) as tmp:
+                pickle.dump((digests, contents), tmp,
+                            protocol=pickle.HIGHEST_PROTOCOL)
+            os.replace(tmp.name, entry_path)
+        # pylint: disable=broad-except
+        except Exception as exc:
+            debug('Could not cache what was extracted from %s: %s' %
+                  (path, exc), 'source-cache')
+            if tmp is not None and os.path.exists(tmp.name):
+                os.unlink(tmp.name)
+
+
+def _get_mtime(path):
+    try:
+        return os.stat(path).st_mtime_ns
+    except (OSError, TypeError):
+        return None
+
+
+class ProbeCache:
+    """
+    Stores the results of probing tools, for example asking llvm-config
+    where libclang is, in a single JSON file.
+
+    Entries are looked up by a key, which should contain everything the
+    result depends on besides files, such as environment variables. An
+    entry is only returned if the modification times of the files it
+    depended on, for example the binary of the tool, didn't change since
+    it was stored.
+    """
+
+    def __init__(self, path):
+        """
+        Args:
+            path: str, the file to store the entries in, or None to only
+                keep them in memory.
+        """
+        self.__path = path
+        self.__entries = None
+
+    def __load(self):
+        if self.__entries is not None:
+            return
+
+        self.__entries = {}
+        if self.__path is None:
+            return
+
+        try:
+            with open(self.__path, 'r', encoding='utf-8') as _:
+                self.__entries = json.load(_)
+        except (OSError, ValueError):
+            pass
+
+    def __save(self):
+        if self.__path is None:
+            return
+
+        tmp = None
+        try:
+            os.makedirs(os.path.dirname(self.__path), exist_ok=True)
+            with tempfile.NamedTemporaryFile(
+                    'w', dir=os.path.dirname(self.__path), delete=False,
+                    encoding='utf-8') as tmp:
+                json.dump(self.__entries, tmp)
+            os.replace(tmp.name, self.__path)
+        except OSError as exc:
+            debug('Could not save the probe cache: %s' % exc, 'source-cache')
+            if tmp is not None and os.path.exists(tmp.name):
+                os.unlink(tmp.name)
+
+    def get(self, key, dependencies, probe):
+        """
+        Args:
+            key: list, see `ProbeCache`, its items must be strings.
+            dependencies: list, the paths of the files the result depends
+                on. None is allowed, for tools that could not be found.
+            probe: callable, called without arguments to compute the
+                result when it isn't cached. The result must be
+                serializable to JSON.
+
+        Returns:
+            object: the cached or computed result.
+        """
+        self.__load()
+        key = json.dumps(key)
+        stamps = [[path, _get_mtime(path)] for path in dependencies]
+        entry = self.__entries.get(key)
+        if entry is not None and entry['stamps'] == stamps:
+            return entry['result']
+
+        result = probe()
+        self.__entries[key] = {'stamps': stamps, 'result': result}
+        self.__save()
+        return result
@@ -37,9 +37,18 @@ class Symbol:
     __tablename__ = 'symbols'
     standalone = True
 
+    # Hundreds of thousands of symbols can be created for large
+    # projects, avoid a per-instance __dict__. Attributes set on the
+    # symbols while formatting them are declared here as well.
+    __slots__ = ('_extension_contents', '_extension_attributes', 'skip',
+                 'extra', 'comment', 'unique_name', 'display_name',
+                 'filename', 'lineno', 'extent_start', 'extent_end', 'link',
+                 'project_name', 'parent_name', 'aliases', 'language',
+                 'formatted_doc', 'detailed_description', 'formatted_link')
+
     def __init__(self):
-        self.extension_contents = {}
-        self.extension_attributes = {}
+        self._extension_contents = None
+        self._extension_attributes = None
         self.skip = False
 
         self.extra = {}
@@ -66,6 +75,32 @@ class Symbol:
         to retrieve Plurial form of the symbol name."""
         return cls.__tablename__.replace("_", " ").title()
 
+    @property
+    def extension_contents(self):
+        """
+        Extra contents to render with the symbol, allocated on first use.
+        """
+        if self._extension_contents is None:
+            self._extension_contents = {}
+        return self._extension_contents
+
+    @extension_contents.setter
+    def extension_contents(self, value):
+        self._extension_contents = value
+
+    @property
+    def extension_attributes(self):
+        """
+        Attributes set by the extensions, allocated on first use.
+        """
+        if self._extension_attributes is None:
+            self._extension_attributes = {}
+        return self._extension_attributes
+
+    @extension_attributes.setter
+    def extension_attributes(self, value):
+        self._extension_attributes = value
+
     # FIXME: this is a bit awkward to use.
     def add_extension_attribute(self, ext_name, key, value):
         """
@@ -79,7 +114,9 @@ class Symbol:
         """
         Banana banana
         """
-        attributes = self.extension_attributes.get(ext_name)
+        if not self._extension_attributes:
+            return None
+        attributes = self._extension_attributes.get(ext_name)
         if not attributes:
             return None
         return attributes.get(key)
@@ -155,12 +192,43 @@ class QualifiedSymbol:
     """
     standalone = False
 
+    __slots__ = ('input_tokens', 'type_link', 'comment',
+                 '_extension_attributes', '_extension_contents',
+                 'type_tokens', 'formatted_doc', 'detailed_description',
+                 'formatted_link')
+
     def __init__(self, type_tokens=None):
         self.input_tokens = type_tokens or []
         self.type_link = None
         self.comment = None
-        self.extension_attributes = {}
-        self.extension_contents = {}
+        self._extension_attributes = None
+        self._extension_contents = None
+
+    @property
+    def extension_contents(self):
+        """
+        Extra contents to render with the symbol, allocated on first use.
+        """
+        if self._extension_contents is None:
+            self._extension_contents = {}
+        return self._extension_contents
+
+    @extension_contents.setter
+    def extension_contents(self, value):
+        self._extension_contents = value
+
+    @property
+    def extension_attributes(self):
+        """
+        Attributes set by the extensions, allocated on first use.
+        """
+        if self._extension_attributes is None:
+            self._extension_attributes = {}
+        return self._extension_attributes
+
+    @extension_attributes.setter
+    def extension_attributes(self, value):
+        self._extension_attributes = value
 
     def add_extension_attribute(self, ext_name, key, value):
         """
@@ -174,7 +242,9 @@ class QualifiedSymbol:
         """
         Banana banana
         """
-        attributes = self.extension_attributes.get(ext_name)
+        if not self._extension_attributes:
+            return None
+        attributes = self._extension_attributes.get(ext_name)
         if not attributes:
             return None
         return attributes.get(key)
@@ -214,6 +284,7 @@ class ReturnItemSymbol(QualifiedSymbol):
     """
     Banana banana
     """
+    __slots__ = ('name',)
 
     def __init__(self, comment=None, name=None, **kwargs):
         QualifiedSymbol.__init__(self, **kwargs)
@@ -225,6 +296,7 @@ class ParameterSymbol(QualifiedSymbol):
     """
     Banana banana
     """
+    __slots__ = ('array_nesting', 'argname')
 
     def __init__(self, argname='', comment=None, **kwargs):
         QualifiedSymbol.__init__(self, **kwargs)
@@ -240,6 +312,7 @@ class FieldSymbol(Symbol):
     """
     __tablename__ = 'fields'
     standalone = False
+    __slots__ = ('is_function_pointer', 'qtype', 'member_name')
 
     def __init__(self, **kwargs):
         self.is_function_pointer = False
@@ -267,6 +340,7 @@ class EnumMemberSymbol(Symbol):
     """
     __tablename__ = 'members'
     standalone = False
+    __slots__ = ('enum_value',)
 
 
 class FunctionSymbol(Symbol):
@@ -274,6 +348,7 @@ class FunctionSymbol(Symbol):
     Banana banana
     """
     __tablename__ = 'functions'
+    __slots__ = ('parameters', 'return_value', 'throws', 'is_ctor_for')
 
     def __init__(self, **kwargs):
         self.parameters = []
@@ -292,6 +367,7 @@ class FunctionSymbol(Symbol):
 class MethodSymbol(FunctionSymbol):
     """Banana Banana"""
     __tablename__ = 'methods'
+    __slots__ = ()
 
     def get_type_name(self):
         return "Method"
@@ -300,6 +376,7 @@ class MethodSymbol(FunctionSymbol):
 class ClassMethodSymbol(FunctionSymbol):
     """Banana Banana"""
     __tablename__ = 'class_methods'
+    __slots__ = ()
 
     def get_type_name(self):
         return "Class method"
@@ -308,6 +385,7 @@ class ClassMethodSymbol(FunctionSymbol):
 class ConstructorSymbol(FunctionSymbol):
     """Banana Banana"""
     __tablename__ = 'constructors'
+    __slots__ = ()
 
     def get_type_name(self):
         return "Constructor"
@@ -318,6 +396,7 @@ class SignalSymbol(FunctionSymbol):
     Banana banana
     """
     __tablename__ = 'signals'
+    __slots__ = ('flags',)
 
     def __init__(self, **kwargs):
         # FIXME: flags are gobject-specific
@@ -333,6 +412,7 @@ class ActionSignalSymbol(SignalSymbol):
     Banana banana
     """
     __tablename__ = 'action_signals'
+    __slots__ = ()
 
     def __init__(self, **kwargs):
         SignalSymbol.__init__(self, **kwargs)
@@ -346,6 +426,7 @@ class VFunctionSymbol(FunctionSymbol):
     Banana banana
     """
     __tablename__ = 'virtual_methods'
+    __slots__ = ('flags',)
 
     def __init__(self, **kwargs):
         self.flags = []
@@ -360,6 +441,7 @@ class PropertySymbol(Symbol):
     Banana banana
     """
     __tablename__ = 'properties'
+    __slots__ = ('prop_type',)
 
     def __init__(self, **kwargs):
         self.prop_type = None
@@ -374,6 +456,7 @@ class CallbackSymbol(FunctionSymbol):
     Banana banana
     """
     __tablename__ = 'callbacks'
+    __slots__ = ()
 
     def get_type_name(self):
         return "Callback"
@@ -384,6 +467,7 @@ class EnumSymbol(Symbol):
     Banana banana
     """
     __tablename__ = 'enumerations'
+    __slots__ = ('members', 'raw_text', 'anonymous')
 
     def __init__(self, **kwargs):
         self.members = {}
@@ -406,6 +490,7 @@ class StructSymbol(Symbol):
     Banana banana
     """
     __tablename__ = 'structures'
+    __slots__ = ('members', 'anonymous', 'raw_text')
 
     def __init__(self, **kwargs):
         self.members = {}
@@ -430,6 +515,7 @@ class MacroSymbol(Symbol):
     Banana banana
     """
     __tablename__ = 'macros'
+    __slots__ = ('original_text',)
 
     def __init__(self, **kwargs):
         self.original_text = None
@@ -441,6 +527,7 @@ class FunctionMacroSymbol(MacroSymbol):
     Banana banana
     """
     __tablename__ = 'function_macros'
+    __slots__ = ('parameters', 'return_value')
 
     def __init__(self, **kwargs):
         self.parameters = []
@@ -459,6 +546,7 @@ class ConstantSymbol(MacroSymbol):
     Banana banana
     """
     __tablename__ = 'constants'
+    __slots__ = ()
 
     def get_type_name(self):
         return "Constant"
@@ -469,6 +557,7 @@ class ExportedVariableSymbol(MacroSymbol):
     Banana banana
     """
     __tablename__ = 'exported_variables'
+    __slots__ = ('type_qs',)
 
     def __init__(self, **kwargs):
         self.type_qs = None
@@ -486,6 +575,7 @@ class AliasSymbol(Symbol):
     Banana banana
     """
     __tablename__ = 'aliases'
+    __slots__ = ('aliased_type',)
 
     def __init__(self, **kwargs):
         self.aliased_type = None
@@ -503,6 +593,7 @@ class ClassSymbol(StructSymbol):
     Banana banana
     """
     __tablename__ = 'classes'
+    __slots__ = ('hierarchy', 'children')
 
     def __init__(self, **kwargs):
         self.hierarchy = []
@@ -522,6 +613,7 @@ class InterfaceSymbol(ClassSymbol):
     Banana banana
     """
     __tablename__ = 'interfaces'
+    __slots__ = ('prerequisites',)
 
     def __init__(self, **kwargs):
         self.prerequisites = []
@@ -537,6 +629,7 @@ class InterfaceSymbol(ClassSymbol):
 class ProxySymbol(Symbol):
     """A proxy type to handle aliased symbols"""
     __tablename__ = 'proxy_symbols'
+    __slots__ = ('target',)
 
     def __init__(self, **kwargs):
         self.target = None
@@ -17,8 +17,13 @@
 
 # pylint: disable=missing-docstring
 from hotdoc.tests.fixtures import HotdocTest
-from hotdoc.core.database import Database, RedefinedSymbolException
-from hotdoc.core.symbols import FunctionSymbol
+import os
+import pickle
+
+from hotdoc.core.comment import Comment
+from hotdoc.core.database import (Database, RedefinedSymbolException,
+                                  NDJSONIndex, SQLiteIndex, SQLITE_DATABASE)
+from hotdoc.core.symbols import FunctionSymbol, StructSymbol
 from hotdoc.utils.loggable import Logger
 
 
@@ -39,3 +44,80 @@ class TestDatabase(HotdocTest):
         Logger.fatal_warnings = False
         Logger.silent = False
         Logger.reset()
+
+    def test_merge(self):
+        self.database.create_symbol(FunctionSymbol, unique_name='foo')
+
+        other = Database(None)
+        other.add_comment(Comment(name='bar', description='Bar'))
+        other.create_symbol(FunctionSymbol, unique_name='bar',
+                            aliases=['baz'])
+        other = pickle.loads(pickle.dumps(other))
+
+        self.database.merge(other)
+        self.assertEqual(list(self.database.get_all_symbols()),
+                         ['foo', 'bar'])
+        self.assertEqual(self.database.get_symbol('baz').unique_name, 'bar')
+        self.assertEqual(self.database.get_comment('bar').description, 'Bar')
+
+        other = Database(None)
+        other.create_symbol(FunctionSymbol, unique_name='foo')
+        Logger.fatal_warnings = True
+        Logger.raise_on_fatal_warnings = True
+        Logger.silent = True
+        with self.assertRaises(RedefinedSymbolException):
+            self.database.merge(other)
+        Logger.fatal_warnings = False
+        Logger.silent = False
+        Logger.reset()
+
+    def test_persist_sqlite(self):
+        self.database.add_comment(Comment(name='foo', description='Foo'))
+        self.database.create_symbol(FunctionSymbol, unique_name='foo',
+                                    filename='foo.h', aliases=['foo_alias'])
+        self.database.create_symbol(StructSymbol, unique_name='Bar',
+                                    filename='bar.h')
+        self.database.persist('sqlite')
+
+        with SQLiteIndex(os.path.join(self.private_folder,
+                                      SQLITE_DATABASE)) as index:
+            self.assertIn('foo', index)
+            self.assertNotIn('baz', index)
+            self.assertEqual(index.get_symbol_names(), ['foo', 'Bar'])
+            self.assertEqual(
+                index.get_symbol_names(type_name='StructSymbol'), ['Bar'])
+            self.assertEqual(
+                index.get_symbol_names(filename=os.path.abspath('foo.h')),
+                ['foo'])
+            symbol = index.get_symbol('foo_alias')
+            self.assertIsInstance(symbol, FunctionSymbol)
+            self.assertEqual(symbol.unique_name, 'foo')
+            self.assertEqual(index.get_comment('foo').description, 'Foo')
+            self.assertIsNone(index.get_symbol('baz'))
+
+    def test_sqlite_index_path_with_uri_characters(self):
+        self.database.create_symbol(FunctionSymbol, unique_name='foo')
+        self.database.persist('sqlite')
+
+        path = os.path.join(self.private_folder, 'a?b#c%20d.db')
+        os.rename(os.path.join(self.private_folder, SQLITE_DATABASE), path)
+        with SQLiteIndex(path) as index:
+            self.assertIn('foo', index)
+
+    def test_persist_ndjson(self):
+        self.database.add_comment(Comment(name='foo', description='Foo'))
+        self.database.add_comment(Comment(name='bar', description='Bar'))
+        self.database.create_symbol(FunctionSymbol, unique_name='foo')
+        self.database.persist('ndjson')
+
+        with NDJSONIndex(os.path.join(self.private_folder,
+                                      'all_comments.ndjson')) as index:
+            self.assertEqual(list(index), ['foo', 'bar'])
+            self.assertEqual(index.get('bar')['description'], 'Bar')
+            self.assertEqual(index.get('foo')['description'], 'Foo')
+            self.assertIsNone(index.get('baz'))
+
+        with NDJSONIndex(os.path.join(self.private_folder,
+                                      'symbol_index.ndjson')) as index:
+            self.assertIn('foo', index)
+            self.assertEqual(index.get('foo'), 'FunctionSymbol')
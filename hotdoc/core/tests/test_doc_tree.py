@@ -25,12 +25,16 @@ import unittest
 import shutil
 import io
 import os
+import json
 
-from hotdoc.core.symbols import ClassSymbol, FunctionSymbol
+from hotdoc.core.symbols import (ClassSymbol, FunctionSymbol, FieldSymbol,
+                                 QualifiedSymbol, StructSymbol)
 from hotdoc.parsers import cmark
 from hotdoc.core.extension import Extension
+from hotdoc.extensions.c.c_extension import CExtension
+from hotdoc.extensions.c.utils import CCommentExtractor
 from hotdoc.utils.utils import OrderedSet
-from hotdoc.utils.loggable import Logger
+from hotdoc.utils.loggable import Logger, warn
 from hotdoc.core.config import Config
 from hotdoc.run_hotdoc import Application
 from hotdoc.core.comment import Comment
@@ -66,6 +70,37 @@ class TestExtension(Extension):
         TestExtension.add_sources_argument(group, add_root_paths=True)
 
 
+class CTestExtension(CExtension):
+    # pylint: disable=arguments-differ
+    def scan(self):
+        if not self.sources:
+            return
+
+        filename = list(self.sources)[0]
+        field = self.create_symbol(
+            FieldSymbol, member_name='bar',
+            qtype=QualifiedSymbol(type_tokens=['int']), filename=filename,
+            display_name='Foo.bar', unique_name='Foo.bar')
+        self.create_symbol(
+            StructSymbol, raw_text='struct Foo {\n  int bar;\n};',
+            members=[field], anonymous=False, display_name='Foo',
+            unique_name='Foo', filename=filename)
+
+
+class WarningCommentParser:
+    def parse_comment(self, comment, filename, lineno, endlineno,
+                      include_paths=None):
+        warn('gtk-doc-bad-syntax', 'Not a valid comment', filename=filename,
+             lineno=lineno)
+
+
+class CCommentsTestExtension(CExtension):
+    # pylint: disable=arguments-differ
+    def scan(self):
+        CCommentExtractor(self, WarningCommentParser()).parse_comments(
+            list(self.sources))
+
+
 class TestTree(unittest.TestCase):
     def setUp(self):
         here = os.path.dirname(__file__)
@@ -574,6 +609,213 @@ class TestTree(unittest.TestCase):
         self.assertIn('source_a.test',
                       all_pages['test-section.markdown'].subpages)
 
+    def test_c_extension_symbols(self):
+        self.app = Application((CTestExtension,))
+        conf = {'project_name': 'test',
+                'project_version': '1.0',
+                'output': self.__output_dir,
+                'index': self.__create_md_file(
+                    'index.markdown', u'# My documentation\n'),
+                'c_index': self.__create_md_file(
+                    'c-index.markdown', u'# My C API\n'),
+                'c_sources': [self.__create_src_file('foo.h', [])],
+                'sitemap': self.__write_sitemap(
+                    u'index.markdown\n\tc-index\n')}
+
+        self.app.parse_config(self.__make_config(conf))
+        self.app.run()
+
+        self.assertEqual(self.app.database.get_symbol('Foo').language, 'c')
+        field = self.app.database.get_symbol('Foo.bar')
+        self.assertEqual(field.language, 'c')
+        self.assertIn('int', field.formatted_link)
+
+        page = self.app.project.get_page_for_symbol('Foo')
+        self.assertIn('id="Foo.bar"', page.detailed_description)
+
+    def test_update_modified_page(self):
+        conf = {'project_name': 'test-update',
+                'project_version': '1.0',
+                'output': self.__output_dir,
+                'incremental': True,
+                'index': self.__create_md_file(
+                    'index.markdown', u'# My documentation\n'),
+                'sitemap': self.__write_sitemap(
+                    u'index.markdown\n\tpage.markdown\n')}
+        page_path = self.__create_md_file('page.markdown', u'# A page\n')
+        self.app.parse_config(self.__make_config(conf))
+        self.addCleanup(shutil.rmtree, self.app.private_folder, True)
+        self.app.run()
+
+        self.__create_md_file('page.markdown', u'# An updated page\n')
+        self.assertTrue(self.app.update([page_path]))
+        self.assertEqual(self.app.build_cache.n_reused, 1)
+        self.assertEqual(self.app.build_cache.n_rendered, 1)
+        page = self.app.project.tree.get_pages()['page.markdown']
+        self.assertEqual(page.title, 'An updated page')
+        with open(os.path.join(self.__output_dir, 'html', 'page.html')) as _:
+            self.assertIn('An updated page', _.read())
+
+        # The sitemap is not a page, the documentation must be built
+        # from scratch
+        self.assertFalse(self.app.update([conf['sitemap']]))
+
+    def test_c_comments_warnings_each_run(self):
+        Logger.fatal_warnings = False
+        conf = {'project_name': 'test',
+                'project_version': '1.0',
+                'disable_cache': True,
+                'index': self.__create_md_file(
+                    'index.markdown', u'# My documentation\n'),
+                'c_index': self.__create_md_file(
+                    'c-index.markdown', u'# My C API\n'),
+                'c_sources': [self.__create_src_file(
+                    'foo.h', ['/**\n * foo:\n */', 'int foo;'])],
+                'sitemap': self.__write_sitemap(
+                    u'index.markdown\n\tc-index\n')}
+
+        # Several applications may run in the same process
+        for _ in range(2):
+            Logger.reset()
+            app = Application((CCommentsTestExtension,))
+            app.parse_config(self.__make_config(conf))
+            app.run()
+            app.finalize()
+            self.assertEqual(
+                [entry.code for entry in Logger.get_issues()],
+                ['gtk-doc-bad-syntax'])
+
+    def __scan_c_sources(self, jobs):
+        Logger.reset()
+        app = Application((CExtension,))
+        conf = {'project_name': 'test',
+                'project_version': '1.0',
+                'disable_cache': True,
+                'index': self.__create_md_file(
+                    'index.markdown', u'# My documentation\n'),
+                'c_index': self.__create_md_file(
+                    'c-index.markdown', u'# My C API\n'),
+                'c_sources': [
+                    os.path.join(self.__src_dir, 'foo.h'),
+                    os.path.join(self.__src_dir, 'bar.h')],
+                'sitemap': self.__write_sitemap(
+                    u'index.markdown\n\tc-index\n')}
+        app.parse_config(self.__make_config(conf))
+        app.jobs = jobs
+        app.run()
+        app.finalize()
+
+        symbols = []
+        for unique_name, symbol in app.database.get_all_symbols().items():
+            symbols.append((unique_name, type(symbol).__name__,
+                            symbol.filename,
+                            getattr(symbol, 'enum_value', None)))
+        return symbols
+
+    def test_c_extension_jobs(self):
+        self.__create_src_file('foo.h', [
+            '/**',
+            ' * FooFlags:',
+            ' * @FOO_NONE: No flags',
+            ' * @FOO_FIRST: The first flag',
+            ' * @FOO_SECOND: The second flag',
+            ' */',
+            'typedef enum {',
+            '  FOO_NONE = 0,',
+            '  FOO_FIRST = 1 << 0,',
+            '  FOO_SECOND = 1 << 3,',
+            '} FooFlags;',
+            '',
+            '/**',
+            ' * foo_do:',
+            ' * @flags: The flags',
+            ' *',
+            ' * Returns: Whether it was done',
+            ' */',
+            'int foo_do (FooFlags flags);'])
+        self.__create_src_file('bar.h', [
+            '#include "foo.h"',
+            '',
+            '/**',
+            ' * Bar:',
+            ' * @flags: The flags of the bar',
+            ' */',
+            'typedef struct {',
+            '  FooFlags flags;',
+            '} Bar;',
+            '',
+            '/**',
+            ' * bar_new:',
+            ' *',
+            ' * Returns: A new bar',
+            ' */',
+            'Bar *bar_new (void);'])
+
+        symbols = self.__scan_c_sources(1)
+        self.assertEqual(
+            [symbol[3] for symbol in symbols
+             if symbol[0].startswith('FOO_')], [0, 1, 8])
+        self.assertIn(('bar_new', 'FunctionSymbol',
+                       os.path.join(self.__src_dir, 'bar.h'), None), symbols)
+
+        # The translation units parsed by worker processes are merged in
+        # the same order
+        self.assertEqual(self.__scan_c_sources(2), symbols)
+        self.assertIn('parsing 2 translation units with 2 jobs',
+                      [entry.message for entry in Logger.journal])
+
+    def __build_subprojects_redefining_symbol(self, jobs):
+        Logger.fatal_warnings = False
+        Logger.reset()
+        for i in (1, 2):
+            subconf = {'project_name': 'sub%d' % i,
+                       'project_version': '1.0',
+                       'index': self.__create_md_file(
+                           'sub%d.markdown' % i, u'# Subproject\n'),
+                       'c_index': self.__create_md_file(
+                           'c-sub%d.markdown' % i, u'# C API\n'),
+                       'c_sources': [self.__create_src_file(
+                           'sub%d/foo.h' % i, [])],
+                       'sitemap': self.__create_md_file(
+                           'sub%d.txt' % i,
+                           u'sub%d.markdown\n\tc-index\n' % i)}
+            self.__create_md_file('sub%d.json' % i, json.dumps(subconf))
+
+        app = Application((CTestExtension,))
+        conf = {'project_name': 'test',
+                'project_version': '1.0',
+                'output': self.__output_dir,
+                'include_paths': [self.__md_dir],
+                'index': self.__create_md_file(
+                    'index.markdown', u'# My documentation\n'),
+                'sitemap': self.__write_sitemap(
+                    u'index.markdown\n\tsub1.json\n\tsub2.json\n')}
+        app.parse_config(self.__make_config(conf))
+        app.jobs = jobs
+        app.run()
+        app.finalize()
+
+        pages = {}
+        for subproj in app.project.subprojects.values():
+            for name, page in subproj.tree.get_pages().items():
+                pages[(subproj.project_name, name)] = list(page.symbol_names)
+        warnings = [entry.code for entry in Logger.journal
+                    if entry.code == 'symbol-redefined']
+        return pages, warnings
+
+    def test_subprojects_redefined_symbol_jobs(self):
+        pages, warnings = self.__build_subprojects_redefining_symbol(1)
+        self.assertEqual(len(warnings), 2)
+        self.assertEqual(
+            [key for key, symbol_names in pages.items()
+             if 'Foo' in symbol_names], [('sub1', 'foo')])
+
+        self.__remove_tmp_dirs()
+        os.makedirs(self.__md_dir)
+        os.mkdir(self.__src_dir)
+        self.assertEqual(self.__build_subprojects_redefining_symbol(2),
+                         (pages, warnings))
+
     def test_no_extension_index_override(self):
         self.__create_test_layout(with_ext_index=False)
         ext_index = self.app.project.tree.get_pages()['test-index']
@@ -26,7 +26,8 @@ import os
 import shutil
 
 from hotdoc.core.database import Database
-from hotdoc.core.links import LinkResolver, Link, dict_to_html_attrs
+from hotdoc.core.links import (LinkResolver, Link, LINK_CONTEXT,
+                               dict_to_html_attrs)
 from hotdoc.core.symbols import (FunctionSymbol, ParameterSymbol, StructSymbol)
 from hotdoc.utils.utils import OrderedDict
 
@@ -41,3 +42,138 @@ class TestLinkUtils(unittest.TestCase):
         d['foo'] = None
         d['bar'] = None
         self.assertEqual(dict_to_html_attrs(d), 'foo="None" bar="None"')
+
+
+class TestLinkResolver(unittest.TestCase):
+    def test_n_lookups(self):
+        database = Database(None)
+        database.create_symbol(FunctionSymbol, unique_name='foo')
+        link_resolver = LinkResolver(database)
+        self.assertEqual(link_resolver.n_lookups, 0)
+        link_resolver.get_named_link('foo')
+        link_resolver.get_named_link('bar')
+        self.assertEqual(link_resolver.n_lookups, 2)
+
+    def test_unresolved(self):
+        database = Database(None)
+        link_resolver = LinkResolver(database)
+        lookups = []
+
+        def get_link(_, name):
+            lookups.append(name)
+            if name == 'baz':
+                return Link('baz.html', 'baz', None)
+            return None
+
+        link_resolver.get_link_signal.connect(get_link)
+        self.assertIsNone(link_resolver.get_named_link('foos'))
+        self.assertEqual(lookups, ['foos', 'foo'])
+        self.assertIsNone(link_resolver.get_named_link('foos'))
+        self.assertEqual(lookups, ['foos', 'foo'])
+
+        # Symbols added since can resolve it
+        sym = database.create_symbol(FunctionSymbol, unique_name='foo')
+        sym.link = Link('foo.html', 'foo', 'foo')
+        self.assertEqual(link_resolver.get_named_link('foos').ref,
+                         'foo.html')
+
+        # So can other handlers
+        link_resolver.get_link_signal.disconnect(get_link)
+        self.assertIsNone(link_resolver.get_named_link('baz'))
+        link_resolver.get_link_signal.connect(get_link)
+        self.assertEqual(link_resolver.get_named_link('baz').ref, 'baz.html')
+
+    def test_unresolved_added_link(self):
+        link_resolver = LinkResolver(Database(None))
+        self.assertIsNone(link_resolver.get_named_link('foo'))
+        link_resolver.add_link(Link('foo.html', 'foo', 'foo'))
+        self.assertEqual(link_resolver.get_named_link('foo').ref, 'foo.html')
+
+    def test_url(self):
+        link_resolver = LinkResolver(Database(None))
+        link = link_resolver.get_named_link('https://example.org/foo')
+        self.assertEqual(link.ref, 'https://example.org/foo')
+        self.assertEqual(link_resolver.get_named_link('mailto:foo@bar').ref,
+                         'mailto:foo@bar')
+        self.assertEqual(link_resolver.get_named_link('#foo').ref, '#foo')
+
+    def test_resolve(self):
+        link_resolver = LinkResolver(Database(None))
+        link = Link('foo.html', 'foo', 'foo')
+        resolved = []
+
+        def resolve(link):
+            resolved.append((link.id_, LINK_CONTEXT.get()))
+            return '%s/%s' % (LINK_CONTEXT.get(), link.ref), None
+
+        link_resolver.resolving_link_signal.connect(resolve)
+        self.assertEqual(link.get_link(link_resolver), ('None/foo.html', None))
+        self.assertEqual(link.get_link(link_resolver), ('None/foo.html', None))
+        self.assertEqual(resolved, [('foo', None)])
+
+        token = LINK_CONTEXT.set('python')
+        try:
+            self.assertEqual(link.get_link(link_resolver),
+                             ('python/foo.html', None))
+            self.assertEqual(link.get_link(link_resolver),
+                             ('python/foo.html', None))
+        finally:
+            LINK_CONTEXT.reset(token)
+        self.assertEqual(resolved, [('foo', None), ('foo', 'python')])
+
+        # The ref is part of what links are resolved for
+        link.ref = 'bar.html'
+        self.assertEqual(link.get_link(link_resolver), ('None/bar.html', None))
+
+        link_resolver.resolving_link_signal.disconnect(resolve)
+        self.assertEqual(link.get_link(link_resolver), ('bar.html', None))
+
+    def test_resolve_title(self):
+        link = Link('foo.html', 'foo', 'foo')
+        titles = []
+
+        def resolve_title(link):
+            titles.append(link.id_)
+            return link.id_.upper()
+
+        Link.resolving_title_signal.connect(resolve_title)
+        try:
+            self.assertEqual(link.title, 'FOO')
+            self.assertEqual(link.title, 'FOO')
+            self.assertEqual(titles, ['foo'])
+        finally:
+            Link.resolving_title_signal.disconnect(resolve_title)
+        self.assertEqual(link.title, 'foo')
+
+    def test_link_table(self):
+        database = Database(None)
+        link_resolver = LinkResolver(database)
+        table = link_resolver.get_link_table()
+        table['foo'] = ('foo.html', None, 'foo', 'foo')
+        self.assertIs(link_resolver.get_link_table(), table)
+
+        token = LINK_CONTEXT.set('python')
+        try:
+            self.assertEqual(link_resolver.get_link_table(), {})
+        finally:
+            LINK_CONTEXT.reset(token)
+        self.assertIs(link_resolver.get_link_table(), table)
+
+        link = Link('bar.html', 'bar', 'bar')
+        link_resolver.add_link(link)
+        table = link_resolver.get_link_table()
+        self.assertEqual(table, {})
+
+        table['bar'] = ('bar.html', None, 'bar', 'bar')
+        link.ref = 'bar.html'
+        self.assertIs(link_resolver.get_link_table(), table)
+        link.ref = 'baz.html'
+        self.assertEqual(link_resolver.get_link_table(), {})
+
+    def test_link_table_hits(self):
+        link_resolver = LinkResolver(Database(None))
+        link_resolver.start_recording()
+        link_resolver.add_link_table_hits([('foos', 'foo'), ('bar', 'bar')])
+        self.assertEqual(link_resolver.stop_recording(),
+                         ['foos', 'foo', 'bar', 'bar'])
+        self.assertEqual(link_resolver.n_lookups, 2)
@@ -100,6 +100,41 @@ class TestProject(HotdocTest):
         self.assertEqual(len(proj.tree.get_pages()), 2)
         proj.format(self.link_resolver, self.output)
 
+    def test_subprojects_jobs(self):
+        self.jobs = 2
+        proj = Project(self)
+        self.project = proj
+        sm_path = self._create_sitemap(
+            'sitemap.txt',
+            'index.markdown\n\tsubproject1.json\n\tsubproject2.json')
+        index_path = self._create_md_file('index.markdown', '# Project')
+
+        for i in (1, 2):
+            sub_sm_path = self._create_sitemap(
+                'subsitemap%d.txt' % i, 'subindex%d.markdown' % i)
+            sub_index_path = self._create_md_file(
+                'subindex%d.markdown' % i, '# Subproject %d' % i)
+            self._create_conf_file('subproject%d.json' % i,
+                                   {'index': sub_index_path,
+                                    'sitemap': sub_sm_path,
+                                    'project_name': 'subproject%d' % i,
+                                    'project_version': '0.2'})
+
+        conf = Config({'sitemap': sm_path,
+                       'index': index_path,
+                       'project_name': 'test-project',
+                       'project_version': '0.1',
+                       'output': self._output_dir})
+        proj.parse_name_from_config(conf)
+        proj.parse_config(conf, toplevel=True)
+        proj.setup()
+
+        self.assertEqual(list(proj.subprojects),
+                         ['subproject1.json', 'subproject2.json'])
+        for subproj in proj.subprojects.values():
+            self.assertEqual(len(subproj.tree.get_pages()), 1)
+        self.assertEqual(len(proj.tree.get_pages()), 3)
+
     def test_subproject_extra_assets(self):
         proj = Project(self)
         self.project = proj
@@ -0,0 +1,128 @@
+# -*- coding: utf-8 -*-
+#
+# Copyright © 2016 Mathieu Duponchelle <mathieu.duponchelle@opencreed.com>
+# Copyright © 2016 Collabora Ltd
+#
+# This library is free software; you can redistribute it and/or modify it under
+# the terms of the GNU Lesser General Public License as published by the Free
+# Software Foundation; either version 2.1 of the License, or (at your option)
+# any later version.
+#
+# This library is distributed in the hope that it will be useful, but WITHOUT
+# ANY WARRANTY; without even the implied warranty of MERCHANTABILITY or FITNESS
+# FOR A PARTICULAR PURPOSE.  See the GNU Lesser General Public License for more
+# details.
+#
+# You should have received a copy of the GNU Lesser General Public License
+# along with this library.  If not, see <http://www.gnu.org/licenses/>.
+
+# pylint: disable=missing-docstring
+import unittest
+import os
+import shutil
+
+from hotdoc.core.source_cache import SourceCache, ProbeCache
+
+
+class TestSourceCache(unittest.TestCase):
+    def setUp(self):
+        here = os.path.dirname(__file__)
+        self.__priv_dir = os.path.abspath(os.path.join(
+            here, 'tmp-private'))
+        self.__src_dir = os.path.abspath(os.path.join(here, 'tmp-src-files'))
+        self.__cache_dir = os.path.join(self.__priv_dir, 'cache')
+        shutil.rmtree(self.__priv_dir, ignore_errors=True)
+        shutil.rmtree(self.__src_dir, ignore_errors=True)
+        os.mkdir(self.__priv_dir)
+        os.mkdir(self.__src_dir)
+
+    def tearDown(self):
+        shutil.rmtree(self.__priv_dir, ignore_errors=True)
+        shutil.rmtree(self.__src_dir, ignore_errors=True)
+
+    def __create_src_file(self, name, contents):
+        path = os.path.join(self.__src_dir, name)
+        with open(path, 'w') as _:
+            _.write(contents)
+        return path
+
+    def test_store_load(self):
+        header = self.__create_src_file('foo.h', 'int foo(void);')
+        cache = SourceCache(self.__cache_dir)
+        self.assertIsNone(cache.load(header, ['-DFOO']))
+        cache.store(header, ['-DFOO'], ['foo'])
+
+        cache = SourceCache(self.__cache_dir)
+        self.assertEqual(cache.load(header, ['-DFOO']), ['foo'])
+        self.assertIsNone(cache.load(header, ['-DBAR']))
+        self.assertEqual((cache.n_hits, cache.n_misses), (1, 1))
+
+    def test_changed_dependency(self):
+        header = self.__create_src_file('foo.h', '#include "bar.h"')
+        dep = self.__create_src_file('bar.h', 'int bar(void);')
+        cache = SourceCache(self.__cache_dir)
+        cache.store(header, [], ['foo'], dependencies=[dep])
+        self.assertEqual(SourceCache(self.__cache_dir).load(header, []),
+                         ['foo'])
+
+        self.__create_src_file('bar.h', 'int baz(void);')
+        self.assertIsNone(SourceCache(self.__cache_dir).load(header, []))
+
+    def test_changed_sources(self):
+        header = self.__create_src_file('foo.h', '#include "bar.h"')
+        dep = self.__create_src_file('bar.h', 'int bar(void);')
+        cache = SourceCache(self.__cache_dir)
+        cache.store(header, [], ['foo'], dependencies=[dep],
+                    sources={header})
+
+        # bar.h is now documented as well, its symbols must be extracted
+        cache = SourceCache(self.__cache_dir)
+        self.assertIsNone(cache.load(header, [], sources={header, dep}))
+        self.assertEqual(cache.load(header, [], sources={header}), ['foo'])
+
+
+class TestProbeCache(unittest.TestCase):
+    def setUp(self):
+        here = os.path.dirname(__file__)
+        self.__priv_dir = os.path.abspath(os.path.join(
+            here, 'tmp-private'))
+        shutil.rmtree(self.__priv_dir, ignore_errors=True)
+        os.mkdir(self.__priv_dir)
+        self.__cache_path = os.path.join(self.__priv_dir, 'probes.json')
+        self.__tool = os.path.join(self.__priv_dir, 'tool')
+        with open(self.__tool, 'w') as _:
+            _.write('v1')
+        self.__n_probes = 0
+
+    def tearDown(self):
+        shutil.rmtree(self.__priv_dir, ignore_errors=True)
+
+    def __probe(self):
+        self.__n_probes += 1
+        return ['-I/usr/include/foo']
+
+    def __get(self, key):
+        return ProbeCache(self.__cache_path).get(key, [self.__tool],
+                                                 self.__probe)
+
+    def test_get(self):
+        self.assertEqual(self.__get(['foo']), ['-I/usr/include/foo'])
+        self.assertEqual(self.__get(['foo']), ['-I/usr/include/foo'])
+        self.assertEqual(self.__n_probes, 1)
+        self.__get(['bar'])
+        self.assertEqual(self.__n_probes, 2)
+
+    def test_changed_dependency(self):
+        self.__get(['foo'])
+        stat = os.stat(self.__tool)
+        os.utime(self.__tool, ns=(stat.st_atime_ns,
+                                  stat.st_mtime_ns + 1000000000))
+        self.__get(['foo'])
+        self.assertEqual(self.__n_probes, 2)
+
+    def test_missing_dependency(self):
+        cache = ProbeCache(None)
+        self.assertEqual(cache.get(['foo'], [None], self.__probe),
+                         ['-I/usr/include/foo'])
+        cache.get(['foo'], [None], self.__probe)
+        self.assertEqual(self.__n_probes, 1)
@@ -24,7 +24,10 @@ Implements standalone markdown files parsing.
 import io
 import re
 import os
+import time
+import hashlib
 import pathlib
+import multiprocessing
 from urllib.parse import urlparse
 from collections import namedtuple, defaultdict, OrderedDict
 
@@ -38,13 +41,16 @@ from hotdoc.core.inclusions import find_file, resolve
 from hotdoc.core.symbols import Symbol, StructSymbol, ClassSymbol, \
     InterfaceSymbol, AliasSymbol
 from hotdoc.core.links import Link
-from hotdoc.core.exceptions import HotdocSourceException, InvalidPageMetadata
+from hotdoc.core.exceptions import HotdocException, HotdocSourceException, \
+    InvalidPageMetadata
 from hotdoc.core.comment import Comment
+from hotdoc.core.formatter import Formatter
 # pylint: disable=no-name-in-module
 from hotdoc.parsers import cmark
 from hotdoc.utils.utils import OrderedSet, all_subclasses
 from hotdoc.utils.signals import Signal
 from hotdoc.utils.loggable import info, debug, warn, error, Logger
+from hotdoc.utils.profiling import Profiler
 
 
 def _no_duplicates_constructor(loader, node, deep=False):
@@ -83,6 +89,58 @@ class IndexExtensionNotFoundException(HotdocSourceException):
     pass
 
 
+# What a formatting worker sends back to the main process for each page
+PageRendering = namedtuple('PageRendering', [
+    'detailed_description', 'title', 'short_description',
+    'formatted_contents', 'meta', 'build_path', 'cached_paths',
+    'output_attrs', 'scripts', 'stylesheets', 'references', 'journal',
+    'n_fatal_warnings', 'error', 'profile'])
+
+# What a write out worker sends back to the main process for each page
+PageWriting = namedtuple('PageWriting', [
+    'extra_assets', 'journal', 'n_fatal_warnings', 'error'])
+
+# Set by Tree before forking its workers, which inherit it
+_FORMATTING_STATE = None
+_WRITING_STATE = None
+
+
+def _init_formatting_worker(jobs):
+    # The main process prints the journal of the workers as it merges it
+    Logger.silent = True
+    # Workers share what is left of the memory budget for rendered pages
+    Formatter.pages_memory_budget = Formatter.pages_memory_size + max(
+        0, Formatter.pages_memory_budget - Formatter.pages_memory_size) // jobs
+
+
+def _init_writing_worker():
+    Logger.silent = True
+    Formatter.defer_writing_page_signal = True
+
+
+def _write_page_in_worker(index):
+    tree, pages, output = _WRITING_STATE
+    # pylint: disable=protected-access
+    return tree._write_page(pages[index], output)
+
+
+def _format_page_in_worker(index):
+    tree, pages, link_resolver, output, extensions, record = \
+        _FORMATTING_STATE
+    # pylint: disable=protected-access
+    return tree._render_page(pages[index], link_resolver, output, extensions,
+                             record)
+
+
+def _release_symbol(symbol):
+    symbol.formatted_doc = None
+    symbol.detailed_description = None
+    for child in symbol.get_children_symbols():
+        # Standalone children are formatted, and released, with their page
+        if child is not None and not child.standalone:
+            _release_symbol(child)
+
+
 Logger.register_error_code('index-extension-not-found', IndexExtensionNotFoundException,
                            domain='doc-tree')
 Logger.register_error_code('page-not-found', PageNotFoundException,
@@ -93,6 +151,12 @@ Logger.register_warning_code('markdown-bad-link', HotdocSourceException)
 
 
 # pylint: disable=too-many-instance-attributes
+def _get_static_meta(page):
+    # Formatters and the build cache add to the metadata of the pages
+    return {key: value for key, value in page.meta.items()
+            if key not in ('extra', 'redirect')}
+
+
 class Page:
     "Banana banana"
     meta_schema = {Optional('title'): And(str, len),
@@ -108,6 +172,14 @@ class Page:
                    Optional('redirect'): str,
                    }
 
+    __slots__ = ('name', 'generated', 'project_name', 'extension_name',
+                 'source_file', 'ast', 'raw_contents', 'comment', 'pre_sorted',
+                 'symbol_names', 'output_attrs', 'subpages', 'symbols',
+                 'private_symbols', 'typed_symbols', 'by_parent_symbols',
+                 'formatted_contents', 'detailed_description', 'build_path',
+                 'cached_paths', 'meta', 'title', 'thumbnail',
+                 'short_description', 'render_subpages', 'link')
+
     # pylint: disable=too-many-arguments
     # pylint: disable=too-many-locals
     def __init__(self, name, generated, project_name, extension_name,
@@ -329,6 +401,26 @@ class Page:
         if output:
             formatter.cache_page(self)
 
+    def release_sources(self):
+        """
+        Release what is only needed until the page is formatted: its AST,
+        its source and the formatted documentation of its symbols, which
+        is now part of its rendering.
+        """
+        self.ast = None
+        self.raw_contents = None
+        for symbol in self.symbols:
+            if symbol is not None:
+                _release_symbol(symbol)
+
+    def release_rendering(self):
+        """
+        Release the rendering of the page, once it is written out and
+        the writing_page_signal handlers took what they needed from it.
+        """
+        self.detailed_description = None
+        self.formatted_contents = None
+
     # pylint: disable=no-self-use
     def get_title(self):
         """
@@ -348,8 +440,11 @@ class Page:
                 continue
             debug('Formatting symbol %s in page %s' % (
                 symbol.unique_name, self.name), 'formatting')
+            start = time.perf_counter()
             symbol.detailed_description = formatter.format_symbol(
                 symbol, link_resolver)
+            Profiler.record_symbol(symbol.unique_name,
+                                   time.perf_counter() - start)
 
     def __query_extra_symbols(self, sym, all_syms, tree, link_resolver,
                               database):
@@ -394,6 +489,8 @@ class Tree:
         self.app = app
 
         self.__all_pages = {}
+        self.__inclusions = {}
+        self.__parsed_source = None
 
         self.root = None
         self.__dep_map = project.dependency_map
@@ -529,7 +626,19 @@ class Tree:
         """
         Banana banana
         """
-        return resolve(uri, self.project.include_paths)
+        contents = resolve(uri, self.project.include_paths)
+        if self.__parsed_source is not None:
+            self.__inclusions.setdefault(self.__parsed_source, []).append(
+                hashlib.sha1((contents or '').encode('utf-8')).hexdigest())
+        return contents
+
+    def get_inclusions(self, page):
+        """
+        Returns:
+            list: digests of the contents included by the source file
+                of @page when it was parsed.
+        """
+        return self.__inclusions.get(page.source_file, [])
 
     def walk(self, parent=None):
         """Generator that yields pages in infix order
@@ -575,11 +684,67 @@ class Tree:
         output_path = os.path.dirname(
             os.path.relpath(source_file, include_path))
 
-        ast = cmark.hotdoc_to_ast(contents, self, source_file)
+        self.__parsed_source = source_file
+        self.__inclusions.pop(source_file, None)
+        try:
+            ast = cmark.hotdoc_to_ast(contents, self, source_file)
+        finally:
+            self.__parsed_source = None
         return Page(source_file, False, self.project.sanitized_name, extension_name,
                     source_file=source_file, ast=ast, meta=meta, raw_contents=raw_contents,
                     output_path=output_path)
 
+    def parse_pages_again(self, source_files):
+        """
+        Parse again the pages of this tree written in @source_files.
+
+        Only the markdown pages listing no symbols can be parsed again on
+        their own, the extensions dispatch the symbols of the other pages
+        when the tree is built.
+
+        Args:
+            source_files: set, absolute paths of the modified files.
+
+        Returns:
+            dict: The new pages by name, or None if one of the pages can't
+                be parsed again on its own.
+        """
+        pages = {}
+        for name, page in self.__all_pages.items():
+            if page.generated or page.source_file not in source_files:
+                continue
+
+            if page.extension_name != 'core' or page.symbol_names:
+                return None
+
+            source_file, include_path = find_file(
+                name, self.project.include_paths)
+            if source_file is None:
+                return None
+
+            new_page = self.parse_page(source_file, include_path, 'core')
+            if _get_static_meta(new_page) != _get_static_meta(page):
+                return None
+
+            pages[name] = new_page
+
+        return pages
+
+    def replace_pages(self, pages, database, link_resolver):
+        """
+        Replace pages of this tree with the ones returned by
+        `Tree.parse_pages_again`, and resolve their symbols.
+        """
+        for name, page in pages.items():
+            old_page = self.__all_pages[name]
+            page.subpages = old_page.subpages
+            page.pre_sorted = old_page.pre_sorted
+            self.__all_pages[name] = page
+            if old_page is self.root:
+                self.root = page
+            page.resolve_symbols(self, database, link_resolver)
+            self.__update_dep_map(page, page.symbols)
+
     def get_pages(self):
         """
         Banana banana
@@ -621,7 +786,43 @@ class Tree:
         """
         info('formatting %s' % page.source_file, 'formatting')
         extension = extensions[page.extension_name]
+
+        if page.name in self.project.subprojects:
+            extension.format_page(page, link_resolver, output)
+            return
+
+        Profiler.count('pages')
+        self.__format_or_restore(extension, page, link_resolver, output)
+
+        if self.app.low_memory:
+            page.release_sources()
+
+    def __format_or_restore(self, extension, page, link_resolver, output):
+        build_cache = self.app.build_cache
+
+        if build_cache is None or not output:
+            self.__format_with_extension(extension, page, link_resolver,
+                                         output)
+            return
+
+        if build_cache.restore_page(self, page, extension.formatter,
+                                    link_resolver):
+            return
+
+        n_journal = len(Logger.journal)
+        link_resolver.start_recording()
+        try:
+            self.__format_with_extension(extension, page, link_resolver,
+                                         output)
+        finally:
+            references = link_resolver.stop_recording()
+        build_cache.store_page(page, references, link_resolver, n_journal)
+
+    # pylint: disable=no-self-use
+    def __format_with_extension(self, extension, page, link_resolver, output):
+        start = time.perf_counter()
         extension.format_page(page, link_resolver, output)
+        Profiler.record_page(page.name, time.perf_counter() - start)
 
     def format(self, link_resolver, output, extensions):
         """Banana banana
@@ -635,15 +836,210 @@ class Tree:
 
         self.__extensions = extensions
 
-        for page in self.walk():
-            self.format_page(page, link_resolver, output, extensions)
+        jobs = self.__get_jobs()
+        if jobs > 1:
+            self.__format_in_workers(link_resolver, output, extensions, jobs)
+        else:
+            for page in self.walk():
+                self.format_page(page, link_resolver, output, extensions)
 
         self.__extensions = None
         link_resolver.get_link_signal.disconnect(self.__get_link_cb)
 
+    def __get_jobs(self):
+        jobs = self.app.jobs
+        if jobs > 1 and 'fork' not in multiprocessing.get_all_start_methods():
+            info('Using worker processes is not supported on this platform',
+                 'formatting')
+            jobs = 1
+        return jobs
+
+    # pylint: disable=too-many-arguments
+    def _render_page(self, page, link_resolver, output, extensions,
+                     record_references):
+        info('formatting %s' % page.source_file, 'formatting')
+        n_journal = len(Logger.journal)
+        n_fatal_warnings = Logger.n_fatal_warnings
+        # Only send back what is recorded for that page
+        Profiler.take()
+        error_message = None
+
+        if record_references:
+            link_resolver.start_recording()
+        try:
+            self.__format_with_extension(extensions[page.extension_name],
+                                         page, link_resolver, output)
+        except HotdocException as exc:
+            error_message = exc.message
+        references = link_resolver.stop_recording()
+
+        output_attrs = {}
+        for key, attrs in (page.output_attrs or {}).items():
+            output_attrs[key] = dict(attrs)
+
+        return PageRendering(
+            page.detailed_description, page.title, page.short_description,
+            page.formatted_contents, page.meta, page.build_path,
+            list(page.cached_paths), output_attrs,
+            list(Formatter.all_scripts), list(Formatter.all_stylesheets),
+            references, Logger.journal[n_journal:],
+            Logger.n_fatal_warnings - n_fatal_warnings, error_message,
+            Profiler.take())
+
+    # pylint: disable=no-self-use
+    def __merge_rendering(self, page, rendering, link_resolver, build_cache):
+        n_journal = len(Logger.journal)
+        Logger.replay(rendering.journal, rendering.n_fatal_warnings)
+        Profiler.merge(rendering.profile)
+        if rendering.error is not None:
+            raise HotdocException(rendering.error)
+
+        page.detailed_description = rendering.detailed_description
+        page.title = rendering.title
+        page.short_description = rendering.short_description
+        page.formatted_contents = rendering.formatted_contents
+        page.meta = rendering.meta
+        page.build_path = rendering.build_path
+        page.cached_paths |= OrderedSet(rendering.cached_paths)
+        page.output_attrs = defaultdict(lambda: defaultdict(dict))
+        for key, attrs in rendering.output_attrs.items():
+            page.output_attrs[key].update(attrs)
+
+        Formatter.all_scripts.update(rendering.scripts)
+        Formatter.all_stylesheets.update(rendering.stylesheets)
+        if rendering.detailed_description is not None:
+            Formatter.pages_memory_size += len(rendering.detailed_description)
+
+        if build_cache:
+            build_cache.store_page(page, rendering.references, link_resolver,
+                                   n_journal)
+
+        if self.app.low_memory:
+            page.release_sources()
+
+    def __format_in_workers(self, link_resolver, output, extensions, jobs):
+        # pylint: disable=global-statement
+        global _FORMATTING_STATE
+
+        build_cache = self.app.build_cache if output else None
+        pages = []
+        for page in self.walk():
+            if page.name in self.project.subprojects:
+                # Subprojects format their own trees
+                self.format_page(page, link_resolver, output, extensions)
+                continue
+
+            Profiler.count('pages')
+            formatter = extensions[page.extension_name].formatter
+            if build_cache and build_cache.restore_page(
+                    self, page, formatter, link_resolver):
+                if self.app.low_memory:
+                    page.release_sources()
+                continue
+
+            pages.append(page)
+
+        if not pages:
+            return
+
+        info('Formatting %d pages with %d jobs' % (len(pages), jobs),
+             'formatting')
+
+        _FORMATTING_STATE = (self, pages, link_resolver, output, extensions,
+                             build_cache is not None)
+        chunksize = max(1, len(pages) // (jobs * 4))
+        try:
+            context = multiprocessing.get_context('fork')
+            with context.Pool(jobs, initializer=_init_formatting_worker,
+                              initargs=(jobs,)) as pool:
+                renderings = pool.imap(_format_page_in_worker,
+                                       range(len(pages)), chunksize)
+                for page, rendering in zip(pages, renderings):
+                    self.__merge_rendering(page, rendering, link_resolver,
+                                           build_cache)
+        finally:
+            _FORMATTING_STATE = None
+
+    def _write_page(self, page, output):
+        n_journal = len(Logger.journal)
+        n_fatal_warnings = Logger.n_fatal_warnings
+        error_message = None
+        extra_assets = dict(self.project.extra_assets)
+
+        try:
+            ext = self.project.extensions[page.extension_name]
+            ext.write_out_page(output, page)
+        except HotdocException as exc:
+            error_message = exc.message
+
+        new_assets = [(dest, src) for dest, src in
+                      self.project.extra_assets.items()
+                      if extra_assets.get(dest) != src]
+
+        return PageWriting(new_assets, Logger.journal[n_journal:],
+                           Logger.n_fatal_warnings - n_fatal_warnings,
+                           error_message)
+
+    def __merge_writing(self, page, writing, output):
+        Logger.replay(writing.journal, writing.n_fatal_warnings)
+        if writing.error is not None:
+            raise HotdocException(writing.error)
+
+        self.project.extra_assets.update(writing.extra_assets)
+
+        formatter = self.project.extensions[page.extension_name].formatter
+        formatter.writing_page_signal(
+            formatter, page, formatter.get_page_output_path(page, output),
+            None)
+
+        if self.app.low_memory:
+            page.release_rendering()
+
+    def __write_out_in_workers(self, output, jobs):
+        # pylint: disable=global-statement
+        global _WRITING_STATE
+
+        pages = []
+        for page in self.walk():
+            if page.name in self.project.subprojects:
+                # Subprojects write out their own trees
+                ext = self.project.extensions[page.extension_name]
+                ext.write_out_page(output, page)
+            else:
+                pages.append(page)
+
+        if not pages:
+            return
+
+        # Workers would all write the navigation sitemap otherwise
+        html_dir = os.path.join(output, 'html')
+        os.makedirs(html_dir, exist_ok=True)
+        self.project.extensions[self.root.extension_name].write_out_sitemap(
+            os.path.join(html_dir, 'hotdoc-sitemap.html'))
+
+        _WRITING_STATE = (self, pages, output)
+        chunksize = max(1, len(pages) // (jobs * 4))
+        try:
+            context = multiprocessing.get_context('fork')
+            with context.Pool(jobs, initializer=_init_writing_worker) as pool:
+                writings = pool.imap(_write_page_in_worker,
+                                     range(len(pages)), chunksize)
+                for page, writing in zip(pages, writings):
+                    self.__merge_writing(page, writing, output)
+        finally:
+            _WRITING_STATE = None
+
     def write_out(self, output):
         """Banana banana
         """
+        jobs = self.__get_jobs()
+        if jobs > 1:
+            self.__write_out_in_workers(output, jobs)
+            return
+
         for page in self.walk():
             ext = self.project.extensions[page.extension_name]
             ext.write_out_page(output, page)
+            if self.app.low_memory and \
+                    page.name not in self.project.subprojects:
+                page.release_rendering()
@@ -20,12 +20,14 @@ import os
 import sys
 import itertools
 import linecache
+import multiprocessing
 import pkgconfig
 import glob
 import subprocess
 import shutil
 
 from hotdoc.extensions.c.clang import cindex
+from collections import namedtuple, OrderedDict
 from ctypes import *
 from fnmatch import fnmatch
 
@@ -35,6 +37,8 @@ from hotdoc.core.exceptions import ParsingException, BadInclusionException, Hotd
 from hotdoc.core.symbols import *
 from hotdoc.core.comment import comment_from_tag
 from hotdoc.core.links import Link
+from hotdoc.core.source_cache import (SourceCache, ProbeCache, get_warnings,
+                                      replay_warnings)
 
 from hotdoc.parsers.gtk_doc import GtkDocParser, gather_links, search_online_links
 from hotdoc.extensions.gi.gi_extension import GIExtension
@@ -84,7 +88,7 @@ CLANG_HEADERS_WARNING = (
     '\'llvm-config --version\' and \'llvm-config --prefix\' commands')
 
 
-def get_clang_headers():
+def _find_clang_headers():
     try:
         # Clang 5.0+ can tell us directly
         resource_dir = subprocess.check_output(
@@ -93,7 +97,7 @@ def get_clang_headers():
             include_dir = os.path.join(resource_dir, 'include')
             if os.path.exists(include_dir):
                 return include_dir
-    except subprocess.CalledProcessError:
+    except (OSError, subprocess.CalledProcessError):
         pass
     version = subprocess.check_output(
         [LLVM_CONFIG, '--version']).strip().decode()
@@ -107,25 +111,133 @@ def get_clang_headers():
         if os.path.exists(p):
             return p
 
-    warn('clang-headers-not-found', CLANG_HEADERS_WARNING)
+    return None
 
 
-CLANG_HEADERS = get_clang_headers()
+def _find_clang_libdir():
+    return subprocess.check_output([LLVM_CONFIG, '--libdir']).strip().decode()
 
 
-def get_clang_libdir():
-    return subprocess.check_output([LLVM_CONFIG, '--libdir']).strip().decode()
+# Probing the toolchain spawns processes, what it finds is cached, see
+# get_probe_cache
+_PROBE_CACHES = {}
+
+
+def get_probe_cache(app):
+    """
+    Returns:
+        ProbeCache: the cache of what was found out about clang,
+            llvm-config and pkg-config, in the cache folder of @app.
+    """
+    cache_dir = app.cache_dir
+    if cache_dir not in _PROBE_CACHES:
+        path = None
+        if cache_dir:
+            path = os.path.join(cache_dir, 'c-extension-probes.json')
+        _PROBE_CACHES[cache_dir] = ProbeCache(path)
+    return _PROBE_CACHES[cache_dir]
+
+
+def get_clang_headers(probes):
+    clang_headers = probes.get(
+        ['clang-headers', LLVM_CONFIG],
+        [shutil.which('clang'), LLVM_CONFIG], _find_clang_headers)
+    if clang_headers is None:
+        warn('clang-headers-not-found', CLANG_HEADERS_WARNING)
+    return clang_headers
+
+
+def get_clang_libdir(probes):
+    return probes.get(['clang-libdir', LLVM_CONFIG], [LLVM_CONFIG],
+                      _find_clang_libdir)
+
+
+def get_pkg_config_cflags(probes, package):
+    """
+    Returns:
+        str: the output of `pkg-config --cflags @package`. It is cached
+            as long as neither pkg-config, its environment nor the
+            folders it looks up .pc files in change.
+    """
+    binary = shutil.which(os.environ.get('PKG_CONFIG') or 'pkg-config')
+    if binary is None:
+        return pkgconfig.cflags(package)
+
+    env = [os.environ.get(var) or '' for var in (
+        'PKG_CONFIG_PATH', 'PKG_CONFIG_LIBDIR', 'PKG_CONFIG_SYSROOT_DIR')]
+
+    def find_pc_path():
+        return subprocess.check_output(
+            [binary, '--variable', 'pc_path', 'pkg-config']).strip().decode()
+
+    pc_path = probes.get(['pkg-config-pc-path', binary] + env, [binary],
+                         find_pc_path)
+    # Installing or updating a package replaces its .pc file, which
+    # changes the modification time of the folder
+    pc_dirs = [dir_ for paths in env[:2] + [pc_path]
+               for dir_ in paths.split(os.pathsep) if dir_]
+
+    return probes.get(['pkg-config-cflags', binary, package] + env,
+                      [binary] + pc_dirs,
+                      lambda: pkgconfig.cflags(package))
+
+
+class SymbolDescription:
+    """
+    Plain-data description of a symbol found by a scanning worker, the
+    main process creates the actual symbol from it, see
+    `ClangScanner.scan`.
+    """
+    __slots__ = ('type_', 'unique_name', 'kwargs')
+
+    def __init__(self, type_, kwargs):
+        self.type_ = type_
+        self.unique_name = kwargs.get('unique_name') or \
+            kwargs.get('display_name')
+        self.kwargs = kwargs
+
+
+class _SymbolRecorder:
+    """
+    Stands for the extension in scanning workers, describing the symbols
+    instead of creating them.
+    """
+
+    # pylint: disable=no-self-use
+    def create_symbol(self, type_, **kwargs):
+        return SymbolDescription(type_, kwargs)
+
+
+# What a scanning worker sends back to the main process for each
+# translation unit, the descriptions of the symbols found in each of
+# the parsed files, in parsing order. It is also what gets cached for
+# the translation unit, along with the files it included
+TranslationUnitScan = namedtuple('TranslationUnitScan', [
+    'files', 'renamed_symbols', 'dependencies', 'journal', 'n_fatal_warnings',
+    'error'])
+
+# Set by ClangScanner before forking its workers, which inherit it
+_SCANNING_STATE = None
+_WORKER_INDEX = None
+
+
+def _init_scanning_worker():
+    # pylint: disable=global-statement
+    global _WORKER_INDEX
+    # The main process prints the journal of the workers as it merges it
+    Logger.silent = True
+    _WORKER_INDEX = cindex.Index.create()
+
+
+def _scan_translation_unit_in_worker(filename):
+    scanner, args, flags, full_scan = _SCANNING_STATE
+    # pylint: disable=protected-access
+    return scanner._scan_translation_unit(_WORKER_INDEX, filename, args,
+                                          flags, full_scan)
 
 
 class ClangScanner(object):
     def __init__(self, app, project, doc_db):
-        if not cindex.Config.loaded:
-            # Let's try and find clang ourselves first
-            clang_libdir = get_clang_libdir()
-            if os.path.exists(clang_libdir):
-                cindex.Config.set_library_path(clang_libdir)
-            cindex.Config.set_compatibility_check(False)
-
         self.app = app
         self.project = project
         self.__doc_db = doc_db
@@ -140,6 +252,14 @@ class ClangScanner(object):
         else:
             self.__all_sources = all_sources
 
+        probes = get_probe_cache(self.app)
+        if not cindex.Config.loaded:
+            # Let's try and find clang ourselves first
+            clang_libdir = get_clang_libdir(probes)
+            if os.path.exists(clang_libdir):
+                cindex.Config.set_library_path(clang_libdir)
+            cindex.Config.set_compatibility_check(False)
+
         index = cindex.Index.create()
         flags = cindex.TranslationUnit.PARSE_INCOMPLETE | cindex.TranslationUnit.PARSE_DETAILED_PROCESSING_RECORD
 
@@ -148,13 +268,34 @@ class ClangScanner(object):
 
         # FIXME: er maybe don't do that ?
         args = ["-Wno-attributes"]
-        args.append("-isystem%s" % CLANG_HEADERS)
+        clang_headers = get_clang_headers(probes)
+        if clang_headers:
+            args.append("-isystem%s" % clang_headers)
         args.extend(options)
         self.symbols = {}
         self.parsed = set({})
 
         debug('CFLAGS %s' % ' '.join(args))
 
+        to_parse = [filename for filename in self.filenames
+                    if any(fnmatch(filename, p) for p in full_scan_patterns)]
+        jobs = min(self.app.jobs, len(to_parse))
+        # Workers can't have workers of their own, subprojects may be
+        # scanned in one already
+        if jobs < 2 or 'fork' not in multiprocessing.get_all_start_methods() \
+                or multiprocessing.current_process().daemon:
+            jobs = 1
+
+        cache = None
+        if self.app.cache_dir:
+            cache = SourceCache(os.path.join(self.app.cache_dir,
+                                             'c-extension'))
+
+        if cache is not None or jobs > 1:
+            # Everything is marked as parsed then
+            self.__scan_translation_units(index, to_parse, args, flags,
+                                          full_scan, jobs, cache)
+
         header_guarded = set()
 
         for filename in self.filenames:
@@ -188,11 +329,158 @@ class ClangScanner(object):
 
         if not full_scan:
             comment_parser = GtkDocParser(self.project)
-            CCommentExtractor(self.__doc_db, comment_parser).parse_comments(
-                filenames)
+            CCommentExtractor(self.__doc_db,
+                              comment_parser).parse_comments(filenames)
 
         return True
 
+    # pylint: disable=too-many-arguments
+    def _scan_translation_unit(self, index, filename, args, flags, full_scan):
+        n_journal = len(Logger.journal)
+        n_fatal_warnings = Logger.n_fatal_warnings
+        error_message = None
+        files = OrderedDict()
+        dependencies = []
+
+        # Describes the symbols, and leaves our state alone
+        scanner = ClangScanner(self.app, self.project, _SymbolRecorder())
+        scanner.filenames = self.filenames
+        scanner.__all_sources = self.__all_sources
+        scanner.symbols = {}
+        scanner.parsed = set({})
+
+        def parse_file(fname, tu):
+            if fname in scanner.parsed or fname not in scanner.filenames:
+                return
+            n_symbols = len(scanner.symbols)
+            scanner.__parse_file(fname, tu, full_scan)
+            files[fname] = list(scanner.symbols.values())[n_symbols:]
+
+        try:
+            debug('scanning %s' % filename)
+            tu = index.parse(filename, args=args, options=flags)
+
+            for diag in tu.diagnostics:
+                warn('clang-diagnostic', 'Clang issue : %s' % str(diag))
+
+            parse_file(filename, tu)
+            for include in tu.get_includes():
+                fname = os.path.abspath(str(include.include))
+                dependencies.append(fname)
+                parse_file(fname, tu)
+        except HotdocException as exc:
+            error_message = exc.message
+
+        return TranslationUnitScan(files, scanner.__renamed_symbols,
+                                   dependencies,
+                                   Logger.journal[n_journal:],
+                                   Logger.n_fatal_warnings - n_fatal_warnings,
+                                   error_message)
+
+    def __create_described_symbol(self, description):
+        kwargs = dict(description.kwargs)
+        if 'members' in kwargs:
+            members = [self.__create_described_symbol(member)
+                       for member in kwargs['members']]
+            kwargs['members'] = [member for member in members if member]
+        return self.__doc_db.create_symbol(description.type_, **kwargs)
+
+    def __merge_translation_unit(self, scan):
+        Logger.replay(scan.journal, scan.n_fatal_warnings)
+        if scan.error is not None:
+            raise HotdocException(scan.error)
+
+        self.__renamed_symbols.update(scan.renamed_symbols)
+
+        for fname, descriptions in scan.files.items():
+            # Files included by several translation units were parsed
+            # in each of them, only keep the first one like a serial scan
+            if fname in self.parsed:
+                continue
+            self.parsed.add(fname)
+
+            for description in descriptions:
+                if description.unique_name in self.symbols:
+                    continue
+                sym = self.__create_described_symbol(description)
+                if sym is not None:
+                    self.symbols[sym.unique_name] = sym
+
+    # pylint: disable=too-many-arguments
+    def __scan_translation_units(self, index, filenames, args, flags,
+                                 full_scan, jobs, cache):
+        salt = [flags, full_scan] + args
+        sources = set(self.filenames)
+        scans = OrderedDict()
+        cached = set()
+
+        for filename in filenames:
+            scan = None
+            if cache is not None:
+                scan = cache.load(filename, salt, sources)
+            if scan is not None:
+                cached.add(filename)
+            scans[filename] = scan
+
+        to_parse = [filename for filename in filenames
+                    if filename not in cached]
+        if cache is not None:
+            info('%d of %d translation units found in the cache' % (
+                len(filenames) - len(to_parse), len(filenames)))
+
+        parsed = self.__parse_translation_units(index, to_parse, args, flags,
+                                                full_scan, jobs)
+        for filename, scan in zip(to_parse, parsed):
+            if cache is not None and scan.error is None:
+                cache.store(filename, salt,
+                            scan._replace(journal=get_warnings(scan.journal),
+                                          n_fatal_warnings=0),
+                            scan.dependencies, sources)
+            scans[filename] = scan
+
+        for filename, scan in scans.items():
+            # Only merge what a serial scan would have parsed
+            if filename in self.parsed:
+                continue
+            if filename in cached:
+                # Only the warnings were stored
+                replay_warnings(scan.journal)
+                scan = scan._replace(journal=[])
+            self.__merge_translation_unit(scan)
+
+    # pylint: disable=too-many-arguments
+    def __parse_translation_units(self, index, filenames, args, flags,
+                                  full_scan, jobs):
+        # pylint: disable=global-statement
+        global _SCANNING_STATE
+
+        if jobs < 2 or len(filenames) < 2:
+            for filename in filenames:
+                silent = Logger.silent
+                Logger.silent = True
+                try:
+                    scan = self._scan_translation_unit(index, filename, args,
+                                                       flags, full_scan)
+                finally:
+                    Logger.silent = silent
+                # Logged again when merged, like the scans of workers
+                del Logger.journal[len(Logger.journal) - len(scan.journal):]
+                Logger.n_fatal_warnings -= scan.n_fatal_warnings
+                yield scan
+            return
+
+        info('parsing %d translation units with %d jobs' % (len(filenames),
+                                                            jobs))
+
+        _SCANNING_STATE = (self, args, flags, full_scan)
+        try:
+            context = multiprocessing.get_context('fork')
+            with context.Pool(jobs, initializer=_init_scanning_worker) as pool:
+                yield from pool.imap(_scan_translation_unit_in_worker,
+                                     filenames)
+        finally:
+            _SCANNING_STATE = None
+
     def set_extension(self, extension):
         self.__doc_db = extension
 
@@ -489,15 +777,14 @@ class ClangScanner(object):
         spelling = spelling or node.spelling
         members = []
         for member in node.get_children():
-            member_value = member.enum_value
             # FIXME: this is pretty much a macro symbol ?
             member = self.__doc_db.create_symbol(EnumMemberSymbol, display_name=member.spelling,
                                                  filename=str(
                                                      member.location.file),
-                                                 lineno=member.location.line)
+                                                 lineno=member.location.line,
+                                                 enum_value=member.enum_value)
 
             if member:
-                member.enum_value = member_value
                 members.append(member)
 
         anonymous = not node.spelling
@@ -591,11 +878,11 @@ class ClangScanner(object):
                                            lineno=node.location.line, type_qs=type_qs)
 
 
-def flags_from_config(config):
+def flags_from_config(config, probes):
     flags = []
 
     for package in config.get('pkg_config_packages') or []:
-        flags.extend(pkgconfig.cflags(package).split(' '))
+        flags.extend(get_pkg_config_cflags(probes, package).split(' '))
 
     extra_flags = config.get('extra_c_flags') or []
     for flag in extra_flags:
@@ -618,7 +905,8 @@ class CExtension(Extension):
     def __init__(self, app, project):
         Extension.__init__(self, app, project)
         self.project = project
-        self.flags = []
+        self.__config = None
+        self.__flags = None
         if not CExtension.connected:
             inclusions.include_signal.connect(self.__include_file_cb)
             CExtension.connected = True
@@ -680,6 +968,27 @@ class CExtension(Extension):
     def setup(self):
         super(CExtension, self).setup()
         gather_links()
+
+    @property
+    def flags(self):
+        """
+        The flags to parse the sources with, pkg-config is only run when
+        they are first needed.
+        """
+        if self.__flags is None:
+            self.__flags = []
+            if self.__config is not None:
+                self.__flags = flags_from_config(
+                    self.__config, get_probe_cache(self.app))
+                for dir_ in self.__config.get_paths(
+                        'c_include_directories') or []:
+                    self.__flags.append('-I%s' % dir_)
+        return self.__flags
+
+    def scan(self):
+        if not self.sources:
+            return
+
         self.scanner.scan(self.sources, self.flags, False, ['*.h'],
                           all_sources=self.sources)
 
@@ -703,6 +1012,5 @@ class CExtension(Extension):
 
     def parse_config(self, config):
         super(CExtension, self).parse_config(config)
-        self.flags = flags_from_config(config)
-        for dir_ in config.get_paths('c_include_directories') or []:
-            self.flags.append('-I%s' % dir_)
+        self.__config = config
+        self.__flags = None
@@ -1,53 +1,203 @@
 import os
+import copy
+import weakref
+import multiprocessing
 from collections import namedtuple
 
 from hotdoc.parsers.c_comment_scanner.c_comment_scanner import extract_comments
 
 from hotdoc.core.symbols import *
-from hotdoc.utils.loggable import debug, error
+from hotdoc.core.exceptions import HotdocException
+from hotdoc.core.source_cache import (SourceCache, get_warnings,
+                                      replay_warnings)
+from hotdoc.utils.loggable import debug, info, error, Logger
+from hotdoc.utils.utils import OrderedSet, digest_file
 
 
 RawMacro = namedtuple('RawMacro', ['raw', 'filename'])
 
+# What is extracted from a source file, and cached for it
+ExtractedComments = namedtuple('ExtractedComments', ['blocks', 'raw_macros',
+                                                     'warnings'])
+
+# What an extraction worker sends back to the main process for each
+# source file
+CommentsExtraction = namedtuple('CommentsExtraction', [
+    'extracted', 'journal', 'n_fatal_warnings', 'error'])
+
+# Set by CCommentExtractor before forking its workers, which inherit it
+_EXTRACTION_STATE = None
+
+# What was extracted from each source file by application, see
+# get_extracted_comments
+_EXTRACTED_COMMENTS = weakref.WeakKeyDictionary()
+
+
+def get_extracted_comments(app):
+    """
+    Returns:
+        dict: What was extracted from each source file during the run of
+            @app, by filename, digest and salt.
+    """
+    return _EXTRACTED_COMMENTS.setdefault(app, {})
+
+
+def _init_extraction_worker():
+    # The main process prints the journal of the workers as it merges it
+    Logger.silent = True
+
+
+def _extract_comments_in_worker(filename):
+    # pylint: disable=protected-access
+    return _EXTRACTION_STATE._extract_comments(filename)
+
 
 class CCommentExtractor:
     def __init__(self, extension, comment_parser):
         self.extension = extension
         self.app = extension.app
+        # The C, GI and gst extensions often parse the comments of the
+        # same files, these are only scanned once per run. Each extension
+        # gets its own copy of the comments, as the formatters store
+        # their state on them
+        self.__extracted = get_extracted_comments(self.app)
         self.project = extension.project
         self.__raw_comment_parser = comment_parser
         self.__raw_macros = []
+        self.__cache = None
+        if self.app.cache_dir:
+            self.__cache = SourceCache(os.path.join(self.app.cache_dir,
+                                                    'comments'))
 
     def parse_comments(self, filenames):
+        salt = ['comments', type(self.__raw_comment_parser).__name__]
+        salt += sorted(self.project.tag_validators)
+        keys = {filename: self.__get_key(filename, salt)
+                for filename in filenames}
+
+        to_extract = OrderedSet()
         for filename in filenames:
-            with open(filename, 'r', encoding='utf-8') as f:
-                debug('Getting comments in %s' % filename)
-                lines = []
-                header = filename.endswith('.h')
-                skip_next_symbol = header
-                # FIXME Use the lexer for that!
-                for l in f.readlines():
-                    lines.append(l)
-                    if skip_next_symbol and l.startswith("#pragma once"):
-                        skip_next_symbol = False
-
-                cs = extract_comments(''.join(lines))
-                for c in cs:
-                    if c[3]:
-                        line = lines[c[1] - 1]
-
-                        comment = (len(line) - len(line.lstrip(' '))
-                                   ) * ' ' + c[0]
-                        block = self.__raw_comment_parser.parse_comment(comment,
-                                                                        filename, c[1], c[2], self.project.include_paths)
-                        if block is not None:
-                            self.extension.add_comment(block)
-                    elif not skip_next_symbol:
-                        if header:
-                            self.__raw_macros.append(RawMacro(c, filename))
-                            # self.__create_macro_from_raw_text(c, filename, filter_names)
-                    else:
-                        skip_next_symbol = False
+            if keys[filename] in self.__extracted:
+                continue
+
+            extracted = None
+            if self.__cache is not None:
+                extracted = self.__cache.load(filename, salt)
+
+            if extracted is None:
+                to_extract.add(filename)
+            else:
+                replay_warnings(extracted.warnings)
+                self.__extracted[keys[filename]] = extracted
+
+        to_extract = list(to_extract)
+        for filename, extracted in zip(to_extract,
+                                       self.__extract_all(to_extract)):
+            self.__extracted[keys[filename]] = extracted
+            if self.__cache is not None:
+                self.__cache.store(filename, salt, extracted)
+
+        for filename in filenames:
+            extracted = self.__extracted[keys[filename]]
+            for block in copy.deepcopy(extracted.blocks):
+                self.extension.add_comment(block)
+            self.__raw_macros.extend(extracted.raw_macros)
+
+    def __get_key(self, filename, salt):
+        # Several projects may be documented in the same process
+        if self.__cache is not None:
+            digest = self.__cache.digest(filename)
+        else:
+            digest = digest_file(filename)
+        return (filename, digest) + tuple(salt)
+
+    def __extract_all(self, filenames):
+        # pylint: disable=global-statement
+        global _EXTRACTION_STATE
+
+        jobs = min(self.app.jobs, len(filenames))
+        # Workers can't have workers of their own, subprojects may be
+        # scanned in one already
+        if jobs < 2 or 'fork' not in multiprocessing.get_all_start_methods() \
+                or multiprocessing.current_process().daemon:
+            for filename in filenames:
+                n_journal = len(Logger.journal)
+                extracted = self.__extract_comments(filename)
+                yield extracted._replace(
+                    warnings=get_warnings(Logger.journal[n_journal:]))
+            return
+
+        info('extracting comments from %d files with %d jobs' %
+             (len(filenames), jobs))
+
+        _EXTRACTION_STATE = self
+        chunksize = max(1, len(filenames) // (jobs * 4))
+        try:
+            context = multiprocessing.get_context('fork')
+            with context.Pool(jobs,
+                              initializer=_init_extraction_worker) as pool:
+                for extraction in pool.imap(_extract_comments_in_worker,
+                                            filenames, chunksize):
+                    Logger.replay(extraction.journal,
+                                  extraction.n_fatal_warnings)
+                    if extraction.error is not None:
+                        raise HotdocException(extraction.error)
+                    yield extraction.extracted
+        finally:
+            _EXTRACTION_STATE = None
+
+    def _extract_comments(self, filename):
+        n_journal = len(Logger.journal)
+        n_fatal_warnings = Logger.n_fatal_warnings
+        extracted = None
+        error_message = None
+
+        try:
+            extracted = self.__extract_comments(filename)
+        except HotdocException as exc:
+            error_message = exc.message
+
+        journal = Logger.journal[n_journal:]
+        if extracted is not None:
+            extracted = extracted._replace(warnings=get_warnings(journal))
+
+        return CommentsExtraction(extracted, journal,
+                                  Logger.n_fatal_warnings - n_fatal_warnings,
+                                  error_message)
+
+    def __extract_comments(self, filename):
+        blocks = []
+        raw_macros = []
+        with open(filename, 'r', encoding='utf-8') as f:
+            debug('Getting comments in %s' % filename)
+            lines = []
+            header = filename.endswith('.h')
+            skip_next_symbol = header
+            # FIXME Use the lexer for that!
+            for l in f.readlines():
+                lines.append(l)
+                if skip_next_symbol and l.startswith("#pragma once"):
+                    skip_next_symbol = False
+
+            cs = extract_comments(''.join(lines))
+            for c in cs:
+                if c[3]:
+                    line = lines[c[1] - 1]
+
+                    comment = (len(line) - len(line.lstrip(' '))
+                               ) * ' ' + c[0]
+                    block = self.__raw_comment_parser.parse_comment(comment,
+                                                                    filename, c[1], c[2], self.project.include_paths)
+                    if block is not None:
+                        blocks.append(block)
+                elif not skip_next_symbol:
+                    if header:
+                        raw_macros.append(RawMacro(c, filename))
+                        # self.__create_macro_from_raw_text(c, filename, filter_names)
+                else:
+                    skip_next_symbol = False
+
+        return ExtractedComments(blocks, raw_macros, [])
 
     def create_macro_symbols(self, filter_names=None, filenames=None):
         filenames = filenames or set()
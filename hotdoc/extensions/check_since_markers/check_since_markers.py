@@ -18,6 +18,7 @@
 # pylint: disable=missing-docstring
 
 import json
+from hotdoc.core.database import NDJSONIndex, SQLiteIndex, SQLITE_DATABASE
 from hotdoc.core.exceptions import HotdocSourceException
 from hotdoc.utils.loggable import Logger, warn
 from hotdoc.core.extension import Extension
@@ -44,7 +45,11 @@ class CheckMissingSinceMarkersExtension(Extension):
     def add_arguments(parser):
         group = parser.add_argument_group('since-markers-check-extension',
                                           DESCRIPTION)
-        group.add_argument("--previous-symbol-index")
+        group.add_argument("--previous-symbol-index",
+                           help="The symbol_index.json of the previous "
+                           "release, or its symbol_index.ndjson or %s with "
+                           "the ndjson or sqlite --database-format" %
+                           SQLITE_DATABASE)
 
     def parse_toplevel_config(self, config):
         self.__symbols_database = config.get_index(prefix="previous_symbol")
@@ -68,29 +73,42 @@ class CheckMissingSinceMarkersExtension(Extension):
             inherited_sinces.add(child)
             self.__add_children_with_since(inherited_sinces, child)
 
-    def __check_since_markers(self, app):
+    def __load_previous_symbols(self):
+        # Only membership is checked, the names are not all loaded
+        if self.__symbols_database.endswith('.db'):
+            return SQLiteIndex(self.__symbols_database)
+        if self.__symbols_database.endswith('.ndjson'):
+            return NDJSONIndex(self.__symbols_database)
+
         with open(self.__symbols_database) as f:
-            prev_symbols = set(json.load(f))
+            return set(json.load(f))
+
+    def __check_since_markers(self, app):
+        prev_symbols = self.__load_previous_symbols()
 
         all_symbols = app.database.get_all_symbols()
         inherited_sinces = set()
         missing_since_syms = set()
-        for name, sym in all_symbols.items():
-            if name in prev_symbols:
-                continue
-
-            if not self.__check_has_since(sym):
-                # It is OK for a symbol to not have a Since tag when its
-                # documentation is not exposed (for instance if it has
-                # been marked as private)
-                #
-                # We only run this check here because a private symbol
-                # should still get its Since tag inherited to potential
-                # children
-                if self.project.get_page_for_symbol(name) is not None:
-                    missing_since_syms.add(sym)
-            else:
-                self.__add_children_with_since(inherited_sinces, sym)
+        try:
+            for name, sym in all_symbols.items():
+                if name in prev_symbols:
+                    continue
+
+                if not self.__check_has_since(sym):
+                    # It is OK for a symbol to not have a Since tag when its
+                    # documentation is not exposed (for instance if it has
+                    # been marked as private)
+                    #
+                    # We only run this check here because a private symbol
+                    # should still get its Since tag inherited to potential
+                    # children
+                    if self.project.get_page_for_symbol(name) is not None:
+                        missing_since_syms.add(sym)
+                else:
+                    self.__add_children_with_since(inherited_sinces, sym)
+        finally:
+            if isinstance(prev_symbols, (SQLiteIndex, NDJSONIndex)):
+                prev_symbols.close()
 
         for sym in missing_since_syms - inherited_sinces:
             if sym.comment and sym.comment.filename:
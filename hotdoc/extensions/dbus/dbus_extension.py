@@ -179,9 +179,7 @@ class DBusExtension(Extension):
     def __init__(self, app, project):
         Extension.__init__(self, app, project)
 
-    def setup(self):
-        super(DBusExtension, self).setup()
-
+    def scan(self):
         if not self.sources:
             return
 
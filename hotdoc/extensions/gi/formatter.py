@@ -18,16 +18,21 @@
 
 import os
 import html
+import shutil
+import contextvars
+from collections import OrderedDict
 from wheezy.template.engine import Engine
 from wheezy.template.ext.core import CoreExtension
 from wheezy.template.ext.code import CodeExtension
 from wheezy.template.loader import FileLoader
 from hotdoc.core.formatter import Formatter
 from hotdoc.core.symbols import *
+from hotdoc.utils.profiling import Profiler
 import lxml.etree
 from hotdoc.extensions.gi.node_cache import ALL_GI_TYPES, is_introspectable
 from hotdoc.extensions.gi.symbols import GIClassSymbol, GIInterfaceSymbol, GIStructSymbol
 from hotdoc.extensions.gi.annotation_parser import GIAnnotationParser
+from hotdoc.extensions.gi.utils import RENDER_CONTEXT, RenderContext
 
 
 PYTHON_VARIADIC_LINK = 'https://docs.python.org/dev/tutorial/controlflow.html#arbitrary-argument-lists'
@@ -53,43 +58,110 @@ class GIFormatter(Formatter):
         self._ordering.insert(self._ordering.index(
             InterfaceSymbol) + 1, GIInterfaceSymbol)
         self.__annotation_parser = GIAnnotationParser()
+        # Whether the documentation of symbols in languages other than
+        # the first one is written out apart from the pages
+        self.split_languages = False
+        self.__fragments = OrderedDict()
 
     def format_annotations(self, annotations):
         template = self.engine.get_template('gi_annotations.html')
         return template.render({'annotations': annotations})
 
-    def __add_attrs(self, symbol, **kwargs):
-        if not symbol:
-            return
-        self.extension.add_attrs(symbol, **kwargs)
-        for csym in symbol.get_children_symbols():
-            self.__add_attrs(csym, **kwargs)
+    def __get_language(self):
+        language = self.extension.get_render_language()
+        # Outside of a render context, symbols are formatted as C
+        if language is None:
+            return 'c'
+        return language.language_name
 
-    def __wrap_in_language(self, symbol, langs_docs):
+    def __wrap_in_language(self, symbol, langs_docs, fragments):
         template = self.get_template('symbol_language_wrapper.html')
         res = template.render(
             {'symbol': symbol,
-             'languages': langs_docs})
+             'languages': langs_docs,
+             'fragments': fragments})
         return res
 
+    def __format_symbol_for_language(self, symbol, lang):
+        RENDER_CONTEXT.set(RenderContext(self.extension, lang))
+        return Formatter._format_symbol(self, symbol)
+
     def _format_symbol(self, symbol):
         if isinstance(symbol, (QualifiedSymbol, FieldSymbol, EnumMemberSymbol)):
             return Formatter._format_symbol(self, symbol)
 
+        # Each language is rendered in a context of its own, which the
+        # extension looks up to translate links, nothing is left behind
+        # on the symbols or connected for a given language
+        languages = self.extension.get_languages()
         langs_docs = {}
-        previous_lang = None
-        for lang in self.extension.get_languages():
-            self.extension.setup_language(lang, previous_lang)
+        fragments = {}
+        for lang in languages:
             lang_name = lang.language_name
             if lang_name == 'c' or is_introspectable(symbol.unique_name, lang):
-                self.__add_attrs(symbol, language=lang_name)
-                langs_docs[lang_name] = Formatter._format_symbol(self, symbol)
+                context = contextvars.copy_context()
+                langs_docs[lang_name] = context.run(
+                    self.__format_symbol_for_language, symbol, lang)
             else:
                 langs_docs[lang_name] = None
-            previous_lang = lang
 
-        self.extension.setup_language(None, previous_lang)
-        return self.__wrap_in_language(symbol, langs_docs)
+            if self.split_languages and lang is not languages[0] and \
+                    langs_docs[lang_name]:
+                self.__fragments.setdefault(lang_name, []).append(
+                    (symbol.unique_name, langs_docs[lang_name]))
+                fragments[lang_name] = self.get_fragment_path(
+                    os.path.basename(self._current_page.link.ref), lang_name)
+                langs_docs[lang_name] = None
+
+        return self.__wrap_in_language(symbol, langs_docs, fragments)
+
+    # pylint: disable=no-self-use
+    def get_fragment_path(self, page_path, language_name):
+        """
+        Returns:
+            str: The path the documentation of the symbols of the page at
+                @page_path, in @language_name, is written out to when
+                `split_languages` is set.
+        """
+        return '%s.%s.html' % (os.path.splitext(page_path)[0], language_name)
+
+    def prepare_page_attributes(self, page):
+        super().prepare_page_attributes(page)
+        self.__fragments = OrderedDict()
+
+    def cache_fragments(self, page):
+        """
+        Keep the documentation of the symbols of @page that was split
+        out, in each language, until `write_out_fragments`.
+        """
+        template = self.get_template('symbol_language_fragment.html')
+        cached_path = self.get_cached_page_path(page)
+        for lang in self.extension.get_languages()[1:]:
+            path = self.get_fragment_path(cached_path, lang.language_name)
+            symbols = self.__fragments.get(lang.language_name)
+            if not symbols:
+                if os.path.exists(path):
+                    os.unlink(path)
+                continue
+
+            os.makedirs(os.path.dirname(path), exist_ok=True)
+            with open(path, 'w', encoding='utf-8') as _:
+                _.write(template.render({'symbols': symbols}))
+
+        self.__fragments = OrderedDict()
+
+    def write_out_fragments(self, page, output):
+        """
+        Write out the fragments `cache_fragments` kept for @page, next to
+        it in @output.
+        """
+        cached_path = self.get_cached_page_path(page)
+        full_path = self.get_page_output_path(page, output)
+        for lang in self.extension.get_languages()[1:]:
+            path = self.get_fragment_path(cached_path, lang.language_name)
+            if os.path.exists(path):
+                shutil.copyfile(path, self.get_fragment_path(
+                    full_path, lang.language_name))
 
     def _format_flags(self, flags):
         template = self.engine.get_template('gi_flags.html')
@@ -97,8 +169,7 @@ class GIFormatter(Formatter):
         return out
 
     def _format_type_tokens(self, symbol, type_tokens):
-        language = symbol.get_extension_attribute(
-            self.extension.extension_name, 'language')
+        language = self.__get_language()
         if language != 'c':
             type_desc = self.extension.get_attr(symbol, 'type_desc')
             assert (type_desc)
@@ -128,7 +199,7 @@ class GIFormatter(Formatter):
         return Formatter._format_type_tokens(self, symbol, type_tokens)
 
     def __add_annotations(self, symbol):
-        if self.extension.get_attr(symbol, 'language') == 'c':
+        if self.__get_language() == 'c':
             annotations = self.__annotation_parser.make_annotations(symbol)
 
             # FIXME: OK this is format time but still seems strange
@@ -149,8 +220,7 @@ class GIFormatter(Formatter):
                                               'gi_name') == 'none'
 
         if not is_void:
-            language = retval[0].get_extension_attribute(
-                self.extension.extension_name, 'language')
+            language = self.__get_language()
         else:
             language = 'c'
 
@@ -173,8 +243,7 @@ class GIFormatter(Formatter):
 
     def _format_parameter_symbol(self, parameter):
         self.__add_annotations(parameter)
-        language = parameter.get_extension_attribute(
-            self.extension.extension_name, 'language')
+        language = self.__get_language()
         if language != 'c':
             direction = parameter.get_extension_attribute('gi-extension',
                                                           'direction')
@@ -209,8 +278,7 @@ class GIFormatter(Formatter):
         if not symbol:
             return Formatter._format_linked_symbol(self, symbol)
 
-        language = symbol.get_extension_attribute(
-            self.extension.extension_name, 'language')
+        language = self.__get_language()
         if language == 'c':
             res = Formatter._format_linked_symbol(self, symbol)
             if symbol is None:
@@ -227,8 +295,7 @@ class GIFormatter(Formatter):
         return Formatter._format_linked_symbol(self, symbol)
 
     def _format_prototype(self, function, is_pointer, title):
-        language = function.get_extension_attribute(
-            self.extension.extension_name, 'language')
+        language = self.__get_language()
         if language == 'c':
             return Formatter._format_prototype(self, function,
                                                is_pointer, title)
@@ -267,8 +334,7 @@ class GIFormatter(Formatter):
         return res
 
     def _format_members_list(self, members, member_designation, struct):
-        language = struct.get_extension_attribute(
-            self.extension.extension_name, 'language')
+        language = self.__get_language()
         if language != 'c':
             # Never render members that are in a union, introspected won't show them
             members = [m for m in members if not m.get_extension_attribute(
@@ -277,8 +343,7 @@ class GIFormatter(Formatter):
         return super()._format_members_list(members, member_designation, struct)
 
     def _format_struct(self, struct):
-        language = struct.get_extension_attribute(
-            self.extension.extension_name, 'language')
+        language = self.__get_language()
         if language == 'c':
             return Formatter._format_struct(self, struct)
 
@@ -292,11 +357,11 @@ class GIFormatter(Formatter):
 
     def _format_class_symbol(self, klass):
         saved_raw_text = klass.raw_text
-        if klass.get_extension_attribute(self.extension.extension_name, 'language') != 'c':
+        if self.__get_language() != 'c':
             klass.raw_text = None
         out = Formatter._format_class_symbol(self, klass)
 
-        if klass.get_extension_attribute(self.extension.extension_name, 'language') == 'c':
+        if self.__get_language() == 'c':
             # Render class structure if available.
             if klass.class_struct_symbol:
                 out += '<h3>Class structure</h3>'
@@ -306,8 +371,7 @@ class GIFormatter(Formatter):
         return out
 
     def _format_constant(self, constant):
-        language = constant.get_extension_attribute(
-            self.extension.extension_name, 'language')
+        language = self.__get_language()
         if language == 'c':
             return Formatter._format_constant(self, constant)
 
@@ -318,41 +382,48 @@ class GIFormatter(Formatter):
         return out
 
     def _format_comment(self, comment, link_resolver):
-        ast = comment.extension_attrs['gi-extension']['ast']
-
         if not comment.description:
-            out = u''
-        elif ast:
-            out = self._docstring_formatter.ast_to_html(
-                ast, link_resolver)
-        else:
+            return u''
+
+        attrs = comment.extension_attrs['gi-extension']
+
+        # Comments are parsed once, and only rendered again for each
+        # language if they link to something, as the links are what
+        # differs from one language to the other
+        out = attrs.get('html')
+        if out is not None:
+            Profiler.count('gi-comments-reused')
+            return out
+
+        ast = attrs.get('ast')
+        if not ast:
             ast = self._docstring_formatter.comment_to_ast(
                 comment, link_resolver, self.extension.project.tree)
-            out = self._docstring_formatter.ast_to_html(
-                ast, link_resolver)
-            comment.extension_attrs['gi-extension']['ast'] = ast
+            attrs['ast'] = ast
+
+        n_lookups = link_resolver.n_lookups
+        out = self._docstring_formatter.ast_to_html(ast, link_resolver)
+        if link_resolver.n_lookups == n_lookups:
+            attrs['html'] = out
 
         return out
 
     def _format_callable(self, callable_, callable_type, title,
                          is_pointer=False):
-        language = callable_.get_extension_attribute(
-            self.extension.extension_name, 'language')
+        language = self.__get_language()
         if language == 'python' and isinstance(callable_, ClassMethodSymbol):
             return None
 
         return super()._format_callable(callable_, callable_type, title, is_pointer)
 
     def _format_property_prototype(self, prop, title, type_link):
-        language = prop.get_extension_attribute(
-            self.extension.extension_name, 'language')
+        language = self.__get_language()
         if language == 'python':
             title = 'self.props.%s' % title
         return Formatter._format_property_prototype(self, prop, title, type_link)
 
     def _format_alias(self, alias):
-        language = alias.get_extension_attribute(
-            self.extension.extension_name, 'language')
+        language = self.__get_language()
         if language == 'c':
             return super()._format_alias(alias)
 
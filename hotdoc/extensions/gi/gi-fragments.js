@@ -0,0 +1,38 @@
+/* Loads the documentation of symbols in the language the reader
+ * switched to, when it was written out apart from the page
+ * (--gi-split-languages) */
+function hotdoc_gi_load_fragments(language) {
+    var placeholders = {};
+
+    $(".gi-symbol-" + language + "[data-gi-fragment]").each(function () {
+        var url = $(this).attr("data-gi-fragment");
+        placeholders[url] = placeholders[url] || [];
+        placeholders[url].push(this);
+    });
+
+    $.each(placeholders, function (url, elements) {
+        $.get(url, function (data) {
+            var docs = {};
+
+            $("<div>").html(data).children("[data-gi-symbol]").each(function () {
+                docs[$(this).attr("data-gi-symbol")] = $(this).contents();
+            });
+
+            $.each(elements, function (i, element) {
+                var doc = docs[$(element).attr("data-gi-symbol")];
+                if (doc) {
+                    $(element).append(doc);
+                }
+                $(element).removeAttr("data-gi-fragment");
+            });
+        }, "html");
+    });
+}
+
+$(document).ready(function () {
+    var match = /[?&]gi-language=([^&#]*)/.exec(window.location.search);
+
+    if (match) {
+        hotdoc_gi_load_fragments(decodeURIComponent(match[1]));
+    }
+});
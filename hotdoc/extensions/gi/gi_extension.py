@@ -35,6 +35,7 @@ from hotdoc.core.links import Link, LinkResolver
 from hotdoc.core.tree import Page
 from hotdoc.core.comment import Comment
 from hotdoc.core.exceptions import InvalidOutputException
+from hotdoc.core.source_cache import SourceCache
 from hotdoc.utils.loggable import warn, Logger
 from hotdoc.utils.utils import OrderedSet
 
@@ -47,7 +48,7 @@ from hotdoc.extensions.gi.flags import *
 from hotdoc.extensions.gi.utils import *
 from hotdoc.extensions.gi.node_cache import (
     SMART_FILTERS, get_klass_parents,
-    get_klass_children, cache_nodes, type_description_from_node,
+    get_klass_children, cache_gir, type_description_from_node,
     is_introspectable, is_callback_type)
 from hotdoc.extensions.gi.symbols import GIClassSymbol, GIInterfaceSymbol, GIStructSymbol
 
@@ -71,6 +72,9 @@ ALL_GIRS = {}
 DEFAULT_PAGE = "Miscellaneous.default_page"
 
 
+FRAGMENTS_SCRIPT = os.path.join(os.path.dirname(__file__), 'gi-fragments.js')
+
+
 DEFAULT_PAGE_COMMENT = """/**
 * Miscellaneous.default_page:
 * @title: Miscellaneous
@@ -119,6 +123,11 @@ class GIExtension(Extension):
                            help="Languages to translate documentation in %s"
                            ", default is to make all languages" % str(
                                OUTPUT_LANGUAGES))
+        group.add_argument("--gi-split-languages", action="store_true",
+                           dest="gi_split_languages",
+                           help="Write out the documentation of symbols in "
+                           "languages other than the first one apart from "
+                           "the pages, to be loaded when switching language")
 
     @staticmethod
     def get_dependencies():
@@ -154,14 +163,24 @@ class GIExtension(Extension):
             self.languages.remove(c_language)
             self.languages.insert(0, c_language)
 
+        self.formatter.split_languages = bool(
+            config.get('gi_split_languages'))
+
+        cache = None
+        if self.app.cache_dir:
+            cache = SourceCache(os.path.join(self.app.cache_dir,
+                                             'gi-extension'))
+
         for gir_file in self.sources:
-            gir_root = etree.parse(gir_file).getroot()
-            cache_nodes(gir_root, ALL_GIRS, self.languages)
+            cache_gir(gir_file, ALL_GIRS, self.languages, cache)
 
     def __formatting_page(self, formatter, page):
         if ALL_GIRS:
             page.meta['extra']['gi-languages'] = [lang.language_name for lang in self.languages]
 
+        if formatter is self.formatter and self.formatter.split_languages:
+            page.output_attrs['html']['scripts'].add(FRAGMENTS_SCRIPT)
+
     def __list_relocated_symbols(self):
         for comment in self._get_toplevel_comments():
             self.__relocated_symbols |= set(comment.meta.get('symbols', []))
@@ -180,6 +199,11 @@ class GIExtension(Extension):
 
         gather_links()
 
+        # Connected once, the language links are translated for is looked
+        # up in the render context
+        Link.resolving_title_signal.connect(self.__translate_link_title)
+        self.app.link_resolver.resolving_link_signal.connect(
+            self.__translate_language_link_ref)
         self.app.link_resolver.resolving_link_signal.connect_after(
             self.__translate_link_ref, None)
         if not self.sources:
@@ -197,6 +221,8 @@ class GIExtension(Extension):
         page.meta['extra']['gi-languages'] = [lang.language_name for lang in self.languages]
         page.meta['extra']['gi-language'] = self.languages[0].language_name
         Extension.format_page(self, page, link_resolver, output)
+        if output and self.formatter.split_languages:
+            self.formatter.cache_fragments(page)
 
         link_resolver.get_link_signal.disconnect(search_online_links)
 
@@ -204,6 +230,8 @@ class GIExtension(Extension):
         prev_l = None
         page.meta['extra']['gi-language'] = 'c'
         Extension.write_out_page(self, output, page)
+        if self.formatter.split_languages:
+            self.formatter.write_out_fragments(page, output)
 
     def __symbol_is_relocated(self, unique_name, parent_name):
         if unique_name in self.__relocated_symbols:
@@ -284,6 +312,11 @@ class GIExtension(Extension):
     def _get_comment_smart_key(self, comment):
         return os.path.splitext(comment.filename)[0]
 
+    def get_symbol_sources(self, symbol):
+        # Symbols are created from the GIR files, which also give the
+        # hierarchy of the classes
+        return [symbol.filename] + sorted(self.sources)
+
     def _get_all_sources(self):
         if not self.__all_sources:
             self.__all_sources = list({
@@ -991,7 +1024,7 @@ class GIExtension(Extension):
 
         aliased_link = language.get_alias_link(link.id_)
         if aliased_link:
-            return self.__translate_link_title(aliased_link, language)
+            return self.__translate_title(aliased_link, language)
 
         translated = language.get_translation(link.id_)
         if translated:
@@ -1003,6 +1036,9 @@ class GIExtension(Extension):
 
     def __translate_link_ref(self, link, language):
         if not language:
+            if self.get_render_language():
+                # Already translated by __translate_language_link_ref
+                return None
             actual_language = self.get_language('c')
         else:
             actual_language = language
@@ -1023,7 +1059,16 @@ class GIExtension(Extension):
                     link, lang)
         return ref, extra_attrs
 
-    def __translate_link_title(self, link, language):
+    def __translate_language_link_ref(self, link):
+        language = self.get_render_language()
+        if not language:
+            return None
+        return self.__translate_link_ref(link, language)
+
+    def __translate_link_title(self, link):
+        language = self.get_render_language()
+        if not language:
+            return None
         return self.__translate_title(link, language)
 
     def get_language(self, language):
@@ -1036,21 +1081,13 @@ class GIExtension(Extension):
     def get_languages(self):
         return self.languages
 
-    def setup_language(self, language, prev_l):
-        if prev_l:
-            Link.resolving_title_signal.disconnect(self.__translate_link_title,
-                                                   prev_l)
-            self.app.link_resolver.resolving_link_signal.disconnect(
-                self.__translate_link_ref, prev_l)
-        else:
-            self.app.link_resolver.resolving_link_signal.disconnect(
-                self.__translate_link_ref, None)
-
-        if language:
-            Link.resolving_title_signal.connect(self.__translate_link_title,
-                                                language)
-            self.app.link_resolver.resolving_link_signal.connect(
-                self.__translate_link_ref, language)
-        else:
-            self.app.link_resolver.resolving_link_signal.connect_after(
-                self.__translate_link_ref, None)
+    def get_render_language(self):
+        """
+        Returns:
+            Language: the language the symbols of this extension are being
+                rendered for, or None.
+        """
+        context = RENDER_CONTEXT.get()
+        if context is None or context.extension is not self:
+            return None
+        return context.language
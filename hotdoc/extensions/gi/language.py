@@ -81,6 +81,16 @@ class Language(Configurable):
         """
         raise NotImplementedError
 
+    def add_translation(self, unique_name, translation):
+        """
+        Store a translation computed by make_translations in an earlier
+        run, when what was extracted from a GIR file is read back from
+        the cache.
+        Extension subclasses should implement this, otherwise GIR files
+        are parsed again at each run.
+        """
+        raise NotImplementedError
+
     def get_alias_link(self, name):
         """
         Get the alias link for the given name
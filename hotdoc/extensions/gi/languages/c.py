@@ -59,6 +59,9 @@ class CLanguage(Language):
     def get_translation(self, unique_name):
         return TRANSLATED.get(unique_name)
 
+    def add_translation(self, unique_name, translation):
+        TRANSLATED[unique_name] = translation
+
 
 FUNDAMENTALS[CLanguage.language_name] = {
     "GParam": Link("https://docs.gtk.org/gobject/class.ParamSpec.html",
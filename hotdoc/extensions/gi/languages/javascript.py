@@ -139,6 +139,9 @@ class JavascriptLanguage(Language):
     def get_translation(self, unique_name):
         return TRANSLATED.get(unique_name)
 
+    def add_translation(self, unique_name, translation):
+        TRANSLATED[unique_name] = translation
+
 
 JavascriptLanguage._create_fundamentals()
 
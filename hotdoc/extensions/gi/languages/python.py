@@ -153,6 +153,9 @@ class PythonLanguage(Language):
     def get_translation(self, unique_name):
         return TRANSLATED.get(unique_name)
 
+    def add_translation(self, unique_name, translation):
+        TRANSLATED[unique_name] = translation
+
 
 PythonLanguage._create_fundamentals()
 
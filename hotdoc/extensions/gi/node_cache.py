@@ -1,13 +1,13 @@
 import os
 import re
-from collections import defaultdict
+from collections import defaultdict, namedtuple
 from lxml import etree
-import networkx as nx
 from hotdoc.core.symbols import QualifiedSymbol
 from hotdoc.core.exceptions import BadInclusionException
 from hotdoc.extensions.gi.utils import *
 from hotdoc.utils.utils import DATADIR
-from hotdoc.utils.loggable import warn, Logger
+from hotdoc.utils.loggable import warn, debug, Logger
+from hotdoc.extensions.gi.language import Language
 
 
 Logger.register_warning_code('missing-gir-include', BadInclusionException,
@@ -27,24 +27,129 @@ def __camel_to_snake_upper(name):
     return re.sub('([a-z0-9])([A-Z])', r'\1_\2', name).upper()
 
 
-def __generate_smart_filters(id_prefixes, sym_prefixes, node):
+def __generate_smart_filters(id_prefixes, sym_prefixes, node, smart_filters):
     for ns_prefix in sym_prefixes:
         try:
             sym_prefix = node.attrib['{%s}symbol-prefix' % NS_MAP['c']]
         except KeyError:
             sym_prefix = __camel_to_snake_upper(node.attrib['name'])
-        SMART_FILTERS.add(('%s_IS_%s' % (ns_prefix, sym_prefix)).upper())
-        SMART_FILTERS.add(('%s_TYPE_%s' % (ns_prefix, sym_prefix)).upper())
-        SMART_FILTERS.add(('%s_%s' % (ns_prefix, sym_prefix)).upper())
-        SMART_FILTERS.add(('%s_%s_CLASS' % (ns_prefix, sym_prefix)).upper())
-        SMART_FILTERS.add(('%s_IS_%s_CLASS' % (ns_prefix, sym_prefix)).upper())
-        SMART_FILTERS.add(('%s_%s_GET_CLASS' %
+        smart_filters.add(('%s_IS_%s' % (ns_prefix, sym_prefix)).upper())
+        smart_filters.add(('%s_TYPE_%s' % (ns_prefix, sym_prefix)).upper())
+        smart_filters.add(('%s_%s' % (ns_prefix, sym_prefix)).upper())
+        smart_filters.add(('%s_%s_CLASS' % (ns_prefix, sym_prefix)).upper())
+        smart_filters.add(('%s_IS_%s_CLASS' % (ns_prefix, sym_prefix)).upper())
+        smart_filters.add(('%s_%s_GET_CLASS' %
                           (ns_prefix, sym_prefix)).upper())
-        SMART_FILTERS.add(('%s_%s_GET_IFACE' %
+        smart_filters.add(('%s_%s_GET_IFACE' %
                           (ns_prefix, sym_prefix)).upper())
 
 
-__HIERARCHY_GRAPH = nx.DiGraph()
+class HierarchyIndex:
+    """
+    The parents and children of classes and interfaces, by GI name.
+
+    A class may have been given several parents, for example when two
+    GIR files define it, the first one is its actual parent. Ancestors
+    and descendants are computed once, until the index is modified.
+    """
+
+    def __init__(self):
+        self.__parents = {}
+        self.__children = {}
+        self.__ancestors = {}
+        self.__descendants = {}
+
+    def __contains__(self, gi_name):
+        return gi_name in self.__parents
+
+    def add_node(self, gi_name):
+        """
+        Adds gi_name, if it isn't there already.
+        """
+        if gi_name not in self.__parents:
+            self.__parents[gi_name] = []
+            self.__children[gi_name] = []
+            self.__ancestors.clear()
+            self.__descendants.clear()
+
+    def add_edge(self, parent_name, gi_name):
+        """
+        Makes parent_name a parent of gi_name, adding both if needed.
+        """
+        self.add_node(parent_name)
+        self.add_node(gi_name)
+        if parent_name not in self.__parents[gi_name]:
+            self.__parents[gi_name].append(parent_name)
+            self.__children[parent_name].append(gi_name)
+            self.__ancestors.clear()
+            self.__descendants.clear()
+
+    def get_parent(self, gi_name):
+        """
+        Returns the GI name of the parent of gi_name, or None.
+        """
+        parents = self.__parents.get(gi_name)
+        if parents:
+            return parents[0]
+        return None
+
+    def get_children(self, gi_name):
+        """
+        Returns the GI names of the children of gi_name.
+        """
+        return self.__children.get(gi_name, [])
+
+    def get_ancestors(self, gi_name):
+        """
+        Returns the GI names of the ancestors of gi_name, from the
+        fundamental type to its parent.
+        """
+        try:
+            return self.__ancestors[gi_name]
+        except KeyError:
+            pass
+
+        ancestors = []
+        seen = {gi_name}
+        parent = self.get_parent(gi_name)
+        while parent is not None and parent not in seen:
+            ancestors.append(parent)
+            if parent in self.__ancestors:
+                ancestors.extend(reversed(self.__ancestors[parent]))
+                break
+            seen.add(parent)
+            parent = self.get_parent(parent)
+
+        res = tuple(reversed(ancestors))
+        self.__ancestors[gi_name] = res
+        return res
+
+    def get_descendants(self, gi_name):
+        """
+        Returns the GI names of the descendants of gi_name, breadth
+        first.
+        """
+        try:
+            return self.__descendants[gi_name]
+        except KeyError:
+            pass
+
+        descendants = []
+        seen = {gi_name}
+        queue = [gi_name]
+        while queue:
+            for child in self.get_children(queue.pop(0)):
+                if child not in seen:
+                    seen.add(child)
+                    descendants.append(child)
+                    queue.append(child)
+
+        res = tuple(descendants)
+        self.__descendants[gi_name] = res
+        return res
+
+
+__HIERARCHY = HierarchyIndex()
 
 
 ALL_GI_TYPES = {}
@@ -96,28 +201,25 @@ def get_field_c_name(node):
     return '.'.join(components)
 
 
-def __update_hierarchies(cur_ns, node, gi_name):
+def __update_hierarchies(cur_ns, node, gi_name, hierarchy):
     parent_name = node.attrib.get('parent')
     if not parent_name:
         # fundamental
-        __HIERARCHY_GRAPH.add_node(gi_name)
+        hierarchy.append((None, gi_name))
         return
 
     if not '.' in parent_name:
         parent_name = '%s.%s' % (cur_ns, parent_name)
 
-    __HIERARCHY_GRAPH.add_edge(parent_name, gi_name)
+    hierarchy.append((parent_name, gi_name))
 
 
-def __get_parent_link_recurse(gi_name, res):
-    parents = list(__HIERARCHY_GRAPH.predecessors(gi_name))
-    if parents:
-        __get_parent_link_recurse(list(parents)[0], res)
+def __make_type_qs(gi_name):
     ctype_name = ALL_GI_TYPES[gi_name]
     qs = QualifiedSymbol(type_tokens=[Link(None, ctype_name, ctype_name)])
     qs.add_extension_attribute('gi-extension', 'type_desc',
                                SymbolTypeDesc([], gi_name, ctype_name, 0))
-    res.append(qs)
+    return qs
 
 
 def get_klass_parents(gi_name):
@@ -125,12 +227,8 @@ def get_klass_parents(gi_name):
     Returns a sorted list of qualified symbols representing
     the parents of the klass-like symbol named gi_name
     '''
-    res = []
-    parents = list(__HIERARCHY_GRAPH.predecessors(gi_name))
-    if not parents:
-        return []
-    __get_parent_link_recurse(parents[0], res)
-    return res
+    return [__make_type_qs(parent_name)
+            for parent_name in __HIERARCHY.get_ancestors(gi_name)]
 
 
 def get_klass_children(gi_name):
@@ -139,32 +237,104 @@ def get_klass_children(gi_name):
     the children of the klass-like symbol named gi_name
     '''
     res = {}
-    children = __HIERARCHY_GRAPH.successors(gi_name)
-    for gi_name in children:
-        ctype_name = ALL_GI_TYPES[gi_name]
-        qs = QualifiedSymbol(type_tokens=[Link(None, ctype_name, ctype_name)])
-        qs.add_extension_attribute('gi-extension', 'type_desc',
-                                   SymbolTypeDesc([], gi_name, ctype_name, 0))
-        res[ctype_name] = qs
+    for child_name in __HIERARCHY.get_children(gi_name):
+        res[ALL_GI_TYPES[child_name]] = __make_type_qs(child_name)
     return res
 
 
-def cache_nodes(gir_root, all_girs, languages):
-    '''
-    Identify and store all the gir symbols the symbols we will document
-    may link to, or be typed with
-    '''
+# What is kept of a GIR file in the cache, everything cache_nodes
+# stores for it apart from what the files it includes contain
+GirDigest = namedtuple('GirDigest', [
+    'translations', 'gi_types', 'callback_types', 'hierarchy',
+    'smart_filters', 'includes'])
+
+
+def __make_translations(languages, translations, unique_name, node):
+    for language in languages:
+        language.make_translations(unique_name, node)
+        translation = language.get_translation(unique_name)
+        if translation is not None:
+            translations[language.language_name][unique_name] = translation
+
+
+def __walk_nodes(gir_root):
+    """
+    Sorts all the nodes cache_nodes is interested in, in a single pass
+    over the document.
+    """
+    id_key = c_ns('identifier')
+    id_type = c_ns('type')
+    glib_type = glib_ns('type-name')
+    gtype_struct_key = glib_ns('is-gtype-struct-for')
+    untyped_tags = (core_ns('type'), core_ns('array'))
+    field_tag = core_ns('field')
+    property_tag = core_ns('property')
+    signal_tag = glib_ns('signal')
+    vmethod_tag = core_ns('virtual-method')
+    include_tag = core_ns('include')
+
+    identified = []
+    typed = []
+    fields = []
+    properties = []
+    signals = []
+    vmethods = []
+    includes = []
+    gtype_structs = {}
+
+    # Comments and processing instructions have no attributes
+    for node in gir_root.iter(tag=etree.Element):
+        attrib = node.attrib
+        tag = node.tag
+        if id_key in attrib:
+            identified.append(node)
+        if (id_type in attrib or glib_type in attrib) and \
+                tag not in untyped_tags:
+            typed.append(node)
+            if gtype_struct_key in attrib:
+                gtype_structs.setdefault(attrib[gtype_struct_key], node)
+        if tag == field_tag:
+            fields.append(node)
+        elif tag == property_tag:
+            properties.append(node)
+        elif tag == signal_tag:
+            signals.append(node)
+        elif tag == vmethod_tag:
+            vmethods.append(node)
+        elif tag == include_tag and node.getparent() is gir_root:
+            includes.append(node)
+
+    return (identified, typed, fields, properties, signals, vmethods,
+            includes, gtype_structs)
+
+
+def __get_vmethod_name(node, gtype_structs):
+    try:
+        klass_structure_node = gtype_structs[node.getparent().attrib['name']]
+    except KeyError:
+        return get_symbol_names(node)[0]
+    return '%s::%s' % (get_structure_name(klass_structure_node),
+                       node.attrib['name'])
+
+
+def __digest_nodes(gir_root, languages):
     ns_node = gir_root.find('./{%s}namespace' % NS_MAP['core'])
     id_prefixes = ns_node.attrib['{%s}identifier-prefixes' % NS_MAP['c']]
     sym_prefixes = ns_node.attrib['{%s}symbol-prefixes' %
                                   NS_MAP['c']].split(',')
+    digest = GirDigest({language.language_name: {} for language in languages},
+                       {}, set(), [], set(), [])
+
+    (identified, typed, fields, properties, signals, vmethods, includes,
+     gtype_structs) = __walk_nodes(gir_root)
 
-    id_key = '{%s}identifier' % NS_MAP['c']
-    for node in gir_root.xpath(
-            './/*[@c:identifier]',
-            namespaces=NS_MAP):
-        for language in languages:
-            language.make_translations(node.attrib[id_key], node)
+    # Nodes are handled in the same order as when each kind was looked
+    # up with its own query, translations of the same name override
+    # each other in that order
+    id_key = c_ns('identifier')
+    for node in identified:
+        __make_translations(languages, digest.translations,
+                            node.attrib[id_key], node)
 
     id_type = c_ns('type')
     glib_type = glib_ns('type-name')
@@ -174,58 +344,70 @@ def cache_nodes(gir_root, all_girs, languages):
     enum_tag = core_ns('enumeration')
     bitfield_tag = core_ns('bitfield')
     record_tag = core_ns('record')
-    for node in gir_root.xpath('.//*[not(self::core:type) and not (self::core:array)][@c:type or @glib:type-name]',
-                               namespaces=NS_MAP):
+    for node in typed:
         try:
             name = node.attrib[id_type]
         except KeyError:
             name = node.attrib[glib_type]
-        for language in languages:
-            language.make_translations(name, node)
+        __make_translations(languages, digest.translations, name, node)
         gi_name = '.'.join(get_gi_name_components(node))
-        ALL_GI_TYPES[gi_name] = get_klass_name(node)
+        digest.gi_types[gi_name] = get_klass_name(node)
         if node.tag in (class_tag, interface_tag):
-            __update_hierarchies(ns_node.attrib.get('name'), node, gi_name)
-            for language in languages:
-                language.make_translations('%s::%s' % (name, name), node)
-            __generate_smart_filters(id_prefixes, sym_prefixes, node)
+            __update_hierarchies(ns_node.attrib.get('name'), node, gi_name,
+                                 digest.hierarchy)
+            __make_translations(languages, digest.translations,
+                                '%s::%s' % (name, name), node)
+            __generate_smart_filters(id_prefixes, sym_prefixes, node,
+                                     digest.smart_filters)
         elif node.tag in (enum_tag, bitfield_tag, record_tag):
-            __generate_smart_filters(id_prefixes, sym_prefixes, node)
+            __generate_smart_filters(id_prefixes, sym_prefixes, node,
+                                     digest.smart_filters)
         elif node.tag in (callback_tag,):
-            ALL_CALLBACK_TYPES.add(node.attrib[c_ns('type')])
+            digest.callback_types.add(node.attrib[c_ns('type')])
 
-    for field in gir_root.xpath('.//self::core:field', namespaces=NS_MAP):
+    for field in fields:
         unique_name = get_field_c_name(field)
-        for language in languages:
-            language.make_translations(unique_name, field)
+        __make_translations(languages, digest.translations, unique_name,
+                            field)
 
-    for node in gir_root.xpath(
-            './/core:property',
-            namespaces=NS_MAP):
+    for node in properties:
         name = '%s:%s' % (get_klass_name(node.getparent()),
                           node.attrib['name'])
-        for language in languages:
-            language.make_translations(name, node)
+        __make_translations(languages, digest.translations, name, node)
 
-    for node in gir_root.xpath(
-            './/glib:signal',
-            namespaces=NS_MAP):
+    for node in signals:
         name = '%s::%s' % (get_klass_name(node.getparent()),
                            node.attrib['name'])
-        for language in languages:
-            language.make_translations(name, node)
-
-    for node in gir_root.xpath(
-            './/core:virtual-method',
-            namespaces=NS_MAP):
-        name = get_symbol_names(node)[0]
-        for language in languages:
-            language.make_translations(name, node)
-
-    for inc in gir_root.findall('./core:include',
-                                namespaces=NS_MAP):
-        inc_name = inc.attrib["name"]
-        inc_version = inc.attrib["version"]
+        __make_translations(languages, digest.translations, name, node)
+
+    for node in vmethods:
+        name = __get_vmethod_name(node, gtype_structs)
+        __make_translations(languages, digest.translations, name, node)
+
+    for inc in includes:
+        digest.includes.append((inc.attrib["name"], inc.attrib["version"]))
+
+    return digest
+
+
+def __load_digest(digest, languages):
+    for language in languages:
+        for unique_name, translation in \
+                digest.translations[language.language_name].items():
+            language.add_translation(unique_name, translation)
+
+    ALL_GI_TYPES.update(digest.gi_types)
+    ALL_CALLBACK_TYPES.update(digest.callback_types)
+    SMART_FILTERS.update(digest.smart_filters)
+    for parent_name, gi_name in digest.hierarchy:
+        if parent_name is None:
+            __HIERARCHY.add_node(gi_name)
+        else:
+            __HIERARCHY.add_edge(parent_name, gi_name)
+
+
+def __cache_includes(digest, all_girs, languages, cache):
+    for inc_name, inc_version in digest.includes:
         gir_file = __find_gir_file('%s-%s.gir' %
                                    (inc_name, inc_version), all_girs)
         if not gir_file:
@@ -237,8 +419,49 @@ def cache_nodes(gir_root, all_girs, languages):
             continue
 
         __PARSED_GIRS.add(gir_file)
-        inc_gir_root = etree.parse(gir_file).getroot()
-        cache_nodes(inc_gir_root, all_girs, languages)
+        cache_gir(gir_file, all_girs, languages, cache)
+
+
+def cache_nodes(gir_root, all_girs, languages, cache=None):
+    '''
+    Identify and store all the gir symbols the symbols we will document
+    may link to, or be typed with
+    '''
+    digest = __digest_nodes(gir_root, languages)
+    # Translations were stored as they were made
+    __load_digest(digest, [])
+    __cache_includes(digest, all_girs, languages, cache)
+    return digest
+
+
+def cache_gir(gir_file, all_girs, languages, cache=None):
+    '''
+    Like cache_nodes, for the GIR file at gir_file.
+
+    If cache is a `SourceCache`, what is stored for a GIR file is read
+    back from it rather than from the GIR file, as long as the file did
+    not change.
+    '''
+    # Languages from other packages may not know how to load translations
+    if any(type(language).add_translation is Language.add_translation
+           for language in languages):
+        cache = None
+
+    salt = ['gir'] + sorted(language.language_name for language in languages)
+    digest = None
+    if cache is not None:
+        digest = cache.load(gir_file, salt)
+
+    if digest is None:
+        debug('Parsing %s' % gir_file, 'gi-extension')
+        digest = cache_nodes(etree.parse(gir_file).getroot(), all_girs,
+                             languages, cache)
+        if cache is not None:
+            cache.store(gir_file, salt, digest)
+        return
+
+    __load_digest(digest, languages)
+    __cache_includes(digest, all_girs, languages, cache)
 
 
 def __type_tokens_from_gitype(cur_ns, ptype_name):
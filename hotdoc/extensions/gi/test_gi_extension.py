@@ -1,6 +1,14 @@
 from hotdoc.extensions.gi.utils import core_ns, unnest_type
+from hotdoc.extensions.gi.gi_extension import GIExtension
+from hotdoc.core.config import Config
+from hotdoc.core.source_cache import SourceCache
+from hotdoc.run_hotdoc import Application
+from hotdoc.utils.loggable import Logger
 import unittest
 import importlib
+import os
+import shutil
+import tempfile
 from lxml import etree
 PYTHON_LANG = importlib.import_module('hotdoc.extensions.gi.languages.python')
 JAVASCRIPT_LANG = importlib.import_module(
@@ -102,6 +110,39 @@ TEST_GREETER_GREET_GI_OBJECT = \
 '''
 
 
+TEST_GREET = \
+    '''
+<function name="greet" c:identifier="test_greet">
+  <return-value transfer-ownership="full">
+    <type name="utf8" c:type="gchar*"/>
+  </return-value>
+  <parameters>
+    <parameter name="count" transfer-ownership="none">
+      <type name="gint" c:type="gint"/>
+    </parameter>
+  </parameters>
+</function>
+'''
+
+
+TEST_PARENT = \
+    '''
+<class name="Parent" c:symbol-prefix="parent" c:type="TestParent"
+       glib:type-name="TestParent" glib:get-type="test_parent_get_type">
+  <source-position filename="parent.h" line="1"/>
+</class>
+'''
+
+TEST_CHILD = \
+    '''
+<class name="Child" c:symbol-prefix="child" c:type="TestChild"
+       parent="Parent" glib:type-name="TestChild"
+       glib:get-type="test_child_get_type">
+  <source-position filename="child.h" line="1"/>
+</class>
+'''
+
+
 class TestTypeUnnesting(unittest.TestCase):
     def assertRetvalTypesEqual(self, symbol_string, ctype_name, gi_name, array_nesting):
         test_data = GIR_TEMPLATE % symbol_string
@@ -141,6 +182,40 @@ class TestTypeUnnesting(unittest.TestCase):
         self.assertTupleEqual(unnest_type(param), ('...', 'valist', 0))
 
 
+class TestHierarchyIndex(unittest.TestCase):
+    def setUp(self):
+        self.index = CACHE_MODULE.HierarchyIndex()
+        self.index.add_node('GObject.Object')
+        self.index.add_edge('GObject.Object', 'Gio.Application')
+        self.index.add_edge('Gio.Application', 'Gtk.Application')
+        self.index.add_edge('GObject.Object', 'GObject.Binding')
+
+    def test_ancestors(self):
+        self.assertEqual(self.index.get_ancestors('Gtk.Application'),
+                         ('GObject.Object', 'Gio.Application'))
+        self.assertEqual(self.index.get_ancestors('GObject.Object'), ())
+        self.assertEqual(self.index.get_ancestors('Unknown'), ())
+
+        # Memoized results are forgotten when the index changes
+        self.index.add_edge('GObject.InitiallyUnowned', 'GObject.Object')
+        self.assertEqual(self.index.get_ancestors('Gtk.Application'),
+                         ('GObject.InitiallyUnowned', 'GObject.Object',
+                          'Gio.Application'))
+
+    def test_children(self):
+        self.assertEqual(self.index.get_children('GObject.Object'),
+                         ['Gio.Application', 'GObject.Binding'])
+        self.assertEqual(self.index.get_descendants('GObject.Object'),
+                         ('Gio.Application', 'GObject.Binding',
+                          'Gtk.Application'))
+        self.assertEqual(self.index.get_children('Gtk.Application'), [])
+
+    def test_cycle(self):
+        self.index.add_edge('Gtk.Application', 'GObject.Object')
+        self.assertEqual(self.index.get_ancestors('Gio.Application'),
+                         ('Gtk.Application', 'GObject.Object'))
+
+
 class TestNodeCaching(unittest.TestCase):
     def setUp(self):
         importlib.reload(CACHE_MODULE)
@@ -161,3 +236,150 @@ class TestNodeCaching(unittest.TestCase):
         self.assertEqual(type_desc.gi_name, 'utf8')
         self.assertEqual(type_desc.c_name, 'gchar***')
         self.assertEqual(type_desc.nesting_depth, 2)
+
+    def test_cached_gir(self):
+        tmp_dir = tempfile.mkdtemp()
+        self.addCleanup(shutil.rmtree, tmp_dir)
+        gir_file = os.path.join(tmp_dir, 'Test-1.0.gir')
+        with open(gir_file, 'w') as _:
+            _.write(GIR_TEMPLATE % TEST_GREETER_LIST_GREETS)
+        cache_dir = os.path.join(tmp_dir, 'cache')
+
+        for n_hits in (0, 1):
+            importlib.reload(CACHE_MODULE)
+            importlib.reload(PYTHON_LANG)
+            pythonlang = PYTHON_LANG.get_language_classes()[0]()
+            cache = SourceCache(cache_dir)
+            CACHE_MODULE.cache_gir(gir_file, {}, [pythonlang], cache)
+            self.assertEqual(cache.n_hits, n_hits)
+            translated = pythonlang.get_translation('test_greeter_list_greets')
+            self.assertEqual(translated, 'Test.list_greets')
+
+
+class TestFormatting(unittest.TestCase):
+    def setUp(self):
+        self.tmp_dir = tempfile.mkdtemp()
+        self.addCleanup(shutil.rmtree, self.tmp_dir)
+        # The private folder of the project is created in there
+        self.addCleanup(os.chdir, os.getcwd())
+        os.chdir(self.tmp_dir)
+        Logger.silent = True
+        self.addCleanup(Logger.reset)
+
+    def __write_file(self, name, contents):
+        path = os.path.join(self.tmp_dir, name)
+        with open(path, 'w') as _:
+            _.write(contents)
+        return path
+
+    def __build(self, gir_contents, **kwargs):
+        gir_file = self.__write_file('Test-1.0.gir',
+                                     GIR_TEMPLATE % gir_contents)
+        conf = {'project_name': 'test',
+                'project_version': '1.0',
+                'output': os.path.join(self.tmp_dir, 'output'),
+                'disable_cache': True,
+                'index': self.__write_file('index.markdown', '# Index\n'),
+                'gi_index': self.__write_file('gi-index.markdown', '# GI\n'),
+                'gi_sources': [gir_file],
+                'sitemap': self.__write_file('sitemap.txt',
+                                             'index.markdown\n\tgi-index\n')}
+        conf.update(kwargs)
+        app = Application((GIExtension,))
+        self.addCleanup(app.finalize)
+        app.parse_config(Config(command_line_args=conf))
+        app.run()
+        return app
+
+    def test_format_languages(self):
+        app = self.__build(TEST_GREET,
+                           languages=['c', 'javascript', 'python'])
+
+        page = app.project.get_page_for_symbol('test_greet')
+        docs = {}
+        for lang_doc in page.detailed_description.split(
+                '<div class="gi-symbol gi-symbol-')[1:]:
+            lang, doc = lang_doc.split('"', 1)
+            docs[lang] = doc
+        self.assertEqual(list(docs), ['c', 'javascript', 'python'])
+
+        # Each language is rendered with its own prototype and types
+        self.assertIn('c-prototype', docs['c'])
+        self.assertIn('test_greet (', docs['c'])
+        self.assertIn('>gint</a>', docs['c'])
+        self.assertIn('>gchar</a> *', docs['c'])
+        self.assertIn('javascript-prototype', docs['javascript'])
+        self.assertIn('function Test.prototype.greet(', docs['javascript'])
+        self.assertIn('>Number</a>', docs['javascript'])
+        self.assertNotIn('gchar', docs['javascript'])
+        self.assertIn('python-prototype', docs['python'])
+        self.assertIn('def Test.greet (count)', docs['python'])
+        self.assertIn('>str</a>', docs['python'])
+        self.assertNotIn('gchar', docs['python'])
+
+    def test_split_languages(self):
+        conf = {'incremental': True,
+                'gi_split_languages': True,
+                'languages': ['c', 'javascript', 'python']}
+        html_dir = os.path.join(self.tmp_dir, 'output', 'html')
+
+        app = self.__build(TEST_GREET, **conf)
+        page = app.project.get_page_for_symbol('test_greet')
+        page_name = os.path.splitext(os.path.basename(page.link.ref))[0]
+        page_path = os.path.join(html_dir, page.link.ref)
+        self.assertEqual(app.build_cache.n_reused, 0)
+
+        # Only the first language is part of the page
+        with open(page_path) as _:
+            contents = _.read()
+        self.assertIn('c-prototype', contents)
+        self.assertNotIn('javascript-prototype', contents)
+        self.assertNotIn('python-prototype', contents)
+        for lang in ('javascript', 'python'):
+            self.assertIn(
+                '<div class="gi-symbol gi-symbol-%s" '
+                'data-gi-fragment="%s.%s.html" '
+                'data-gi-symbol="test_greet">' % (lang, page_name, lang),
+                contents)
+
+        def check_fragments():
+            for lang in ('javascript', 'python'):
+                fragment_path = os.path.join(
+                    os.path.dirname(page_path),
+                    '%s.%s.html' % (page_name, lang))
+                with open(fragment_path) as _:
+                    fragment = _.read()
+                self.assertIn('data-gi-symbol="test_greet"', fragment)
+                self.assertIn('%s-prototype' % lang, fragment)
+                self.assertNotIn('c-prototype', fragment)
+
+        check_fragments()
+
+        # The fragments of the pages reused from the previous run are
+        # written out as well
+        shutil.rmtree(html_dir)
+        app = self.__build(TEST_GREET, **conf)
+        page = app.project.get_page_for_symbol('test_greet')
+        # Restored pages are not formatted again
+        self.assertIsNone(page.detailed_description)
+        self.assertTrue(os.path.exists(page_path))
+        check_fragments()
+
+    def test_incremental_new_subclass(self):
+        c_sources = [self.__write_file('parent.h', ''),
+                     self.__write_file('child.h', '')]
+        conf = {'incremental': True,
+                'gi_c_sources': c_sources,
+                'gi_c_source_roots': [self.tmp_dir]}
+        parent_path = os.path.join(self.tmp_dir, 'output', 'html',
+                                   'parent.html')
+
+        self.__build(TEST_PARENT, **conf)
+        with open(parent_path) as _:
+            self.assertNotIn('Test.Child', _.read())
+
+        # The header of the parent did not change, its page lists the
+        # subclass all the same
+        self.__build(TEST_PARENT + TEST_CHILD, **conf)
+        with open(parent_path) as _:
+            self.assertIn('Test.Child', _.read())
@@ -9,7 +9,7 @@ if sys.version_info >= (3, 10):
 else:
     from backports.entry_points_selectable import entry_points
 
-from hotdoc.core.links import Link
+from hotdoc.core.links import Link, LINK_CONTEXT
 from hotdoc.utils.loggable import info, debug
 
 
@@ -26,6 +26,14 @@ SymbolTypeDesc = namedtuple('SymbolTypeDesc', [
     'type_tokens', 'gi_name', 'c_name', 'nesting_depth'])
 
 
+# What GI symbols are being rendered for, the GI extension rendering
+# them and one of its languages. Each language is rendered in its own
+# context, see GIFormatter._format_symbol. Links are translated for the
+# language, they are resolved once per render context.
+RenderContext = namedtuple('RenderContext', ['extension', 'language'])
+RENDER_CONTEXT = LINK_CONTEXT
+
+
 def core_ns(tag):
     return '{http://www.gtk.org/introspection/core/1.0}%s' % tag
 
@@ -698,6 +698,11 @@ class GstExtension(Extension):
 
         super().parse_config(config)
 
+    def get_symbol_sources(self, symbol):
+        # Symbols are created from the cache file, the comments of the
+        # elements listed on the plugin pages from the C sources
+        return [self.cache_file] + sorted(self.c_sources)
+
     def _get_smart_key(self, symbol):
         if self.unique_feature:
             return None
@@ -25,6 +25,7 @@ from lxml import etree
 from hotdoc.parsers import search
 from hotdoc.core.extension import Extension
 from hotdoc.utils.setup_utils import symlink
+from hotdoc.utils.profiling import Profiler
 
 DESCRIPTION =\
     """
@@ -84,9 +85,10 @@ class SearchExtension(Extension):
         all_rel_paths = [os.path.relpath(p, html_dir)
                          for p in self.__all_paths]
 
-        search.create_index(all_rel_paths, multiprocessing.cpu_count() + 1, search_dir,
-                            fragments_dir, html_dir, self.app.project.get_private_folder(),
-                            os.path.join(HERE, 'stopwords.txt'))
+        with Profiler.phase('search-indexing'):
+            search.create_index(all_rel_paths, multiprocessing.cpu_count() + 1, search_dir,
+                                fragments_dir, html_dir, self.app.project.get_private_folder(),
+                                os.path.join(HERE, 'stopwords.txt'))
 
         subdirs = next(os.walk(html_dir))[1]
         subdirs.append(html_dir)
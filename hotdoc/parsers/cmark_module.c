@@ -46,6 +46,12 @@ static PyObject *diag_class = NULL;
 static PyObject *diagnostics = NULL;
 static PyObject *id_from_text_func = NULL;
 
+/* The names the link resolver already resolved in the current link
+ * context, see LinkResolver.get_link_table, and the ones found there
+ * since the start of the current call, as (name, id) tuples */
+static PyObject *link_table = NULL;
+static PyObject *link_table_hits = NULL;
+
 void free_named_link(NamedLink *link) {
   if (link == NULL)
     return;
@@ -63,59 +69,154 @@ typedef struct {
   cmark_node *page_title;
 } CMarkDocument;
 
-static NamedLink *
-resolve_link(const char *id) {
+static void close_link_table(void);
+
+static void
+open_link_table(void) {
+  /* In case a link resolver parsed or rendered something as well */
+  close_link_table();
+
+  if (!link_resolver || link_resolver == Py_None ||
+      !PyObject_HasAttrString(link_resolver, "get_link_table"))
+    return;
+
+  link_table = PyObject_CallMethod(link_resolver, "get_link_table", NULL);
+  if (PyErr_Occurred() || !PyDict_Check(link_table)) {
+    PyErr_Clear();
+    Py_CLEAR(link_table);
+    return;
+  }
+
+  link_table_hits = PyList_New(0);
+}
+
+/* Tell the link resolver about the names found in the link table, as if
+ * they had been resolved with get_named_link */
+static void
+close_link_table(void) {
+  if (link_table_hits && PyList_GET_SIZE(link_table_hits)) {
+    PyObject *res = PyObject_CallMethod(link_resolver, "add_link_table_hits",
+        "(O)", link_table_hits);
+
+    if (PyErr_Occurred())
+      PyErr_Clear();
+    Py_XDECREF(res);
+  }
+
+  Py_CLEAR(link_table);
+  Py_CLEAR(link_table_hits);
+}
+
+/* Returns a new (ref, extra_attrs, title, id) tuple, or NULL if @utf8
+ * could not be resolved */
+static PyObject *
+resolve_link_in_python(PyObject *utf8) {
   PyObject *link = NULL;
   PyObject *ref = NULL;
   PyObject *title = NULL;
-  NamedLink *res = NULL;
-  PyObject *utf8;
+  PyObject *link_id = NULL;
+  PyObject *entry = NULL;
 
-  if (!link_resolver)
+  link = PyObject_CallMethod(link_resolver, "get_named_link", "(O)", utf8);
+
+  if (PyErr_Occurred()) {
+    PyErr_Clear();
     goto done;
+  }
 
-  utf8 = PyUnicode_FromString(id);
+  if (link == Py_None)
+    goto done;
 
-  link = PyObject_CallMethod(link_resolver, "get_named_link", "(O)", utf8);
+  ref = PyObject_CallMethod(link, "get_link", "(O)", link_resolver);
 
   if (PyErr_Occurred()) {
     PyErr_Clear();
     goto done;
   }
 
-  Py_DECREF(utf8);
+  title = PyObject_CallMethod(link, "get_title", NULL);
+  if (PyErr_Occurred()) {
+    PyErr_Clear();
+    goto done;
+  }
 
-  if (link != Py_None) {
-    ref = PyObject_CallMethod(link, "get_link", "(O)", link_resolver);
+  link_id = PyObject_GetAttrString(link, "id_");
+  if (PyErr_Occurred()) {
+    PyErr_Clear();
+    goto done;
+  }
 
-    if (PyErr_Occurred()) {
-      PyErr_Clear();
-      goto done;
-    }
+  entry = Py_BuildValue("(OOOO)", PyTuple_GetItem(ref, 0),
+      PyTuple_GetItem(ref, 1), title, link_id);
 
-    title = PyObject_CallMethod(link, "get_title", NULL);
-    if (PyErr_Occurred()) {
-      PyErr_Clear();
-      goto done;
-    }
+done:
+  Py_XDECREF(link);
+  Py_XDECREF(ref);
+  Py_XDECREF(title);
+  Py_XDECREF(link_id);
+  return entry;
+}
 
-    res = (NamedLink *) calloc(1, sizeof(NamedLink));
+static NamedLink *
+resolve_link(const char *id) {
+  PyObject *utf8 = NULL;
+  PyObject *entry = NULL;
+  PyObject *item;
+  NamedLink *res = NULL;
 
-    if (PyTuple_GetItem(ref, 0) != Py_None) {
-      res->ref = strdup(PyUnicode_AsUTF8(PyTuple_GetItem(ref, 0)));
-      if (PyTuple_GetItem(ref, 1) != Py_None)
-        res->extra_attrs = strdup(PyUnicode_AsUTF8(PyTuple_GetItem(ref, 1)));
-    }
+  if (!link_resolver)
+    goto done;
 
-    if (title != Py_None) {
-      res->title = strdup(PyUnicode_AsUTF8(title));
+  utf8 = PyUnicode_FromString(id);
+  if (!utf8) {
+    PyErr_Clear();
+    goto done;
+  }
+
+  /* Only names that could not be resolved in this link context before,
+   * or which are looked up for the first time, go through Python */
+  if (link_table)
+    entry = PyDict_GetItemWithError(link_table, utf8);
+
+  if (entry) {
+    PyObject *hit = PyTuple_Pack(2, utf8, PyTuple_GET_ITEM(entry, 3));
+
+    Py_INCREF(entry);
+    if (hit) {
+      PyList_Append(link_table_hits, hit);
+      Py_DECREF(hit);
     }
+  } else {
+    PyErr_Clear();
+    entry = resolve_link_in_python(utf8);
+    if (!entry)
+      goto done;
+
+    if (link_table)
+      PyDict_SetItem(link_table, utf8, entry);
+  }
+
+  if (PyErr_Occurred())
+    PyErr_Clear();
+
+  res = (NamedLink *) calloc(1, sizeof(NamedLink));
+
+  item = PyTuple_GET_ITEM(entry, 0);
+  if (item != Py_None) {
+    res->ref = strdup(PyUnicode_AsUTF8(item));
+    item = PyTuple_GET_ITEM(entry, 1);
+    if (item != Py_None)
+      res->extra_attrs = strdup(PyUnicode_AsUTF8(item));
+  }
+
+  item = PyTuple_GET_ITEM(entry, 2);
+  if (item != Py_None) {
+    res->title = strdup(PyUnicode_AsUTF8(item));
   }
 
 done:
-  Py_XDECREF(link);
-  Py_XDECREF(ref);
-  Py_XDECREF(title);
+  Py_XDECREF(utf8);
+  Py_XDECREF(entry);
   return res;
 }
 
@@ -189,11 +290,15 @@ gtkdoc_to_ast(PyObject *self, PyObject *args) {
     cmark_parser_set_current_file(gtkdoc_parser, uri);
   }
 
+  open_link_table();
+
   utf8 = PyUnicode_AsUTF8AndSize(input, &size);
   cmark_parser_feed(gtkdoc_parser, utf8, size);
 
   doc->root = cmark_parser_finish(gtkdoc_parser);
 
+  close_link_table();
+
   cmark_parser_set_current_file(gtkdoc_parser, NULL);
 
   cap = PyCapsule_New((void *)doc, "cmark.document", NULL);
@@ -433,7 +538,9 @@ ast_to_html(PyObject *self, PyObject *args) {
   Py_XDECREF(diagnostics);
   diagnostics = PyList_New(0);
 
+  open_link_table();
   out = render_doc(doc);
+  close_link_table();
 
   ret = PyUnicode_FromString(out);
 
@@ -281,6 +281,40 @@ class TestGtkDocExtension(unittest.TestCase):
             out,
             u'<p>this : <a href="there.com">ze_foo</a> is a link !</p>\n')
 
+    def render_recording(self, ast):
+        n_lookups = self.link_resolver.n_lookups
+        self.link_resolver.start_recording()
+        out = cmark.ast_to_html(ast, self.link_resolver)[0]
+        references = self.link_resolver.stop_recording()
+        return out, references, self.link_resolver.n_lookups - n_lookups
+
+    def test_link_table(self):
+        link = Link("qux.com", "qux", "qux_func")
+        self.link_resolver.add_link(link)
+        inp = u"this : #qux_func is a link !"
+        ast, _ = cmark.gtkdoc_to_ast(inp, self.link_resolver, None, None)
+
+        # Once the link was resolved through python, it is found in the
+        # link table, and recorded the same way
+        out, references, n_lookups = self.render_recording(ast)
+        self.assertEqual(
+            out, u'<p>this : <a href="qux.com">qux</a> is a link !</p>\n')
+        self.assertEqual(references, ['qux_func', 'qux_func'])
+        self.assertEqual(n_lookups, 1)
+
+        out, references, n_lookups = self.render_recording(ast)
+        self.assertEqual(
+            out, u'<p>this : <a href="qux.com">qux</a> is a link !</p>\n')
+        self.assertEqual(references, ['qux_func', 'qux_func'])
+        self.assertEqual(n_lookups, 1)
+
+        link.ref = "quux.com"
+        out, references, n_lookups = self.render_recording(ast)
+        self.assertEqual(
+            out, u'<p>this : <a href="quux.com">qux</a> is a link !</p>\n')
+        self.assertEqual(references, ['qux_func', 'qux_func'])
+        self.assertEqual(n_lookups, 1)
+
     def test_code_block(self):
         inp = u"|[\nfoo\n]|"
         self.assertOutputs(
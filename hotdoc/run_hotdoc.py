@@ -31,13 +31,16 @@ import traceback
 from urllib.parse import urlparse
 from collections import OrderedDict
 
+from hotdoc.core.build_cache import BuildCache
 from hotdoc.core.project import Project, CoreExtension
 from hotdoc.core.config import Config, load_config_json
 from hotdoc.core.exceptions import HotdocException
-from hotdoc.core.database import Database
+from hotdoc.core.database import Database, DATABASE_FORMATS
 from hotdoc.core.links import LinkResolver, Link
-from hotdoc.utils.utils import all_subclasses, get_extension_classes, get_cat
+from hotdoc.utils.utils import all_subclasses, get_extension_classes, get_cat, \
+    get_user_cache_dir
 from hotdoc.utils.loggable import Logger, error, info
+from hotdoc.utils.profiling import Profiler
 from hotdoc.utils.setup_utils import VERSION
 from hotdoc.utils.configurable import Configurable
 from hotdoc.utils.signals import Signal
@@ -58,6 +61,12 @@ class Application(Configurable):
         self.private_folder = None
         self.database = None
         self.link_resolver = None
+        self.build_cache = None
+        self.cache_dir = None
+        self.incremental = False
+        self.jobs = 1
+        self.low_memory = False
+        self.database_format = 'json'
         self.dry = False
         self.hostname = None
         self.config = None
@@ -70,6 +79,44 @@ class Application(Configurable):
         parser.add_argument('--dry',
                             help='Dry run, nothing will be output',
                             dest='dry', action='store_true')
+        parser.add_argument('--incremental',
+                            help='Keep the private folder between runs, '
+                            'and only render again the pages whose inputs '
+                            'changed since the previous run',
+                            dest='incremental', action='store_true')
+        parser.add_argument('--profile-phases',
+                            help='Write a JSON report of the time spent in '
+                            'each phase of the build to this path',
+                            dest='profile_phases')
+        parser.add_argument('--profile-top', type=int,
+                            help='Number of slowest pages and symbols to '
+                            'list in the phases report',
+                            dest='profile_top', default=20)
+        parser.add_argument('-j', '--jobs', type=int,
+                            help='Number of processes to scan subprojects, '
+                            'format and write out pages with',
+                            dest='jobs', default=1)
+        parser.add_argument('--low-memory',
+                            help='Release the sources of each page once it '
+                            'is formatted and its rendering once it is '
+                            'written out, caching renderings on disk in '
+                            'between',
+                            dest='low_memory', action='store_true')
+        parser.add_argument('--cache-dir',
+                            help='Where to cache what is extracted from '
+                            'source files between runs, defaults to '
+                            '$XDG_CACHE_HOME/hotdoc',
+                            dest='cache_dir')
+        parser.add_argument('--disable-cache',
+                            help='Extract everything from the source files '
+                            'again, without reading nor updating the cache',
+                            dest='disable_cache', action='store_true')
+        parser.add_argument('--database-format',
+                            help='How to store the symbols and comments '
+                            'in the private folder, sqlite allows querying '
+                            'them without loading them all',
+                            choices=DATABASE_FORMATS, default='json',
+                            dest='database_format')
         parser.add_argument('--deps-file-dest',
                             help='Where to output the dependencies file')
         parser.add_argument('--deps-file-target',
@@ -86,19 +133,34 @@ class Application(Configurable):
                             'purposes.')
 
     def parse_config(self, config):
+        Profiler.reset()
+        Profiler.enabled = bool(config.get('profile_phases'))
+        with Profiler.phase('config'):
+            self.__parse_config(config)
+
+    def __parse_config(self, config):
         self.config = config
         self.output = config.get_path('output')
         self.dry = config.get('dry')
         self.hostname = config.get('hostname')
+        self.incremental = bool(config.get('incremental'))
+        self.jobs = max(1, int(config.get('jobs') or 1))
+        self.low_memory = bool(config.get('low_memory'))
+        self.database_format = config.get('database_format') or 'json'
+        if not config.get('disable_cache'):
+            self.cache_dir = config.get_path('cache_dir') or \
+                get_user_cache_dir()
         self.project = Project(self)
         self.project.parse_name_from_config(self.config)
         self.private_folder = os.path.abspath(
             'hotdoc-private-%s' % self.project.sanitized_name)
-        shutil.rmtree(self.private_folder, ignore_errors=True)
+        if not self.incremental:
+            shutil.rmtree(self.private_folder, ignore_errors=True)
         self.project.parse_config(self.config, toplevel=True)
 
         self.__setup_private_folder()
         self.__setup_database()
+        self.__setup_build_cache()
 
     def run(self):
         """
@@ -106,19 +168,76 @@ class Application(Configurable):
         """
         self.project.setup()
         self.__retrieve_all_projects(self.project)
+        self.__format_and_write_out()
+
+    def update(self, source_files):
+        """
+        Format and write out the documentation again once the pages
+        written in @source_files were modified, without scanning the
+        sources again.
 
+        Args:
+            source_files: list, the paths of the modified files.
+
+        Returns:
+            bool: False if one of @source_files is not a page that can be
+                parsed again on its own, the documentation then needs to
+                be built from scratch and nothing was done.
+        """
+        if self.low_memory:
+            return False
+
+        source_files = {os.path.abspath(path) for path in source_files}
+        parsed = set()
+        all_pages = {}
+        for project in self.__all_projects.values():
+            pages = project.tree.parse_pages_again(source_files)
+            if pages is None:
+                return False
+            all_pages[project] = pages
+            parsed.update(page.source_file for page in pages.values())
+
+        if parsed != source_files:
+            return False
+
+        Profiler.reset()
+        Profiler.enabled = bool(self.config.get('profile_phases'))
+        if self.build_cache:
+            self.build_cache.restart()
+        for project, pages in all_pages.items():
+            project.tree.replace_pages(pages, self.database,
+                                       self.link_resolver)
+        self.__format_and_write_out()
+        return True
+
+    def __format_and_write_out(self):
         self.link_resolver.get_link_signal.connect_after(self.__get_link_cb)
-        self.project.format(self.link_resolver, self.output)
-        self.project.write_out(self.output)
+        with Profiler.phase('formatting'):
+            self.project.format(self.link_resolver, self.output)
+        with Profiler.phase('write-out'):
+            self.project.write_out(self.output)
 
-        # Generating an XML sitemap makes no sense without a hostname
-        if self.hostname:
-            self.project.write_seo_sitemap(self.hostname, self.output)
+            # Generating an XML sitemap makes no sense without a hostname
+            if self.hostname:
+                self.project.write_seo_sitemap(self.hostname, self.output)
 
         self.link_resolver.get_link_signal.disconnect(self.__get_link_cb)
 
-        self.formatted_signal(self)
-        self.__persist()
+        with Profiler.phase('formatted-callbacks'):
+            self.formatted_signal(self)
+        with Profiler.phase('persist'):
+            self.__persist()
+
+        self.__dump_profile()
+
+    def __dump_profile(self):
+        path = self.config.get('profile_phases')
+        if not path:
+            return
+
+        Profiler.count('symbols', len(self.database.get_all_symbols()))
+        Profiler.dump(path, self.config.get('profile_top', 20))
+        info('Wrote phases report to %s' % path)
 
     def __get_link_cb(self, link_resolver, name):
         url_components = urlparse(name)
@@ -149,7 +268,10 @@ class Application(Configurable):
 
         info('Persisting database and private files', 'persisting')
 
-        self.database.persist()
+        self.database.persist(self.database_format,
+                              self.project.get_page_for_symbol)
+        if self.build_cache:
+            self.build_cache.persist()
         self.__dump_deps_file(self.project)
 
     def finalize(self):
@@ -170,6 +292,34 @@ class Application(Configurable):
         self.database = Database(self.private_folder)
         self.link_resolver = LinkResolver(self.database)
 
+    def __setup_build_cache(self):
+        if not self.incremental:
+            return
+
+        fingerprint = '%s-%s' % (VERSION, self.config.get_digest())
+        self.build_cache = BuildCache(self.private_folder, fingerprint)
+        self.build_cache.load()
+
+    def get_dependencies(self):
+        """
+        Returns:
+            list: The paths of the files the documentation was built from,
+                including the pages of the subprojects.
+        """
+        deps = list(self.config.get_dependencies())
+        if self.project is not None:
+            self.__list_project_sources(self.project, deps)
+        return deps
+
+    def __list_project_sources(self, project, deps):
+        if project.tree is not None:
+            for page in list(project.tree.get_pages().values()):
+                if not page.generated and page.source_file:
+                    deps.append(page.source_file)
+
+        for subproj in project.subprojects.values():
+            self.__list_project_sources(subproj, deps)
+
     def __dump_project_deps_file(self, project, deps_file, empty_targets):
         for page in list(project.tree.get_pages().values()):
             if not page.generated:
@@ -271,6 +421,56 @@ def create_default_layout(config):
             pass
 
 
+def build_documentation(config, ext_classes, get_private_folder=False):
+    """
+    Build the documentation described by @config.
+
+    Returns:
+        tuple: The exit code and the list of files the documentation was
+            built from.
+    """
+    app = Application(ext_classes)
+
+    def build():
+        app.parse_config(config)
+        if get_private_folder:
+            print(app.private_folder)
+            return
+        app.run()
+
+    try:
+        res = run_reporting_errors(build)
+    finally:
+        deps = []
+        if app.config is not None:
+            deps = app.get_dependencies()
+        app.finalize()
+
+    return res, deps
+
+
+def run_reporting_errors(func):
+    """
+    Call @func, which builds the documentation, reporting the errors it
+    raises.
+
+    Returns:
+        int: The exit code.
+    """
+    try:
+        func()
+        return Logger.n_fatal_warnings
+    except HotdocException:
+        return len(Logger.get_issues())
+    except Exception:  # pylint: disable=broad-except
+        print("An unknown error happened while building the documentation"
+              " and hotdoc cannot recover from it. Please report "
+              "a bug with this error message and the steps to "
+              "reproduce it")
+        traceback.print_exc()
+        return 1
+
+
 # pylint: disable=too-many-branches
 # pylint: disable=too-many-statements
 def execute_command(parser, config, ext_classes):
@@ -285,25 +485,11 @@ def execute_command(parser, config, ext_classes):
     if cmd == 'help':
         parser.print_help()
     elif cmd == 'run' or get_private_folder:  # git.mk backward compat
-        app = Application(ext_classes)
-        try:
-            app.parse_config(config)
-            if get_private_folder:
-                print(app.private_folder)
-                return res
-            app.run()
-            res = Logger.n_fatal_warnings
-        except HotdocException:
-            res = len(Logger.get_issues())
-        except Exception:  # pylint: disable=broad-except
-            print("An unknown error happened while building the documentation"
-                  " and hotdoc cannot recover from it. Please report "
-                  "a bug with this error message and the steps to "
-                  "reproduce it")
-            traceback.print_exc()
-            res = 1
-        finally:
-            app.finalize()
+        res, _ = build_documentation(config, ext_classes, get_private_folder)
+    elif cmd == 'serve':
+        # pylint: disable=import-outside-toplevel
+        from hotdoc.serve import serve
+        res = serve(config, ext_classes)
     elif cmd == 'init':
         try:
             create_default_layout(config)
@@ -378,7 +564,7 @@ def run(args, verbose=False):
         return 1
 
     parser.add_argument('command', action="store",
-                        choices=('run', 'conf', 'init', 'help'),
+                        choices=('run', 'serve', 'conf', 'init', 'help'),
                         nargs="?")
     parser.add_argument('--output-conf-file',
                         help='Path where to save the updated conf'
@@ -413,6 +599,21 @@ def run(args, verbose=False):
                         " of arguments before a command",
                         dest="whatever")
 
+    group = parser.add_argument_group(
+        'Serve', 'Options for the serve command')
+    group.add_argument('--serve-address', dest='serve_address',
+                       help='Address to serve the documentation on',
+                       default='localhost')
+    group.add_argument('--serve-port', dest='serve_port', type=int,
+                       help='Port to serve the documentation on',
+                       default=8000)
+    group.add_argument('--serve-interval', dest='serve_interval',
+                       type=float,
+                       help='Interval in seconds between two checks for '
+                       'modified sources, where they cannot be monitored '
+                       'with inotify',
+                       default=0.5)
+
     add_args_methods = set()
 
     for klass in all_subclasses(Configurable):
@@ -452,6 +653,10 @@ def run(args, verbose=False):
             print(" - %s " % extension)
         return 0
 
+    if known_args.command == 'serve':
+        # Only render again what changed between two rebuilds
+        actual_args['incremental'] = True
+
     if known_args.command != 'init':
         conf_file = actual_args.get('conf_file')
         if conf_file is None and os.path.exists('hotdoc.json'):
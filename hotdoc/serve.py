@@ -0,0 +1,409 @@
+# -*- coding: utf-8 -*-
+#
+# Copyright © 2016 Mathieu Duponchelle <mathieu.duponchelle@opencreed.com>
+# Copyright © 2016 Collabora Ltd
+#
+# This library is free software; you can redistribute it and/or modify it under
+# the terms of the GNU Lesser General Public License as published by the Free
+# Software Foundation; either version 2.1 of the License, or (at your option)
+# any later version.
+#
+# This library is distributed in the hope that it will be useful, but WITHOUT
+# ANY WARRANTY; without even the implied warranty of MERCHANTABILITY or FITNESS
+# FOR A PARTICULAR PURPOSE.  See the GNU Lesser General Public License for more
+# details.
+#
+# You should have received a copy of the GNU Lesser General Public License
+# along with this library.  If not, see <http://www.gnu.org/licenses/>.
+
+"""
+Live preview of the documentation, implementation of the serve command.
+"""
+
+import os
+import time
+import signal
+import threading
+import multiprocessing
+
+from functools import partial
+from http.server import ThreadingHTTPServer, SimpleHTTPRequestHandler
+
+from hotdoc.core.config import Config
+from hotdoc.core.exceptions import HotdocException
+from hotdoc.run_hotdoc import Application, run_reporting_errors
+from hotdoc.utils.loggable import Logger, debug, error, info
+from hotdoc.utils.signals import Signal
+from hotdoc.utils.utils import OrderedSet
+from hotdoc.utils.watcher import FileWatcher
+
+
+BUILD_ID_PATH = '/__hotdoc_build_id__'
+
+RELOAD_SNIPPET = '''<script>
+(function () {
+    var build_id = null;
+    function poll() {
+        var request = new XMLHttpRequest();
+        request.onload = function () {
+            if (build_id !== null && request.responseText !== build_id) {
+                window.location.reload();
+                return;
+            }
+            build_id = request.responseText;
+            setTimeout(poll, 500);
+        };
+        request.onerror = function () {
+            setTimeout(poll, 2000);
+        };
+        request.open('GET', '%s');
+        request.send();
+    }
+    poll();
+})();
+</script>
+''' % BUILD_ID_PATH
+
+
+def _get_context():
+    if 'fork' in multiprocessing.get_all_start_methods():
+        return multiprocessing.get_context('fork')
+    return multiprocessing.get_context()
+
+
+def _get_dependencies(app):
+    if app.config is None:
+        return None
+    return app.get_dependencies()
+
+
+def _run_session(config, ext_classes, conn, parent_conn):
+    """
+    Main of a process building the documentation from scratch, then
+    keeping the application around to update the documentation for as
+    long as only pages are modified.
+    """
+    # Only the parent process must have its end of the pipe open, for
+    # this process to notice when it is closed
+    parent_conn.close()
+
+    app = Application(ext_classes)
+    status = {}
+
+    def build():
+        app.parse_config(config)
+        app.run()
+        status['updated'] = True
+
+    res = run_reporting_errors(build)
+    resident = status.pop('updated', False)
+    conn.send((res, _get_dependencies(app), resident))
+
+    def update():
+        status['updated'] = app.update(changed)
+
+    while resident:
+        try:
+            changed = conn.recv()
+        except EOFError:
+            break
+
+        Logger.clear_journal()
+        res = run_reporting_errors(update)
+        updated = status.pop('updated', None)
+        if updated is False:
+            # Nothing was done, the documentation needs to be built from
+            # scratch
+            conn.send(None)
+            break
+
+        # The state of the application is unknown after an error
+        resident = updated is True
+        conn.send((res, _get_dependencies(app), resident))
+
+    if app.project is not None:
+        app.finalize()
+    conn.close()
+
+
+class _Session:
+    """
+    A process building the documentation from scratch, see `_run_session`.
+    """
+
+    def __init__(self, context, config, ext_classes):
+        self.__conn, child_conn = context.Pipe()
+        self.__process = context.Process(
+            target=_run_session,
+            args=(config, ext_classes, child_conn, self.__conn))
+        self.__process.start()
+        child_conn.close()
+        self.resident = False
+
+    def receive(self):
+        """
+        Returns:
+            tuple: The exit code and the dependencies of the build, or
+                None if the documentation needs to be built from scratch.
+        """
+        try:
+            result = self.__conn.recv()
+        except EOFError:
+            # The process exited before reporting anything
+            result = (1, None, False)
+
+        if result is None:
+            self.resident = False
+            return None
+
+        res, dependencies, self.resident = result
+        return res, dependencies
+
+    def update(self, changed):
+        """
+        Update the documentation after @changed were modified.
+        """
+        self.__conn.send(changed)
+        return self.receive()
+
+    def stop(self):
+        """
+        Wait for the process to exit.
+        """
+        self.__conn.close()
+        self.__process.join()
+
+
+def _run_builder(config, ext_classes, conn, parent_conn):
+    """
+    Main of the builder process, forked before the server starts any
+    thread.
+
+    Each build from scratch runs in a child process forked from this
+    one, starting from the state where all the extensions are imported
+    and nothing is built yet. That process is kept to update the
+    documentation while only pages are modified, without scanning the
+    sources again.
+    """
+    parent_conn.close()
+    # Interrupting the server stops the builder as well
+    signal.signal(signal.SIGINT, signal.SIG_IGN)
+
+    context = _get_context()
+    session = None
+
+    while True:
+        try:
+            changed = conn.recv()
+        except EOFError:
+            break
+
+        result = None
+        from_scratch = session is None
+        if session is not None:
+            result = session.update(changed)
+            if result is None:
+                session.stop()
+                session = None
+                from_scratch = True
+
+        if session is None:
+            Logger.clear_journal()
+            try:
+                config.reload()
+            except HotdocException:
+                # The error was already logged, keep watching the files
+                # until the configuration is fixed
+                result = (1, None)
+            else:
+                session = _Session(context, config, ext_classes)
+                result = session.receive()
+
+        if session is not None and not session.resident:
+            session.stop()
+            session = None
+
+        try:
+            conn.send(result + (config, from_scratch))
+        except BrokenPipeError:
+            break
+
+    if session is not None:
+        session.stop()
+    conn.close()
+
+
+class _RequestHandler(SimpleHTTPRequestHandler):
+    """
+    Serves the output folder, injecting in the HTML pages a script that
+    reloads them when the documentation was built again.
+    """
+
+    def do_GET(self):
+        if self.path == BUILD_ID_PATH:
+            self.__send(self.server.build_id.encode('utf-8'), 'text/plain')
+            return
+
+        path = self.translate_path(self.path)
+        if os.path.isdir(path) and self.path.split('?')[0].endswith('/'):
+            path = os.path.join(path, 'index.html')
+
+        if not path.endswith('.html') or not os.path.isfile(path):
+            super().do_GET()
+            return
+
+        with open(path, 'rb') as _:
+            contents = _.read()
+
+        snippet = RELOAD_SNIPPET.encode('utf-8')
+        index = contents.rfind(b'</body>')
+        if index == -1:
+            contents += snippet
+        else:
+            contents = contents[:index] + snippet + contents[index:]
+
+        self.__send(contents, 'text/html; charset=utf-8')
+
+    def __send(self, contents, content_type):
+        self.send_response(200)
+        self.send_header('Content-Type', content_type)
+        self.send_header('Content-Length', str(len(contents)))
+        self.send_header('Cache-Control', 'no-cache')
+        self.end_headers()
+        self.wfile.write(contents)
+
+    # pylint: disable=redefined-builtin
+    def log_message(self, format, *args):
+        debug(format % args, 'serve')
+
+
+class DocServer:
+    """
+    Builds the documentation, serves it over HTTP and updates it whenever
+    one of the files it was built from changes.
+
+    Builds run in a builder process forked before the server starts, see
+    `_run_builder`, with the incremental mode enabled, so that only the
+    pages whose inputs changed are formatted again.
+    """
+
+    def __init__(self, config, ext_classes):
+        """
+        Args:
+            config: hotdoc.core.config.Config, the configuration.
+            ext_classes: list, the extension classes to build the
+                documentation with.
+        """
+        output = config.get_path('output')
+        if output is None:
+            error('invalid-config',
+                  'No output folder to serve the documentation from, '
+                  'set one with --output or in the configuration file')
+
+        self.__config = config
+        self.__ext_classes = ext_classes
+        self.__html_folder = os.path.join(output, 'html')
+        self.__dependencies = []
+        self.__conn = None
+        self.__httpd = None
+        self.built_signal = Signal()
+
+    def __start_builder(self):
+        context = _get_context()
+        self.__conn, child_conn = context.Pipe()
+        process = context.Process(
+            target=_run_builder,
+            args=(self.__config, self.__ext_classes, child_conn,
+                  self.__conn))
+        process.start()
+        child_conn.close()
+        return process
+
+    def __build(self, changed):
+        self.__conn.send(changed)
+        res, dependencies, self.__config, from_scratch = self.__conn.recv()
+        self.__dependencies = dependencies or self.__dependencies
+        return res, from_scratch
+
+    def __list_files(self):
+        # The configuration file and the sitemap are always part of the
+        # dependencies of the configuration, even when the last build
+        # failed before reporting its own, and the source patterns are
+        # matched again to notice the files added since
+        Config.clear_pattern_cache()
+        paths = OrderedSet()
+        for path in self.__config.get_dependencies():
+            paths.add(os.path.abspath(path))
+        for path in self.__dependencies:
+            paths.add(os.path.abspath(path))
+        return list(paths), self.__config.get_source_folders()
+
+    def __serve(self):
+        self.__httpd = ThreadingHTTPServer(
+            (self.__config.get('serve_address', 'localhost'),
+             self.__config.get('serve_port', 8000)),
+            partial(_RequestHandler, directory=self.__html_folder))
+        address, port = self.__httpd.server_address[:2]
+        self.__httpd.build_id = '0'
+        thread = threading.Thread(target=self.__httpd.serve_forever)
+        thread.daemon = True
+        thread.start()
+        print('Serving the documentation at http://%s:%d/' % (address, port))
+
+    def run(self):
+        """
+        Build and serve the documentation until interrupted.
+
+        Returns:
+            int: The exit code of the last build.
+        """
+        # Forking once threads are running may deadlock
+        builder = self.__start_builder()
+        watcher = FileWatcher(self.__list_files,
+                              self.__config.get('serve_interval', 0.5))
+
+        res = 1
+        n_builds = 0
+        try:
+            watcher.snapshot()
+            res, _ = self.__build([])
+            self.__serve()
+            self.built_signal(self, res)
+            while True:
+                changed = watcher.wait()
+                info('%s changed, building again' % ', '.join(changed),
+                     'serve')
+                start = time.perf_counter()
+                watcher.snapshot()
+                res, from_scratch = self.__build(changed)
+                n_builds += 1
+                self.__httpd.build_id = str(n_builds)
+                print('%s the documentation in %.2f seconds' % (
+                    'Built' if from_scratch else 'Updated',
+                    time.perf_counter() - start))
+                self.built_signal(self, res)
+        except KeyboardInterrupt:
+            pass
+        except EOFError:
+            print('The builder process exited unexpectedly')
+            res = 1
+        finally:
+            watcher.close()
+            self.__conn.close()
+            builder.join()
+            if self.__httpd is not None:
+                self.__httpd.shutdown()
+                self.__httpd.server_close()
+
+        return res
+
+
+def serve(config, ext_classes):
+    """
+    Banana banana
+    """
+    try:
+        server = DocServer(config, ext_classes)
+    except HotdocException:
+        return 1
+    return server.run()
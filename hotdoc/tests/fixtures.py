@@ -52,6 +52,10 @@ class HotdocTest(unittest.TestCase):
         self.dependency_map = {}
         self.database = Database(self.private_folder)
         self.link_resolver = LinkResolver(self.database)
+        self.build_cache = None
+        self.cache_dir = None
+        self.jobs = 1
+        self.low_memory = False
         self.sanitized_name = 'test-project-0.1'
         self.tree = Tree(self, self)
 
@@ -24,12 +24,19 @@ import os
 import shutil
 import json
 import io
+import threading
 
 from contextlib import redirect_stdout
+from functools import partial
+from http.server import ThreadingHTTPServer
+from urllib.request import urlopen
 
 from hotdoc.utils.utils import touch
 from hotdoc.utils.loggable import Logger
+from hotdoc.core.config import Config
+from hotdoc.core.exceptions import HotdocException
 from hotdoc.run_hotdoc import run
+from hotdoc.serve import _RequestHandler, BUILD_ID_PATH, DocServer, serve
 
 
 class TestHotdoc(unittest.TestCase):
@@ -242,3 +249,181 @@ class TestHotdoc(unittest.TestCase):
         self.assertEqual(res, 0)
         path = f.getvalue().strip()
         self.assertTrue(os.path.basename(path).startswith('hotdoc-private'))
+
+    def test_incremental(self):
+        index_path = self.__create_md_file(
+            'index.markdown', "## A very simple index\n")
+        page_path = self.__create_md_file(
+            'page.markdown', "## A page\n\nFirst version\n")
+        sitemap_path = self.__create_sitemap(
+            'sitemap.txt', 'index.markdown\n\tpage.markdown')
+
+        args = ['--index', index_path,
+                '--output', self.__output_dir,
+                '--project-name', 'test-project',
+                '--project-version', '0.1',
+                '--sitemap', sitemap_path,
+                '--incremental',
+                'run']
+        res = run(args)
+        self.assertEqual(res, 0)
+        self.assertOutput(2)
+
+        private_folder = os.path.join(self._test_dir,
+                                      'hotdoc-private-test-project')
+        self.assertTrue(os.path.exists(
+            os.path.join(private_folder, 'build_cache.json')))
+
+        # Tamper with the cached rendering of the index, it should
+        # be reused as is as its inputs did not change
+        cached_index = os.path.join(private_folder, 'cache', 'index.html')
+        with open(cached_index, 'r') as _:
+            contents = _.read()
+        with open(cached_index, 'w') as _:
+            _.write(contents.replace('A very simple index',
+                                     'A reused index'))
+
+        self.__create_md_file('page.markdown',
+                              "## A page\n\nSecond version\n")
+        res = run(args)
+        self.assertEqual(res, 0)
+        self.assertOutput(2)
+
+        html_dir = os.path.join(self.__output_dir, 'html')
+        with open(os.path.join(html_dir, 'index.html')) as _:
+            self.assertIn('A reused index', _.read())
+        with open(os.path.join(html_dir, 'page.html')) as _:
+            contents = _.read()
+            self.assertIn('Second version', contents)
+            self.assertNotIn('First version', contents)
+
+    def test_jobs(self):
+        index_path = self.__create_md_file(
+            'index.markdown', "## A very simple index\n")
+        sitemap = ['index.markdown']
+        for i in range(8):
+            self.__create_md_file('page%d.markdown' % i,
+                                  "## Page %d\n\nSee [](index.markdown)\n" % i)
+            sitemap.append('\tpage%d.markdown' % i)
+        sitemap_path = self.__create_sitemap('sitemap.txt',
+                                             '\n'.join(sitemap))
+
+        args = ['--index', index_path,
+                '--output', self.__output_dir,
+                '--project-name', 'test-project',
+                '--project-version', '0.1',
+                '--sitemap', sitemap_path,
+                '--jobs', '4',
+                'run']
+        res = run(args)
+        self.assertEqual(res, 0)
+        self.assertOutput(9)
+
+        with open(os.path.join(self.__output_dir, 'html',
+                               'page3.html')) as _:
+            self.assertIn('Page 3', _.read())
+
+    def test_low_memory(self):
+        index_path = self.__create_md_file(
+            'index.markdown', "## A very simple index\n")
+        self.__create_md_file('page.markdown',
+                              "## A page\n\nSee [](index.markdown)\n")
+        sitemap_path = self.__create_sitemap(
+            'sitemap.txt', 'index.markdown\n\tpage.markdown')
+
+        args = ['--index', index_path,
+                '--output', self.__output_dir,
+                '--project-name', 'test-project',
+                '--project-version', '0.1',
+                '--sitemap', sitemap_path,
+                '--low-memory',
+                'run']
+        res = run(args)
+        self.assertEqual(res, 0)
+        self.assertOutput(2)
+
+        with open(os.path.join(self.__output_dir, 'html',
+                               'page.html')) as _:
+            contents = _.read()
+            self.assertIn('A page', contents)
+            self.assertIn('index.html', contents)
+
+    def test_serve_reload_snippet(self):
+        html_dir = os.path.join(self.__output_dir, 'html')
+        os.makedirs(html_dir)
+        with open(os.path.join(html_dir, 'index.html'), 'w') as _:
+            _.write('<html><body>Hello</body></html>')
+
+        httpd = ThreadingHTTPServer(
+            ('localhost', 0), partial(_RequestHandler, directory=html_dir))
+        httpd.build_id = '3'
+        thread = threading.Thread(target=httpd.serve_forever)
+        thread.start()
+        url = 'http://localhost:%d' % httpd.server_address[1]
+        try:
+            with urlopen(url + '/') as response:
+                contents = response.read().decode('utf-8')
+            with urlopen(url + BUILD_ID_PATH) as response:
+                build_id = response.read().decode('utf-8')
+        finally:
+            httpd.shutdown()
+            httpd.server_close()
+            thread.join()
+
+        self.assertTrue(contents.startswith('<html><body>Hello<script>'))
+        self.assertTrue(contents.endswith('</script>\n</body></html>'))
+        self.assertEqual(build_id, '3')
+
+    def test_serve_rebuild_after_failed_build(self):
+        index_path = self.__create_md_file('index.markdown', '# Index\n')
+        sitemap_path = self.__create_sitemap(
+            'sitemap.txt', 'index.markdown\n\tpage.markdown\n')
+        conf_path = self.__create_conf_file(
+            'hotdoc.json',
+            {'project_name': 'test-project',
+             'project_version': '0.1',
+             'index': index_path,
+             'output': self.__output_dir,
+             'sitemap': sitemap_path,
+             'foo_sources': [os.path.join(self.__md_dir, '*.foo')]})
+        config = Config(conf_file=conf_path,
+                        command_line_args={'serve_port': 0,
+                                           'serve_interval': 0.01,
+                                           'incremental': True})
+        results = []
+
+        def built_cb(_, res):
+            results.append(res)
+            if len(results) == 1:
+                # The page is not a dependency of the failed build, the
+                # new source is matched by the source patterns
+                self.__create_md_file('page.markdown', '# A page\n')
+                self.__create_md_file('0.foo', 'foo')
+            elif len(results) == 2:
+                self.__create_md_file('page.markdown', '# An updated page\n')
+            else:
+                raise KeyboardInterrupt
+
+        server = DocServer(config, [])
+        server.built_signal.connect(built_cb)
+        stdout = io.StringIO()
+        with redirect_stdout(stdout):
+            res = server.run()
+
+        self.assertEqual(res, 0)
+        self.assertEqual(len(results), 3)
+        self.assertNotEqual(results[0], 0)
+        self.assertEqual(results[1:], [0, 0])
+        self.assertIn('Built the documentation in', stdout.getvalue())
+        self.assertIn('Updated the documentation in', stdout.getvalue())
+
+        with open(os.path.join(self.__output_dir, 'html',
+                               'page.html')) as _:
+            self.assertIn('An updated page', _.read())
+
+    def test_serve_without_output(self):
+        config = Config(command_line_args={'serve_port': 0})
+        with self.assertRaises(HotdocException):
+            DocServer(config, [])
+        self.assertEqual(Logger.get_issues()[-1].code, 'invalid-config')
+        self.assertEqual(serve(config, []), 1)
@@ -269,6 +269,19 @@ class Logger(Configurable):
             else:
                 Logger.n_fatal_warnings += 1
 
+    @staticmethod
+    def replay(entries, n_fatal_warnings=0):
+        """
+        Add entries logged in another process to the journal, for
+        example by a worker formatting pages.
+        """
+        for entry in entries:
+            Logger.journal.append(entry)
+            if not Logger.silent and entry.level >= Logger._verbosity:
+                _print_entry(entry)
+
+        Logger.n_fatal_warnings += n_fatal_warnings
+
     @staticmethod
     def debug(message, domain):
         """Log debugging information"""
@@ -314,6 +327,13 @@ class Logger(Configurable):
                 issues.append(entry)
         return issues
 
+    @staticmethod
+    def clear_journal():
+        """Forget the entries logged so far, keeping the configuration"""
+        Logger.journal = []
+        Logger._last_checkpoint = 0
+        Logger.n_fatal_warnings = 0
+
     @staticmethod
     def reset():
         """Resets Logger to its initial state"""
@@ -0,0 +1,162 @@
+# -*- coding: utf-8 -*-
+#
+# Copyright © 2016 Mathieu Duponchelle <mathieu.duponchelle@opencreed.com>
+# Copyright © 2016 Collabora Ltd
+#
+# This library is free software; you can redistribute it and/or modify it under
+# the terms of the GNU Lesser General Public License as published by the Free
+# Software Foundation; either version 2.1 of the License, or (at your option)
+# any later version.
+#
+# This library is distributed in the hope that it will be useful, but WITHOUT
+# ANY WARRANTY; without even the implied warranty of MERCHANTABILITY or FITNESS
+# FOR A PARTICULAR PURPOSE.  See the GNU Lesser General Public License for more
+# details.
+#
+# You should have received a copy of the GNU Lesser General Public License
+# along with this library.  If not, see <http://www.gnu.org/licenses/>.
+
+"""
+Timing of the phases of a build.
+"""
+
+import os
+import json
+import time
+
+from collections import defaultdict
+from contextlib import contextmanager
+
+
+def _cpu_time():
+    times = os.times()
+    # Include the CPU time of the worker processes that exited
+    return times[0] + times[1] + times[2] + times[3]
+
+
+class Profiler:
+    """
+    Records the wall and CPU time spent in each phase of a build, the time
+    spent formatting each page and symbol, and a few counters.
+
+    Like `hotdoc.utils.loggable.Logger`, this is process-wide state, it
+    only records anything when `Profiler.enabled` is True.
+    """
+    enabled = False
+    phases = []
+    pages = {}
+    symbols = {}
+    counters = defaultdict(int)
+    __depth = 0
+
+    @staticmethod
+    def reset():
+        """Resets Profiler to its initial state"""
+        Profiler.enabled = False
+        Profiler.phases = []
+        Profiler.pages = {}
+        Profiler.symbols = {}
+        Profiler.counters = defaultdict(int)
+        Profiler.__depth = 0
+
+    @staticmethod
+    @contextmanager
+    def phase(name, **details):
+        """
+        Context manager recording the time spent in its body as a phase
+        named @name. Phases can be nested.
+
+        Args:
+            name: str, the name of the phase.
+            details: extra information stored with the phase, for example
+                the name of the project it concerns.
+        """
+        if not Profiler.enabled:
+            yield
+            return
+
+        record = {'name': name, 'depth': Profiler.__depth}
+        record.update(details)
+        Profiler.phases.append(record)
+        Profiler.__depth += 1
+        wall = time.perf_counter()
+        cpu = _cpu_time()
+        try:
+            yield
+        finally:
+            record['wall'] = time.perf_counter() - wall
+            record['cpu'] = _cpu_time() - cpu
+            Profiler.__depth -= 1
+
+    @staticmethod
+    def record_page(name, duration):
+        """Record the time spent formatting a page"""
+        if Profiler.enabled:
+            Profiler.pages[name] = Profiler.pages.get(name, 0) + duration
+
+    @staticmethod
+    def record_symbol(name, duration):
+        """Record the time spent formatting a symbol"""
+        if Profiler.enabled:
+            Profiler.symbols[name] = Profiler.symbols.get(name, 0) + duration
+
+    @staticmethod
+    def count(name, value=1):
+        """Increment the counter named @name"""
+        if Profiler.enabled:
+            Profiler.counters[name] += value
+
+    @staticmethod
+    def take():
+        """
+        Returns:
+            tuple: the page and symbol timings and the counters recorded
+                so far, in a form that can be sent to another process and
+                passed to `Profiler.merge` there. They are then reset.
+        """
+        if not Profiler.enabled:
+            return None
+
+        res = (Profiler.pages, Profiler.symbols, dict(Profiler.counters))
+        Profiler.pages = {}
+        Profiler.symbols = {}
+        Profiler.counters = defaultdict(int)
+        return res
+
+    @staticmethod
+    def merge(recorded):
+        """
+        Merge what was recorded in another process, see `Profiler.take`.
+        """
+        if not Profiler.enabled or recorded is None:
+            return
+
+        pages, symbols, counters = recorded
+        for name, duration in pages.items():
+            Profiler.record_page(name, duration)
+        for name, duration in symbols.items():
+            Profiler.record_symbol(name, duration)
+        for name, value in counters.items():
+            Profiler.count(name, value)
+
+    @staticmethod
+    def get_report(top_n=20):
+        """
+        Returns:
+            dict: The report, suitable for serializing as JSON.
+        """
+        def slowest(timings):
+            return [{'name': name, 'wall': duration} for name, duration in
+                    sorted(timings.items(), key=lambda item: -item[1])[
+                        :top_n]]
+
+        return {'phases': Profiler.phases,
+                'slowest_pages': slowest(Profiler.pages),
+                'slowest_symbols': slowest(Profiler.symbols),
+                'counts': dict(Profiler.counters)}
+
+    @staticmethod
+    def dump(path, top_n=20):
+        """Write the report as JSON to @path"""
+        with open(path, 'w', encoding='utf-8') as _:
+            _.write(json.dumps(Profiler.get_report(top_n), indent=2))
@@ -63,6 +63,7 @@ class Signal(object):
         self._functions = OrderedSet()
         self._after_functions = OrderedSet()
         self._optimized = optimized
+        self.__slots = None
 
     def __call__(self, *args, **kargs):
         res_list = []
@@ -84,6 +85,17 @@ class Signal(object):
 
         return res_list
 
+    @property
+    def slots(self):
+        """
+        The connected slots, as a hashable tuple. The same tuple is
+        returned for as long as no slot is connected or disconnected.
+        """
+        if self.__slots is None:
+            self.__slots = (tuple(self._functions), None,
+                            tuple(self._after_functions))
+        return self.__slots
+
     def connect(self, slot, *extra_args):
         """
         @slot: The method to be called on signal emission
@@ -92,6 +104,7 @@ class Signal(object):
         """
         slot = Slot(slot, *extra_args)
         self._functions.add(slot)
+        self.__slots = None
 
     def connect_after(self, slot, *extra_args):
         """
@@ -102,6 +115,7 @@ class Signal(object):
         """
         slot = Slot(slot, *extra_args)
         self._after_functions.add(slot)
+        self.__slots = None
 
     def disconnect(self, slot, *extra_args):
         """
@@ -112,6 +126,7 @@ class Signal(object):
             self._functions.remove(slot)
         elif slot in self._after_functions:
             self._after_functions.remove(slot)
+        self.__slots = None
 
     def clear(self):
         """
@@ -119,6 +134,7 @@ class Signal(object):
         """
         self._functions.clear()
         self._after_functions.clear()
+        self.__slots = None
 
 
 class TestSignals(unittest.TestCase):
@@ -0,0 +1,88 @@
+# -*- coding: utf-8 -*-
+#
+# Copyright © 2016 Mathieu Duponchelle <mathieu.duponchelle@opencreed.com>
+# Copyright © 2016 Collabora Ltd
+#
+# This library is free software; you can redistribute it and/or modify it under
+# the terms of the GNU Lesser General Public License as published by the Free
+# Software Foundation; either version 2.1 of the License, or (at your option)
+# any later version.
+#
+# This library is distributed in the hope that it will be useful, but WITHOUT
+# ANY WARRANTY; without even the implied warranty of MERCHANTABILITY or FITNESS
+# FOR A PARTICULAR PURPOSE.  See the GNU Lesser General Public License for more
+# details.
+#
+# You should have received a copy of the GNU Lesser General Public License
+# along with this library.  If not, see <http://www.gnu.org/licenses/>.
+
+# pylint: disable=missing-docstring
+# pylint: disable=invalid-name
+
+import unittest
+from hotdoc.utils.profiling import Profiler
+
+
+class TestProfiler(unittest.TestCase):
+    def setUp(self):
+        Profiler.reset()
+        Profiler.enabled = True
+
+    def tearDown(self):
+        Profiler.reset()
+
+    def test_disabled(self):
+        Profiler.enabled = False
+        with Profiler.phase('config'):
+            Profiler.record_page('index.markdown', 1.0)
+            Profiler.count('pages')
+        report = Profiler.get_report()
+        self.assertEqual(report['phases'], [])
+        self.assertEqual(report['slowest_pages'], [])
+        self.assertEqual(report['counts'], {})
+
+    def test_phases(self):
+        with Profiler.phase('setup', project='foo'):
+            with Profiler.phase('extension-setup', extension='c'):
+                pass
+        with Profiler.phase('formatting'):
+            pass
+
+        phases = Profiler.get_report()['phases']
+        self.assertEqual([(p['name'], p['depth']) for p in phases],
+                         [('setup', 0), ('extension-setup', 1),
+                          ('formatting', 0)])
+        self.assertEqual(phases[0]['project'], 'foo')
+        self.assertEqual(phases[1]['extension'], 'c')
+        for phase in phases:
+            self.assertGreaterEqual(phase['wall'], 0)
+            self.assertGreaterEqual(phase['cpu'], 0)
+
+    def test_slowest(self):
+        for i in range(5):
+            Profiler.record_page('page%d' % i, float(i))
+            Profiler.record_symbol('symbol%d' % i, float(i))
+
+        report = Profiler.get_report(top_n=2)
+        self.assertEqual([p['name'] for p in report['slowest_pages']],
+                         ['page4', 'page3'])
+        self.assertEqual([s['name'] for s in report['slowest_symbols']],
+                         ['symbol4', 'symbol3'])
+
+    def test_take_and_merge(self):
+        Profiler.record_page('main', 1.0)
+        Profiler.count('pages')
+        recorded = Profiler.take()
+        self.assertEqual(recorded, ({'main': 1.0}, {}, {'pages': 1}))
+        self.assertEqual(Profiler.get_report()['counts'], {})
+
+        Profiler.record_page('main', 1.0)
+        Profiler.merge(recorded)
+        Profiler.merge(({'worker': 2.0}, {'sym': 0.5},
+                        {'pages': 2, 'links-resolved': 3}))
+        report = Profiler.get_report()
+        self.assertEqual(report['slowest_pages'],
+                         [{'name': 'main', 'wall': 2.0},
+                          {'name': 'worker', 'wall': 2.0}])
+        self.assertEqual(report['counts'],
+                         {'pages': 3, 'links-resolved': 3})
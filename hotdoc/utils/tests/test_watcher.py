@@ -0,0 +1,99 @@
+# -*- coding: utf-8 -*-
+#
+# Copyright © 2016 Mathieu Duponchelle <mathieu.duponchelle@opencreed.com>
+# Copyright © 2016 Collabora Ltd
+#
+# This library is free software; you can redistribute it and/or modify it under
+# the terms of the GNU Lesser General Public License as published by the Free
+# Software Foundation; either version 2.1 of the License, or (at your option)
+# any later version.
+#
+# This library is distributed in the hope that it will be useful, but WITHOUT
+# ANY WARRANTY; without even the implied warranty of MERCHANTABILITY or FITNESS
+# FOR A PARTICULAR PURPOSE.  See the GNU Lesser General Public License for more
+# details.
+#
+# You should have received a copy of the GNU Lesser General Public License
+# along with this library.  If not, see <http://www.gnu.org/licenses/>.
+# pylint: disable=missing-docstring
+# pylint: disable=invalid-name
+
+import os
+import glob
+import shutil
+import tempfile
+import threading
+import time
+import unittest
+
+from hotdoc.utils.watcher import FileWatcher
+
+
+class TestFileWatcher(unittest.TestCase):
+    def setUp(self):
+        self.__dir = tempfile.mkdtemp()
+        self.addCleanup(shutil.rmtree, self.__dir)
+        self.__n_listings = 0
+        self.__page = self.__write('page.md', 'page')
+
+    def __write(self, name, contents):
+        path = os.path.join(self.__dir, name)
+        with open(path, 'w') as _:
+            _.write(contents)
+        return path
+
+    def __list_files(self):
+        self.__n_listings += 1
+        files = [self.__page]
+        files.extend(sorted(glob.glob(os.path.join(self.__dir, '*.c'))))
+        return files, [self.__dir]
+
+    def __wait_after(self, func, use_inotify):
+        watcher = FileWatcher(self.__list_files, interval=0.01,
+                              use_inotify=use_inotify)
+        self.addCleanup(watcher.close)
+        watcher.snapshot()
+
+        def modify():
+            time.sleep(0.05)
+            func()
+
+        thread = threading.Thread(target=modify)
+        thread.start()
+        try:
+            return watcher.wait()
+        finally:
+            thread.join()
+
+    def __test_modified(self, use_inotify):
+        changed = self.__wait_after(
+            lambda: self.__write('page.md', 'modified page'), use_inotify)
+        self.assertEqual(changed, [self.__page])
+        # The folder content did not change, the files are not listed
+        # again
+        self.assertEqual(self.__n_listings, 2)
+
+    def __test_created(self, use_inotify):
+        path = os.path.join(self.__dir, 'foo.c')
+        changed = self.__wait_after(
+            lambda: self.__write('foo.c', 'int foo;'), use_inotify)
+        self.assertEqual(changed, [path])
+
+    def test_modified(self):
+        self.__test_modified(True)
+
+    def test_modified_polling(self):
+        self.__test_modified(False)
+
+    def test_created(self):
+        self.__test_created(True)
+
+    def test_created_polling(self):
+        self.__test_created(False)
+
+    def test_modified_since_snapshot(self):
+        watcher = FileWatcher(self.__list_files, interval=0.01)
+        self.addCleanup(watcher.close)
+        watcher.snapshot()
+        path = self.__write('foo.c', 'int foo;')
+        self.assertEqual(watcher.wait(), [path])
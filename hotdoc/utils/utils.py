@@ -24,6 +24,7 @@ from collections import OrderedDict
 from collections.abc import Callable, MutableSet
 import os
 import shutil
+import hashlib
 import math
 import sys
 import re
@@ -153,6 +154,34 @@ def get_mtime(filename):
         return -1
 
 
+def digest_file(path):
+    """
+    Compute the sha1 hex digest of the contents of @path.
+
+    Returns:
+        str: the digest, or None if @path could not be read.
+    """
+    hasher = hashlib.sha1()
+    try:
+        with open(path, 'rb') as _:
+            for chunk in iter(lambda: _.read(65536), b''):
+                hasher.update(chunk)
+    except (OSError, TypeError):
+        return None
+    return hasher.hexdigest()
+
+
+def get_user_cache_dir():
+    """
+    Returns:
+        str: the folder where hotdoc caches, between runs and projects,
+            what it extracts from source files.
+    """
+    cache_home = os.environ.get('XDG_CACHE_HOME') or \
+        os.path.join(os.path.expanduser('~'), '.cache')
+    return os.path.join(cache_home, 'hotdoc')
+
+
 def __load_entry_point(
         entry_point: meta.EntryPoint, is_installed: bool = False
         ) -> T.List[T.Type['Extension']]:
@@ -473,7 +502,7 @@ class DefaultOrderedDict(OrderedDict):
             args = tuple()
         else:
             args = (self.default_factory,)
-        return type(self), args, None, None, self.items()
+        return type(self), args, None, None, iter(self.items())
 
     def copy(self):
         return self.__copy__()
@@ -0,0 +1,230 @@
+# -*- coding: utf-8 -*-
+#
+# Copyright © 2016 Mathieu Duponchelle <mathieu.duponchelle@opencreed.com>
+# Copyright © 2016 Collabora Ltd
+#
+# This library is free software; you can redistribute it and/or modify it under
+# the terms of the GNU Lesser General Public License as published by the Free
+# Software Foundation; either version 2.1 of the License, or (at your option)
+# any later version.
+#
+# This library is distributed in the hope that it will be useful, but WITHOUT
+# ANY WARRANTY; without even the implied warranty of MERCHANTABILITY or FITNESS
+# FOR A PARTICULAR PURPOSE.  See the GNU Lesser General Public License for more
+# details.
+#
+# You should have received a copy of the GNU Lesser General Public License
+# along with this library.  If not, see <http://www.gnu.org/licenses/>.
+
+"""
+Waiting for files to change, with inotify where available.
+"""
+
+import os
+import sys
+import time
+import ctypes
+import select
+
+
+IN_MODIFY = 0x2
+IN_ATTRIB = 0x4
+IN_CLOSE_WRITE = 0x8
+IN_MOVED_FROM = 0x40
+IN_MOVED_TO = 0x80
+IN_CREATE = 0x100
+IN_DELETE = 0x200
+IN_DELETE_SELF = 0x400
+IN_MOVE_SELF = 0x800
+
+WATCH_MASK = (IN_MODIFY | IN_ATTRIB | IN_CLOSE_WRITE | IN_MOVED_FROM |
+              IN_MOVED_TO | IN_CREATE | IN_DELETE | IN_DELETE_SELF |
+              IN_MOVE_SELF)
+
+# The timestamps of the files come from a coarser clock than time.time_ns
+CLOCK_MARGIN_NS = 10 ** 7
+
+
+def _get_mtime(path):
+    try:
+        return os.stat(path).st_mtime_ns
+    except OSError:
+        return None
+
+
+def _load_libc():
+    if not sys.platform.startswith('linux'):
+        return None
+
+    try:
+        libc = ctypes.CDLL(None, use_errno=True)
+        libc.inotify_init1.argtypes = (ctypes.c_int,)
+        libc.inotify_add_watch.argtypes = (ctypes.c_int, ctypes.c_char_p,
+                                           ctypes.c_uint32)
+    except (OSError, AttributeError):
+        return None
+
+    return libc
+
+
+class _Inotify:
+    """
+    The folders watched with inotify, and the events received for them.
+    """
+
+    def __init__(self, libc):
+        self.__libc = libc
+        self.__folders = set()
+        self.fd = libc.inotify_init1(os.O_NONBLOCK | os.O_CLOEXEC)
+        if self.fd < 0:
+            raise OSError(ctypes.get_errno(), 'inotify_init1 failed')
+
+    def watch(self, folder):
+        """
+        Returns:
+            bool: Whether @folder could be watched.
+        """
+        if folder in self.__folders:
+            return True
+
+        wd = self.__libc.inotify_add_watch(self.fd, os.fsencode(folder),
+                                           WATCH_MASK)
+        if wd < 0:
+            return False
+
+        self.__folders.add(folder)
+        return True
+
+    def drain(self):
+        """
+        Forget the events received so far, their details don't matter as
+        the modification times of the files are compared anyway.
+        """
+        while True:
+            try:
+                if not os.read(self.fd, 65536):
+                    return
+            except BlockingIOError:
+                return
+
+    def close(self):
+        """
+        Stop watching the folders.
+        """
+        os.close(self.fd)
+
+
+class FileWatcher:
+    """
+    Waits for files to be modified, created or removed.
+
+    The folders of the files are watched with inotify on Linux, and their
+    modification times polled at a given interval elsewhere, or when a
+    folder could not be watched.
+    """
+
+    def __init__(self, list_files, interval=0.5, use_inotify=True):
+        """
+        Args:
+            list_files: callable, returning the paths of the files to
+                watch along with the folders new files to watch may
+                appear in. It is only called again once the content of
+                one of these folders changed.
+            interval: float, the interval in seconds between two checks
+                when polling.
+            use_inotify: bool, whether to watch the folders with inotify
+                where available.
+        """
+        self.__list_files = list_files
+        self.__interval = interval
+        self.__inotify = None
+        self.__polling = True
+        self.__files = []
+        self.__mtimes = {}
+        self.__snapshot_time = 0
+        self.__folder_mtimes = {}
+
+        libc = _load_libc() if use_inotify else None
+        if libc is not None:
+            try:
+                self.__inotify = _Inotify(libc)
+            except OSError:
+                self.__inotify = None
+
+    def __list(self):
+        files, folders = self.__list_files()
+        folders = set(folders)
+        folders.update(os.path.dirname(path) for path in files)
+
+        self.__polling = self.__inotify is None
+        for folder in folders:
+            if not self.__polling and not self.__inotify.watch(folder):
+                self.__polling = True
+
+        self.__files = files
+        self.__folder_mtimes = {folder: _get_mtime(folder)
+                                for folder in folders}
+
+    def __sleep(self):
+        if self.__inotify is None:
+            time.sleep(self.__interval)
+            return
+
+        timeout = self.__interval if self.__polling else None
+        readable, _, _ = select.select([self.__inotify.fd], [], [], timeout)
+        if readable:
+            self.__inotify.drain()
+
+    def __get_changed(self):
+        paths = list(self.__mtimes)
+        paths.extend(path for path in self.__files
+                     if path not in self.__mtimes)
+        return [path for path in paths
+                if _get_mtime(path) != self.__mtimes.get(path)]
+
+    def snapshot(self):
+        """
+        Remember the current state of the files, `FileWatcher.wait`
+        returns the files that changed since.
+        """
+        self.__snapshot_time = time.time_ns() - CLOCK_MARGIN_NS
+        self.__list()
+        self.__mtimes = {path: _get_mtime(path) for path in self.__files}
+
+    def wait(self):
+        """
+        Wait until one of the files changes.
+
+        Returns:
+            list: The paths of the files that changed since the last
+                snapshot.
+        """
+        # The files to watch may have changed since the snapshot, for
+        # example when a build reported new dependencies, those that were
+        # not modified since are not reported
+        self.__list()
+        for path in self.__files:
+            mtime = _get_mtime(path)
+            if path not in self.__mtimes and mtime is not None and \
+                    mtime < self.__snapshot_time:
+                self.__mtimes[path] = mtime
+
+        while True:
+            changed = self.__get_changed()
+            if changed:
+                return changed
+
+            self.__sleep()
+
+            # Files were created, removed or renamed
+            if any(_get_mtime(folder) != mtime
+                   for folder, mtime in self.__folder_mtimes.items()):
+                self.__list()
+
+    def close(self):
+        """
+        Stop watching the files.
+        """
+        if self.__inotify is not None:
+            self.__inotify.close()
+            self.__inotify = None
@@ -361,9 +361,9 @@ if build_c_extension != 'disabled':
                      'hotdoc/parsers/c_comment_scanner/scanner.h'])]
         INSTALL_REQUIRES += [
             'pkgconfig',
-            'networkx>=2.5'
         ]
-        PACKAGE_DATA['hotdoc.extensions.gi'] = ['html_templates/*']
+        PACKAGE_DATA['hotdoc.extensions.gi'] = ['html_templates/*',
+                                                 'gi-fragments.js']
         PACKAGE_DATA['hotdoc.extensions.gi.transition_scripts'] = [
             'translate_sections.sh']
 